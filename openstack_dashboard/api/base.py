@@ -18,8 +18,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from collections import OrderedDict  # noqa
 from collections import Sequence  # noqa
 import logging
+import threading
 
 from django.conf import settings
 
@@ -32,6 +34,9 @@ __all__ = ('APIResourceWrapper', 'APIDictWrapper',
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_CLIENT_CACHE_SIZE = 16
+DEFAULT_CATALOG_INDEX_CACHE_SIZE = 1000
+
 
 class APIVersionManager(object):
     """Object to store and manage API versioning data and utility methods."""
@@ -66,26 +71,59 @@ class APIVersionManager(object):
         return self.supported[self._active]
 
 
+class _WrappedAttribute(object):
+    """Reads an attribute of the API object of an :class:`APIResourceWrapper`.
+
+    Instance attributes still take precedence, as it has no ``__set__``.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, wrapper, owner):
+        if wrapper is None:
+            return self
+        return getattr(wrapper._apiresource, self.name)
+
+
+class _APIResourceWrapperType(type):
+    """Resolves the ``_attrs`` of a wrapper class once, when it's created.
+
+    Each name of ``_attrs`` not defined by the class or its bases becomes
+    a :class:`_WrappedAttribute`, so reading it is a plain attribute
+    lookup instead of a failed one followed by a search of ``_attrs``.
+    """
+
+    def __init__(cls, name, bases, attrs):
+        super(_APIResourceWrapperType, cls).__init__(name, bases, attrs)
+        cls._attr_set = frozenset(cls._attrs)
+        for attr in cls._attrs:
+            if not any(attr in klass.__dict__ for klass in cls.__mro__):
+                setattr(cls, attr, _WrappedAttribute(attr))
+
+
 class APIResourceWrapper(object):
     """Simple wrapper for api objects.
 
     Define _attrs on the child class and pass in the
     api object as the only argument to the constructor
     """
+    __metaclass__ = _APIResourceWrapperType
+
     _attrs = []
     _apiresource = None  # Make sure _apiresource is there even in __init__.
 
     def __init__(self, apiresource):
         self._apiresource = apiresource
 
-    def __getattribute__(self, attr):
-        try:
-            return object.__getattribute__(self, attr)
-        except AttributeError:
-            if attr not in self._attrs:
-                raise
-            # __getattr__ won't find properties
-            return getattr(self._apiresource, attr)
+    def __getattr__(self, attr):
+        # Only called when the attribute can't be found otherwise, e.g. a
+        # property of the wrapper raised an AttributeError.
+        if attr not in self._attr_set:
+            raise AttributeError("'%s' object has no attribute '%s'"
+                                 % (self.__class__.__name__, attr))
+        return getattr(self._apiresource, attr)
 
     def __repr__(self):
         return "<%s: %s>" % (self.__class__.__name__,
@@ -110,13 +148,13 @@ class APIDictWrapper(object):
     def __init__(self, apidict):
         self._apidict = apidict
 
-    def __getattribute__(self, attr):
+    def __getattr__(self, attr):
+        # Only called when the attribute can't be found otherwise.
         try:
-            return object.__getattribute__(self, attr)
-        except AttributeError:
-            if attr not in self._apidict:
-                raise
             return self._apidict[attr]
+        except KeyError:
+            raise AttributeError("'%s' object has no attribute '%s'"
+                                 % (self.__class__.__name__, attr))
 
     def __getitem__(self, item):
         try:
@@ -204,6 +242,11 @@ class QuotaSet(Sequence):
 
 
 def get_service_from_catalog(catalog, service_type):
+    """Returns the first service of ``service_type`` in ``catalog``.
+
+    This scans the catalog, the lookups of requests should go through
+    their index instead, see :func:`get_catalog_index`.
+    """
     if catalog:
         for service in catalog:
             if service['type'] == service_type:
@@ -247,40 +290,198 @@ def get_url_for_service(service, region, endpoint_type):
     return None
 
 
+class ServiceCatalogIndex(object):
+    """The endpoint URLs of a service catalog, by service type, region and
+    endpoint type.
+
+    The URLs of the usual endpoint types are computed once, falling back
+    to ``fallback_endpoint_type`` when a region doesn't have one, so that
+    lookups don't scan the services and their endpoints. Only the first
+    service of each type is used, as in :func:`get_service_from_catalog`.
+    """
+
+    def __init__(self, catalog, fallback_endpoint_type=None):
+        self.fallback_endpoint_type = fallback_endpoint_type
+        self._services = {}
+        self._regions = {}
+        self._urls = {}
+        for service in catalog or []:
+            service_type = service['type']
+            if service_type in self._services:
+                continue
+            self._services[service_type] = service
+            regions = set(self._region(service_type, endpoint.get('region'))
+                          for endpoint in service['endpoints'])
+            self._regions[service_type] = regions
+            for region in regions:
+                for endpoint_type in ENDPOINT_TYPE_TO_INTERFACE:
+                    key = (service_type, region, endpoint_type)
+                    self._urls[key] = self._find_url(service, region,
+                                                     endpoint_type)
+
+    @staticmethod
+    def _region(service_type, region):
+        # Regions are ignored for identity.
+        return None if service_type == 'identity' else region
+
+    def _find_url(self, service, region, endpoint_type):
+        url = get_url_for_service(service, region, endpoint_type)
+        if not url and self.fallback_endpoint_type:
+            url = get_url_for_service(service, region,
+                                      self.fallback_endpoint_type)
+        return url
+
+    def get_service(self, service_type):
+        return self._services.get(service_type)
+
+    def get_url(self, service_type, region, endpoint_type):
+        """Returns the URL of an endpoint, or None if there isn't one."""
+        region = self._region(service_type, region)
+        try:
+            return self._urls[(service_type, region, endpoint_type)]
+        except KeyError:
+            pass
+        if region not in self._regions.get(service_type, ()):
+            return None
+        # Endpoint types other than the usual ones aren't indexed.
+        return self._find_url(self._services[service_type], region,
+                              endpoint_type)
+
+    def has_region(self, service_type, region):
+        """Whether the service has endpoints in ``region``."""
+        region = self._region(service_type, region)
+        return region in self._regions.get(service_type, ())
+
+
+class ServiceCatalogIndexCache(object):
+    """The indexes of the service catalogs of the users, by token.
+
+    The catalog of a token doesn't change, so its index is built on the
+    first lookup made with the token and reused by the later requests of
+    the session. At most SERVICE_CATALOG_INDEX_CACHE_SIZE indexes are kept
+    per process, the least recently used being dropped first. 0 disables
+    the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    def get(self, user):
+        size = getattr(settings, 'SERVICE_CATALOG_INDEX_CACHE_SIZE',
+                       DEFAULT_CATALOG_INDEX_CACHE_SIZE)
+        fallback_endpoint_type = getattr(settings, 'SECONDARY_ENDPOINT_TYPE',
+                                         None)
+        if not size:
+            return ServiceCatalogIndex(user.service_catalog,
+                                       fallback_endpoint_type)
+        key = (user.token.id, fallback_endpoint_type)
+        with self._lock:
+            index = self._indexes.pop(key, None)
+            if index is not None:
+                self._indexes[key] = index
+                return index
+
+        index = ServiceCatalogIndex(user.service_catalog,
+                                    fallback_endpoint_type)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+catalog_index_cache = ServiceCatalogIndexCache()
+
+
+def get_catalog_index(request):
+    """Returns the index of the service catalog of the user."""
+    return catalog_index_cache.get(request.user)
+
+
 def url_for(request, service_type, endpoint_type=None, region=None):
     endpoint_type = endpoint_type or getattr(settings,
                                              'OPENSTACK_ENDPOINT_TYPE',
                                              'publicURL')
-    fallback_endpoint_type = getattr(settings, 'SECONDARY_ENDPOINT_TYPE', None)
-
-    catalog = request.user.service_catalog
-    service = get_service_from_catalog(catalog, service_type)
-    if service:
-        if not region:
-            region = request.user.services_region
-        url = get_url_for_service(service,
-                                  region,
-                                  endpoint_type)
-        if not url and fallback_endpoint_type:
-            url = get_url_for_service(service,
-                                      region,
-                                      fallback_endpoint_type)
-        if url:
-            return url
+    region = region or request.user.services_region
+    url = get_catalog_index(request).get_url(service_type, region,
+                                             endpoint_type)
+    if url:
+        return url
     raise exceptions.ServiceCatalogException(service_type)
 
 
 def is_service_enabled(request, service_type, service_name=None):
-    service = get_service_from_catalog(request.user.service_catalog,
-                                       service_type)
-    if service:
-        region = request.user.services_region
-        for endpoint in service['endpoints']:
-            # ignore region for identity
-            if service['type'] == 'identity' or \
-               endpoint['region'] == region:
-                if service_name:
-                    return service['name'] == service_name
-                else:
-                    return True
-    return False
+    index = get_catalog_index(request)
+    if not index.has_region(service_type, request.user.services_region):
+        return False
+    if service_name:
+        return index.get_service(service_type)['name'] == service_name
+    return True
+
+
+class ClientStats(object):
+    """Counts the clients built, reused and evicted for each service."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, service, event):
+        with self._lock:
+            counts = self._counts.setdefault(
+                service, {'hits': 0, 'misses': 0, 'evictions': 0})
+            counts[event] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return dict((service, dict(counts))
+                        for service, counts in self._counts.items())
+
+
+_client_stats = ClientStats()
+_clients = threading.local()
+
+
+def cached_client(request, service, factory, *key):
+    """Returns a client of ``service``, built by ``factory(request)``.
+
+    Clients are kept per thread, keyed on the service, the token and the
+    region of the user, plus any ``key`` the factory depends on. Calls
+    made during a request reuse the same client, and so do the later
+    requests of the same session served by the same thread, keeping the
+    client's HTTP connections open. Clients are never shared between
+    threads, as most of them aren't thread safe.
+
+    At most API_CLIENT_CACHE_SIZE clients are kept per thread, the least
+    recently used being dropped first. 0 disables the cache.
+    """
+    size = getattr(settings, 'API_CLIENT_CACHE_SIZE',
+                   DEFAULT_CLIENT_CACHE_SIZE)
+    if not size:
+        return factory(request)
+    clients = getattr(_clients, 'clients', None)
+    if clients is None:
+        clients = _clients.clients = OrderedDict()
+    user = request.user
+    cache_key = (service, user.token.id, user.services_region) + key
+    client = clients.pop(cache_key, None)
+    if client is None:
+        _client_stats.record(service, 'misses')
+        client = factory(request)
+        while len(clients) >= size:
+            evicted_key = clients.popitem(last=False)[0]
+            _client_stats.record(evicted_key[0], 'evictions')
+    else:
+        _client_stats.record(service, 'hits')
+    clients[cache_key] = client
+    return client
+
+
+def client_stats():
+    """Returns the reuse counts of the cached clients, by service."""
+    return _client_stats.as_dict()
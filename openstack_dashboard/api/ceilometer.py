@@ -13,7 +13,6 @@
 # under the License.
 
 import logging
-import threading
 
 from ceilometerclient import client as ceilometer_client
 from django.conf import settings
@@ -25,6 +24,7 @@ from horizon import exceptions
 from openstack_dashboard.api import base
 from openstack_dashboard.api import keystone
 from openstack_dashboard.api import nova
+from openstack_dashboard.utils import concurrency
 
 LOG = logging.getLogger(__name__)
 
@@ -295,23 +295,53 @@ def statistic_list(request, meter_name, query=None, period=None):
     return [Statistic(s) for s in statistics]
 
 
-class ThreadedUpdateResourceWithStatistics(threading.Thread):
-    """Multithread wrapper for update_with_statistics method of
-    resource_usage.
+# Size of the process wide pool running statistics calls, how many calls
+# a single request may have queued or running on it, and after how many
+# seconds a call is given up on.
+DEFAULT_WORKERS = 20
+DEFAULT_STATISTICS_CONCURRENCY = 10
+DEFAULT_STATISTICS_TIMEOUT = 60
 
-    A join logic is placed in process_list class method. All resources
-    will have its statistics attribute filled in separate threads.
 
-    The resource_usage object is shared between threads. Each thread is
-    updating one Resource.
+def statistics_pool():
+    return concurrency.get_pool(
+        'ceilometer', getattr(settings, 'CEILOMETER_WORKERS',
+                              DEFAULT_WORKERS))
+
+
+def imap_statistics(func, items):
+    """Runs ``func`` on every item on the statistics pool.
+
+    The number of calls a request runs at once and the time each call may
+    take are limited by the CEILOMETER_STATISTICS_CONCURRENCY and
+    CEILOMETER_STATISTICS_TIMEOUT settings. See
+    :func:`openstack_dashboard.utils.concurrency.imap`.
+    """
+    return concurrency.imap(
+        statistics_pool(), func, items,
+        limit=getattr(settings, 'CEILOMETER_STATISTICS_CONCURRENCY',
+                      DEFAULT_STATISTICS_CONCURRENCY),
+        timeout=getattr(settings, 'CEILOMETER_STATISTICS_TIMEOUT',
+                        DEFAULT_STATISTICS_TIMEOUT))
+
+
+def update_resources_with_statistics(resource_usage, resources,
+                                     meter_names=None, period=None,
+                                     stats_attr=None, additional_query=None):
+    """Fills the statistics of many resources concurrently.
+
+    Calls ``resource_usage.update_with_statistics`` for every resource on
+    a bounded pool shared by all requests of the process, see
+    :func:`imap_statistics`.
+
+    A resource whose statistics can't be obtained has its meter
+    attributes set to None, the other resources keep their statistics.
 
     :Parameters:
-      - `resource`: Resource or ResourceAggregate object, that will
-                    be filled by statistic data.
-      - `resources`: List of Resource or ResourceAggregate object,
-                     that will be filled by statistic data.
       - `resource_usage`: Wrapping resource usage object, that holds
                           all statistics data.
+      - `resources`: List of Resource or ResourceAggregate object,
+                     that will be filled by statistic data.
       - `meter_names`: List of meter names of the statistics we want.
       - `period`: In seconds. If no period is given, only one aggregate
                   statistic is returned. If given, a faceted result will be
@@ -326,40 +356,19 @@ class ThreadedUpdateResourceWithStatistics(threading.Thread):
     # TODO(lsmola) Can be removed once Ceilometer supports sample-api
     # and group-by, so all of this optimization will not be necessary.
     # It is planned somewhere to I.
+    def update(resource):
+        return resource_usage.update_with_statistics(resource,
+            meter_names=meter_names, period=period, stats_attr=stats_attr,
+            additional_query=additional_query)
 
-    def __init__(self, resource_usage, resource, meter_names=None,
-                 period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        super(ThreadedUpdateResourceWithStatistics, self).__init__()
-        self.resource_usage = resource_usage
-        self.resource = resource
-        self.meter_names = meter_names
-        self.period = period
-        self.stats_attr = stats_attr
-        self.additional_query = additional_query
-
-    def run(self):
-        # Run the job
-        self.resource_usage.update_with_statistics(self.resource,
-            meter_names=self.meter_names, period=self.period,
-            stats_attr=self.stats_attr, additional_query=self.additional_query)
-
-    @classmethod
-    def process_list(cls, resource_usage, resources, meter_names=None,
-                 period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        threads = []
-
-        for resource in resources:
-            # add statistics data into resource
-            thread = cls(resource_usage, resource, meter_names=meter_names,
-                period=period, stats_attr=stats_attr,
-                additional_query=additional_query)
-            thread.start()
-            threads.append(thread)
-
-        for thread in threads:
-            thread.join()
+    for resource, future in zip(resources, imap_statistics(update,
+                                                           resources)):
+        error = future.exception()
+        if error is not None:
+            LOG.warning('Unable to retrieve statistics for %s: %s'
+                        % (resource.query, error))
+            for meter in meter_names or []:
+                setattr(resource, meter.replace(".", "_"), None)
 
 
 class CeilometerUsage(object):
@@ -631,7 +640,7 @@ class CeilometerUsage(object):
         resources = self.resources(query, filter_func=filter_func,
             with_users_and_tenants=with_users_and_tenants)
 
-        ThreadedUpdateResourceWithStatistics.process_list(self, resources,
+        update_resources_with_statistics(self, resources,
             meter_names=meter_names, period=period, stats_attr=stats_attr,
             additional_query=additional_query)
 
@@ -678,9 +687,9 @@ class CeilometerUsage(object):
         """
         resource_aggregates = self.resource_aggregates(queries)
 
-        ThreadedUpdateResourceWithStatistics.process_list(self,
-            resource_aggregates, meter_names=meter_names, period=period,
-            stats_attr=stats_attr, additional_query=additional_query)
+        update_resources_with_statistics(self, resource_aggregates,
+            meter_names=meter_names, period=period, stats_attr=stats_attr,
+            additional_query=additional_query)
 
         return resource_aggregates
 
@@ -92,6 +92,11 @@ class VolumeSnapshot(BaseCinderAPIResourceWrapper):
 
 
 def cinderclient(request):
+    return base.cached_client(request, 'volume', _cinderclient,
+                              VERSIONS.active)
+
+
+def _cinderclient(request):
     api_version = VERSIONS.get_active_version()
 
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
@@ -153,6 +158,7 @@ def volume_get(request, volume_id):
     for attachment in volume_data.attachments:
         if "server_id" in attachment:
             instance = nova.server_get(request, attachment['server_id'])
+            attachment['instance'] = instance
             attachment['instance_name'] = instance.name
         else:
             # Nova volume can occasionally send back error'd attachments
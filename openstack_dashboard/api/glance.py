@@ -20,11 +20,14 @@
 
 from __future__ import absolute_import
 
+from collections import OrderedDict  # noqa
 import itertools
 import logging
-import thread
+import threading
+import time
 
 from django.conf import settings
+from django.core.cache import cache
 import six.moves.urllib.parse as urlparse
 
 import glanceclient as glance_client
@@ -32,12 +35,73 @@ import glanceclient as glance_client
 from horizon.utils import functions as utils
 
 from openstack_dashboard.api import base
+from openstack_dashboard.utils import concurrency
 
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_IMAGE_CACHE_SIZE = 1000
+DEFAULT_IMAGE_CACHE_TTL = 300
+DEFAULT_WORKERS = 10
+DEFAULT_UPLOAD_WORKERS = 2
+# How often, in seconds, the progress of an upload is published, and how
+# long it is kept once the upload is done.
+UPLOAD_STATUS_INTERVAL = 1
+UPLOAD_STATUS_TTL = 3600
+
+
+class ImageCache(object):
+    """A process wide cache of image metadata, with TTL and LRU eviction.
+
+    Public images are shared by all projects, other images are only
+    returned to the project they were fetched for.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+
+    def get(self, tenant_id, image_id):
+        ttl = getattr(settings, 'IMAGE_CACHE_TTL', DEFAULT_IMAGE_CACHE_TTL)
+        now = time.time()
+        with self._lock:
+            for key in ((None, image_id), (tenant_id, image_id)):
+                entry = self._images.pop(key, None)
+                if entry is not None and now - entry[0] < ttl:
+                    self._images[key] = entry
+                    return entry[1]
+        return None
+
+    def set(self, tenant_id, image):
+        size = getattr(settings, 'IMAGE_CACHE_SIZE', DEFAULT_IMAGE_CACHE_SIZE)
+        if getattr(image, 'is_public', False):
+            tenant_id = None
+        key = (tenant_id, image.id)
+        with self._lock:
+            self._images.pop(key, None)
+            self._images[key] = (time.time(), image)
+            while len(self._images) > size:
+                self._images.popitem(last=False)
+
+    def delete(self, image_id):
+        with self._lock:
+            for key in self._images.keys():
+                if key[1] == image_id:
+                    del self._images[key]
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+
+image_cache = ImageCache()
+
 
 def glanceclient(request):
+    return base.cached_client(request, 'image', _glanceclient)
+
+
+def _glanceclient(request):
     o = urlparse.urlparse(base.url_for(request, 'image'))
     url = "://".join((o.scheme, o.netloc))
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
@@ -49,6 +113,7 @@ def glanceclient(request):
 
 
 def image_delete(request, image_id):
+    image_cache.delete(image_id)
     return glanceclient(request).images.delete(image_id)
 
 
@@ -62,6 +127,40 @@ def image_get(request, image_id):
     return image
 
 
+def image_get_many(request, image_ids):
+    """Returns the images with the given ids, as a dict by id.
+
+    Images are looked up in the image cache first, the missing ones being
+    fetched concurrently and cached. Images which can't be retrieved are
+    left out of the result.
+    """
+    tenant_id = request.user.tenant_id
+    images = {}
+    missing = []
+    for image_id in set(image_ids):
+        image = image_cache.get(tenant_id, image_id)
+        if image is None:
+            missing.append(image_id)
+        else:
+            images[image_id] = image
+    if not missing:
+        return images
+
+    pool = concurrency.get_pool(
+        'glance', getattr(settings, 'GLANCE_WORKERS', DEFAULT_WORKERS))
+    futures = concurrency.gather(
+        pool, lambda image_id: image_get(request, image_id), missing)
+    for image_id, future in zip(missing, futures):
+        if future.exception() is not None:
+            LOG.debug('Unable to retrieve image %s: %s'
+                      % (image_id, future.exception()))
+            continue
+        image = future.result()
+        image_cache.set(tenant_id, image)
+        images[image_id] = image
+    return images
+
+
 def image_list_detailed(request, marker=None, filters=None, paginate=False):
     limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
     page_size = utils.get_page_size(request)
@@ -90,24 +189,124 @@ def image_list_detailed(request, marker=None, filters=None, paginate=False):
 
 
 def image_update(request, image_id, **kwargs):
+    image_cache.delete(image_id)
     return glanceclient(request).images.update(image_id, **kwargs)
 
 
+def _upload_status_key(image_id):
+    return 'glance:upload:%s' % image_id
+
+
+class ImageUpload(object):
+    """The upload of the data of an image, run by the upload workers.
+
+    Uploaded files are read a chunk at a time, from their temporary file
+    when they have one, as Glance consumes them. The progress is published
+    in the Django cache, so that any process can report it, see
+    :func:`image_upload_status`.
+    """
+
+    def __init__(self, request, image_id, data=None, copy_from=None):
+        self.request = request
+        self.image_id = image_id
+        self.tenant_id = request.user.tenant_id
+        self.copy_from = copy_from
+        self.size = getattr(data, 'size', None)
+        self.uploaded = 0
+        self.started = None
+        self._published = 0
+        self._file = data
+        if hasattr(data, 'temporary_file_path'):
+            # Django removes the temporary file at the end of the request,
+            # an open file keeps its data until the upload is done.
+            self._file = open(data.temporary_file_path(), 'rb')
+        self.publish('queued')
+
+    def publish(self, status, error=None):
+        now = time.time()
+        self._published = now
+        elapsed = now - self.started if self.started else 0
+        cache.set(_upload_status_key(self.image_id),
+                  {'status': status,
+                   'tenant_id': self.tenant_id,
+                   'size': self.size,
+                   'uploaded': self.uploaded,
+                   'rate': self.uploaded / elapsed if elapsed else 0,
+                   'error': error},
+                  UPLOAD_STATUS_TTL)
+
+    # The file interface used by glanceclient to send the data.
+    def read(self, size=-1):
+        chunk = self._file.read(size)
+        self.uploaded += len(chunk)
+        if time.time() - self._published >= UPLOAD_STATUS_INTERVAL:
+            self.publish('uploading')
+        return chunk
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def run(self):
+        self.started = time.time()
+        self.publish('uploading')
+        if self.copy_from:
+            kwargs = {'copy_from': self.copy_from}
+        else:
+            kwargs = {'data': self}
+        try:
+            image_update(self.request, self.image_id, purge_props=False,
+                         **kwargs)
+        except Exception as e:
+            LOG.error('Unable to upload the data of image %s: %s'
+                      % (self.image_id, e))
+            self.publish('error', error=unicode(e))
+        else:
+            self.publish('done')
+        finally:
+            if self._file is not None:
+                self._file.close()
+
+
+def image_upload_status(image_id, tenant_id=None):
+    """Returns the progress of the upload of an image, None if unknown.
+
+    The progress is a dict with the ``status`` of the upload (queued,
+    uploading, done or error), the ``tenant_id`` of the project which
+    uploads it, the ``size`` of the data (None if unknown), the number of
+    bytes ``uploaded`` so far, the upload ``rate`` in bytes per second
+    and, for failed uploads, the ``error``.
+
+    When ``tenant_id`` is given, the uploads of other projects are
+    unknown.
+    """
+    status = cache.get(_upload_status_key(image_id))
+    if (status is not None and tenant_id is not None and
+            status.get('tenant_id') != tenant_id):
+        return None
+    return status
+
+
 def image_create(request, **kwargs):
+    """Creates an image, uploading its data in the background.
+
+    The data (or the copy from its location) is queued on a pool of
+    GLANCE_UPLOAD_WORKERS threads per process.
+    """
     copy_from = kwargs.pop('copy_from', None)
     data = kwargs.pop('data', None)
 
     image = glanceclient(request).images.create(**kwargs)
 
-    if data:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'data': data,
-                                 'purge_props': False})
-    elif copy_from:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'copy_from': copy_from,
-                                 'purge_props': False})
+    if data or copy_from:
+        upload = ImageUpload(request, image.id, data=data,
+                             copy_from=copy_from)
+        pool = concurrency.get_pool(
+            'glance_upload',
+            getattr(settings, 'GLANCE_UPLOAD_WORKERS',
+                    DEFAULT_UPLOAD_WORKERS))
+        pool.submit(upload.run)
 
     return image
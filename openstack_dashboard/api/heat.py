@@ -30,6 +30,12 @@ def format_parameters(params):
 
 
 def heatclient(request, password=None):
+    if password is not None:
+        return _heatclient(request, password)
+    return base.cached_client(request, 'orchestration', _heatclient)
+
+
+def _heatclient(request, password=None):
     api_version = "1"
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
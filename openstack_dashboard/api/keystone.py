@@ -35,10 +35,12 @@ from horizon import messages
 from horizon.utils import functions as utils
 
 from openstack_dashboard.api import base
+from openstack_dashboard.utils import concurrency
 
 
 LOG = logging.getLogger(__name__)
 DEFAULT_ROLE = None
+DEFAULT_WORKERS = 10
 
 
 # Set up our data structure for managing Identity API versions, and
@@ -562,6 +564,75 @@ def remove_group_roles(request, group, domain=None, project=None):
                           domain=domain, project=project)
 
 
+def project_role_assignments(request, project, users=None, groups=None):
+    """Returns the roles of the users and groups on a project.
+
+    Returns two dicts, of the sets of the ids of the roles of each user and
+    of each group, by their id. With Keystone v3 both come from a single
+    listing of the role assignments of the project. Otherwise the roles of
+    each of the ``users`` and ``groups`` ids (by default the members of the
+    project and, with v3, all the groups) are listed on their own, on a
+    pool of KEYSTONE_WORKERS threads.
+    """
+    client = keystoneclient(request, admin=True)
+    user_roles = {}
+    group_roles = {}
+    if VERSIONS.active >= 3 and hasattr(client, 'role_assignments'):
+        for assignment in client.role_assignments.list(project=project):
+            role_id = assignment._info['role']['id']
+            if 'user' in assignment._info:
+                user_roles.setdefault(assignment._info['user']['id'],
+                                      set()).add(role_id)
+            elif 'group' in assignment._info:
+                group_roles.setdefault(assignment._info['group']['id'],
+                                       set()).add(role_id)
+        return user_roles, group_roles
+
+    if users is None:
+        users = [user.id for user in user_list(request, project=project)]
+    if groups is None:
+        groups = []
+        if VERSIONS.active >= 3:
+            groups = [group.id for group in group_list(request)]
+    calls = [(user_roles, user_id,
+              lambda user_id=user_id: roles_for_user(request, user_id,
+                                                     project))
+             for user_id in users]
+    calls += [(group_roles, group_id,
+               lambda group_id=group_id: roles_for_group(request,
+                                                         group=group_id,
+                                                         project=project))
+              for group_id in groups]
+    pool = concurrency.get_pool(
+        'keystone', getattr(settings, 'KEYSTONE_WORKERS', DEFAULT_WORKERS))
+    futures = concurrency.gather(pool, lambda call: call[2](), calls)
+    for (roles_by_id, actor_id, call), future in zip(calls, futures):
+        role_ids = set(role.id for role in future.result())
+        if role_ids:
+            roles_by_id[actor_id] = role_ids
+    return user_roles, group_roles
+
+
+def role_assignments_diff(current, requested):
+    """Returns the role assignments to grant and to revoke.
+
+    ``current`` and ``requested`` are dicts of the sets of the ids of the
+    roles of users (or groups), by their id. Returns two sorted lists of
+    (user or group id, role id) pairs: the assignments to grant, missing
+    from ``current``, and those to revoke, missing from ``requested``.
+    """
+    grants = []
+    revokes = []
+    for actor_id in set(current) | set(requested):
+        role_ids = current.get(actor_id, set())
+        requested_ids = requested.get(actor_id, set())
+        grants.extend((actor_id, role_id)
+                      for role_id in requested_ids - role_ids)
+        revokes.extend((actor_id, role_id)
+                       for role_id in role_ids - requested_ids)
+    return sorted(grants), sorted(revokes)
+
+
 def get_default_role(request):
     """Gets the default role object from Keystone and saves it as a global
     since this is configured in settings and should not change from request
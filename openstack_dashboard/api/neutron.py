@@ -35,6 +35,7 @@ from horizon.utils.memoized import memoized  # noqa
 from openstack_dashboard.api import base
 from openstack_dashboard.api import network_base
 from openstack_dashboard.api import nova
+from openstack_dashboard.utils import concurrency
 
 from neutronclient.v2_0 import client as neutron_client
 
@@ -42,6 +43,9 @@ LOG = logging.getLogger(__name__)
 
 IP_VERSION_DICT = {4: 'IPv4', 6: 'IPv6'}
 
+DEFAULT_WORKERS = 10
+DEFAULT_SUBNET_ID_BATCH_SIZE = 100
+
 
 class NeutronAPIDictWrapper(base.APIDictWrapper):
 
@@ -429,6 +433,10 @@ def get_ipver_str(ip_version):
 
 
 def neutronclient(request):
+    return base.cached_client(request, 'network', _neutronclient)
+
+
+def _neutronclient(request):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('neutronclient connection created using token "%s" and url "%s"'
@@ -442,15 +450,42 @@ def neutronclient(request):
     return c
 
 
-def network_list(request, **params):
+def _call(func):
+    return func()
+
+
+def _subnet_index(request, subnet_ids):
+    """Returns the subnets with the given ids, by id.
+
+    The subnets are asked for by id, SUBNET_ID_BATCH_SIZE ids per call to
+    keep the URLs short, instead of listing every subnet of the cloud.
+    """
+    subnet_ids = sorted(set(subnet_ids))
+    batch_size = getattr(settings, 'SUBNET_ID_BATCH_SIZE',
+                         DEFAULT_SUBNET_ID_BATCH_SIZE)
+    index = {}
+    for start in range(0, len(subnet_ids), batch_size):
+        subnets = subnet_list(request,
+                              id=subnet_ids[start:start + batch_size])
+        index.update((subnet.id, subnet) for subnet in subnets)
+    return index
+
+
+def network_list(request, subnet_index=None, **params):
+    """Returns the networks, with their subnets expanded.
+
+    The subnets are taken from ``subnet_index``, a dict of subnets by id,
+    when the caller already has them. Otherwise only the subnets of the
+    returned networks are retrieved.
+    """
     LOG.debug("network_list(): params=%s" % (params))
     networks = neutronclient(request).list_networks(**params).get('networks')
-    # Get subnet list to expand subnet info in network list.
-    subnets = subnet_list(request)
-    subnet_dict = SortedDict([(s['id'], s) for s in subnets])
+    if subnet_index is None:
+        subnet_index = _subnet_index(
+            request, [s for n in networks for s in n.get('subnets', [])])
     # Expand subnet list from subnet_id to values.
     for n in networks:
-        n['subnets'] = [subnet_dict.get(s) for s in n.get('subnets', [])]
+        n['subnets'] = [subnet_index.get(s) for s in n.get('subnets', [])]
     return [Network(n) for n in networks]
 
 
@@ -465,14 +500,17 @@ def network_list_for_tenant(request, tenant_id, **params):
     # If a user has admin role, network list returned by Neutron API
     # contains networks that do not belong to that tenant.
     # So we need to specify tenant_id when calling network_list().
-    networks = network_list(request, tenant_id=tenant_id,
-                            shared=False, **params)
-
     # In the current Neutron API, there is no way to retrieve
-    # both owner networks and public networks in a single API call.
-    networks += network_list(request, shared=True, **params)
-
-    return networks
+    # both owner networks and public networks in a single API call,
+    # the two calls are made concurrently.
+    calls = (lambda: network_list(request, tenant_id=tenant_id,
+                                  shared=False, **params),
+             lambda: network_list(request, shared=True, **params))
+    pool = concurrency.get_pool(
+        'neutron', getattr(settings, 'NEUTRON_WORKERS', DEFAULT_WORKERS))
+    owned, shared = [future.result()
+                     for future in concurrency.gather(pool, _call, calls)]
+    return owned + shared
 
 
 def network_get(request, network_id, expand_subnet=True, **params):
@@ -756,10 +794,16 @@ def servers_update_addresses(request, servers):
     try:
         ports = port_list(request,
                           device_id=[instance.id for instance in servers])
-        floating_ips = FloatingIpManager(request).list(
-            port_id=[port.id for port in ports])
-        networks = network_list(request,
-                                id=[port.network_id for port in ports])
+        port_ids = [port.id for port in ports]
+        network_ids = [port.network_id for port in ports]
+        # The floating IPs and networks only depend on the ports.
+        calls = (lambda: FloatingIpManager(request).list(port_id=port_ids),
+                 lambda: network_list(request, id=network_ids))
+        pool = concurrency.get_pool(
+            'neutron', getattr(settings, 'NEUTRON_WORKERS', DEFAULT_WORKERS))
+        floating_ips, networks = [
+            future.result()
+            for future in concurrency.gather(pool, _call, calls)]
     except Exception:
         error_message = _('Unable to connect to Neutron.')
         LOG.error(error_message)
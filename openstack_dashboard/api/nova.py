@@ -23,11 +23,16 @@
 from __future__ import absolute_import
 
 import logging
+import threading
+import time
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.functional import cached_property  # noqa
 from django.utils.translation import ugettext_lazy as _
 
+from novaclient import exceptions as nova_exceptions
 from novaclient.v1_1 import client as nova_client
 from novaclient.v1_1.contrib import list_extensions as nova_list_extensions
 from novaclient.v1_1 import security_group_rules as nova_rules
@@ -40,6 +45,7 @@ from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import network_base
+from openstack_dashboard.utils import concurrency
 
 
 LOG = logging.getLogger(__name__)
@@ -50,6 +56,12 @@ INSTANCE_ACTIVE_STATE = 'ACTIVE'
 VOLUME_STATE_AVAILABLE = "available"
 DEFAULT_QUOTA_NAME = 'default'
 
+DEFAULT_AGGREGATE_CACHE_TTL = 30
+DEFAULT_FLAVOR_CACHE_TTL = 3600
+DEFAULT_WORKERS = 10
+AGGREGATE_VERSION_KEY = 'nova:aggregates:version'
+FLAVOR_VERSION_KEY = 'nova:flavors:version'
+
 
 class VNCConsole(base.APIDictWrapper):
     """Wrapper for the "console" dictionary returned by the
@@ -370,6 +382,10 @@ class FloatingIpManager(network_base.FloatingIpManager):
 
 
 def novaclient(request):
+    return base.cached_client(request, 'compute', _novaclient)
+
+
+def _novaclient(request):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('novaclient connection created using token "%s" and url "%s"' %
@@ -401,12 +417,72 @@ def server_rdp_console(request, instance_id, console_type='rdp-html5'):
         instance_id, console_type)['console'])
 
 
+class FlavorCatalog(object):
+    """A process wide cache of flavors, by compute endpoint and id.
+
+    Flavor ids are only unique within a compute endpoint, so each region
+    has its own flavors. Public flavors are shared by all the projects.
+    Private flavors, and flavors which don't exist (cached as None), are
+    only cached for the project which looked them up, as other projects
+    may not have access to them. The catalog is emptied whenever the
+    flavor version, shared by all the processes through the Django cache,
+    changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flavors = {}
+        self._version = None
+
+    def check_version(self):
+        version = cache.get(FLAVOR_VERSION_KEY)
+        with self._lock:
+            if version != self._version:
+                self._flavors.clear()
+                self._version = version
+
+    def get(self, endpoint, tenant_id, flavor_id):
+        """Returns ``(found, flavor)``, flavor being None if it's missing."""
+        ttl = getattr(settings, 'FLAVOR_CACHE_TTL', DEFAULT_FLAVOR_CACHE_TTL)
+        now = time.time()
+        with self._lock:
+            for key in ((endpoint, flavor_id),
+                        (endpoint, tenant_id, flavor_id)):
+                entry = self._flavors.get(key)
+                if entry is not None and now - entry[0] < ttl:
+                    return True, entry[1]
+        return False, None
+
+    def set(self, endpoint, tenant_id, flavor_id, flavor):
+        # novaclient reports 'N/A' when flavor access isn't enabled.
+        if flavor is not None and getattr(flavor, 'is_public', None) is True:
+            key = (endpoint, flavor_id)
+        else:
+            key = (endpoint, tenant_id, flavor_id)
+        with self._lock:
+            self._flavors[key] = (time.time(), flavor)
+
+    def clear(self):
+        with self._lock:
+            self._flavors.clear()
+
+
+flavor_catalog = FlavorCatalog()
+
+
+def invalidate_flavor_catalog():
+    """Empties the flavor catalogs of all the processes."""
+    cache.set(FLAVOR_VERSION_KEY, uuid.uuid4().hex, None)
+    flavor_catalog.clear()
+
+
 def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
                   ephemeral=0, swap=0, metadata=None, is_public=True):
     flavor = novaclient(request).flavors.create(name, memory, vcpu, disk,
                                                 flavorid=flavorid,
                                                 ephemeral=ephemeral,
                                                 swap=swap, is_public=is_public)
+    invalidate_flavor_catalog()
     if (metadata):
         flavor_extra_set(request, flavor.id, metadata)
     return flavor
@@ -414,12 +490,58 @@ def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
 
 def flavor_delete(request, flavor_id):
     novaclient(request).flavors.delete(flavor_id)
+    invalidate_flavor_catalog()
 
 
 def flavor_get(request, flavor_id):
     return novaclient(request).flavors.get(flavor_id)
 
 
+def flavor_get_many(request, flavor_ids):
+    """Returns the flavors with the given ids, as a dict by id.
+
+    Flavors are looked up in the flavor catalog first, the missing ones
+    being fetched concurrently and cached. Flavors which don't exist are
+    None in the result, and cached as such. Any other error retrieving a
+    flavor is raised, once the flavors retrieved have been cached.
+    """
+    endpoint = base.url_for(request, 'compute')
+    tenant_id = request.user.tenant_id
+    flavor_catalog.check_version()
+    flavors = {}
+    missing = []
+    for flavor_id in flavor_ids:
+        if flavor_id in flavors or flavor_id in missing:
+            continue
+        found, flavor = flavor_catalog.get(endpoint, tenant_id, flavor_id)
+        if found:
+            flavors[flavor_id] = flavor
+        else:
+            missing.append(flavor_id)
+    if not missing:
+        return flavors
+
+    pool = concurrency.get_pool(
+        'nova', getattr(settings, 'NOVA_WORKERS', DEFAULT_WORKERS))
+    futures = concurrency.gather(
+        pool, lambda flavor_id: flavor_get(request, flavor_id), missing)
+    error = None
+    for flavor_id, future in zip(missing, futures):
+        exc = future.exception()
+        if exc is None:
+            flavors[flavor_id] = future.result()
+        elif isinstance(exc, nova_exceptions.NotFound):
+            flavors[flavor_id] = None
+        else:
+            error = error or exc
+            continue
+        flavor_catalog.set(endpoint, tenant_id, flavor_id,
+                           flavors[flavor_id])
+    if error is not None:
+        raise error
+    return flavors
+
+
 @memoized
 def flavor_list(request, is_public=True):
     """Get the list of available instance sizes (flavors)."""
@@ -694,7 +816,64 @@ def tenant_absolute_limits(request, reserved=False):
     return limits_dict
 
 
+class AggregateCache(object):
+    """Aggregates and detailed availability zones, kept a few seconds.
+
+    Both are admin listings, the same for every admin of a region, so they
+    are cached by compute endpoint for AGGREGATE_CACHE_TTL seconds. Only
+    the requests of admins are served from the cache, the others always
+    get the listings Nova returns for them. The cache is emptied whenever
+    the aggregate version, shared by all the processes through the Django
+    cache, changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+
+    def get(self, request, name, func):
+        """Returns the cached result of ``func``, calling it if needed."""
+        ttl = getattr(settings, 'AGGREGATE_CACHE_TTL',
+                      DEFAULT_AGGREGATE_CACHE_TTL)
+        if not ttl or not request.user.is_superuser:
+            return func()
+        key = (base.url_for(request, 'compute'), name)
+        version = cache.get(AGGREGATE_VERSION_KEY)
+        now = time.time()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                return list(entry[1])
+
+        result = func()
+        with self._lock:
+            self._entries[key] = (now, result)
+        return list(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+aggregate_cache = AggregateCache()
+
+
+def invalidate_aggregate_cache():
+    """Empties the aggregate caches of all the processes."""
+    cache.set(AGGREGATE_VERSION_KEY, uuid.uuid4().hex, None)
+    aggregate_cache.clear()
+
+
 def availability_zone_list(request, detailed=False):
+    if detailed:
+        return aggregate_cache.get(
+            request, 'zones',
+            lambda: novaclient(request).availability_zones.list(
+                detailed=True))
     return novaclient(request).availability_zones.list(detailed=detailed)
 
 
@@ -702,20 +881,37 @@ def service_list(request):
     return novaclient(request).services.list()
 
 
+def _aggregate_details_list(request):
+    aggregates = novaclient(request).aggregates.list()
+    pool = concurrency.get_pool(
+        'nova', getattr(settings, 'NOVA_WORKERS', DEFAULT_WORKERS))
+    futures = concurrency.gather(
+        pool,
+        lambda aggregate: novaclient(request).aggregates.get_details(
+            aggregate.id),
+        aggregates)
+    return [future.result() for future in futures]
+
+
 def aggregate_details_list(request):
-    result = []
-    c = novaclient(request)
-    for aggregate in c.aggregates.list():
-        result.append(c.aggregates.get_details(aggregate.id))
-    return result
+    """Returns the aggregates with their details, see :class:`AggregateCache`.
+
+    The details of the aggregates are fetched concurrently.
+    """
+    return aggregate_cache.get(request, 'aggregates',
+                               lambda: _aggregate_details_list(request))
 
 
 def aggregate_create(request, name, availability_zone=None):
-    return novaclient(request).aggregates.create(name, availability_zone)
+    aggregate = novaclient(request).aggregates.create(name, availability_zone)
+    invalidate_aggregate_cache()
+    return aggregate
 
 
 def aggregate_delete(request, aggregate_id):
-    return novaclient(request).aggregates.delete(aggregate_id)
+    result = novaclient(request).aggregates.delete(aggregate_id)
+    invalidate_aggregate_cache()
+    return result
 
 
 def aggregate_get(request, aggregate_id):
@@ -723,7 +919,9 @@ def aggregate_get(request, aggregate_id):
 
 
 def aggregate_update(request, aggregate_id, values):
-    return novaclient(request).aggregates.update(aggregate_id, values)
+    aggregate = novaclient(request).aggregates.update(aggregate_id, values)
+    invalidate_aggregate_cache()
+    return aggregate
 
 
 def host_list(request):
@@ -731,11 +929,15 @@ def host_list(request):
 
 
 def add_host_to_aggregate(request, aggregate_id, host):
-    return novaclient(request).aggregates.add_host(aggregate_id, host)
+    aggregate = novaclient(request).aggregates.add_host(aggregate_id, host)
+    invalidate_aggregate_cache()
+    return aggregate
 
 
 def remove_host_from_aggregate(request, aggregate_id, host):
-    return novaclient(request).aggregates.remove_host(aggregate_id, host)
+    aggregate = novaclient(request).aggregates.remove_host(aggregate_id, host)
+    invalidate_aggregate_cache()
+    return aggregate
 
 
 @memoized
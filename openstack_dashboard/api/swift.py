@@ -310,10 +310,24 @@ def swift_delete_object(request, container_name, object_name):
     return True
 
 
-def swift_get_object(request, container_name, object_name, with_data=True):
+def swift_get_object(request, container_name, object_name, with_data=True,
+                     resp_chunk_size=None, byte_range=None):
+    """Returns an object, with its data unless ``with_data`` is False.
+
+    With a ``resp_chunk_size``, the data is an iterator over chunks of that
+    many bytes, read from Swift as it is consumed. ``byte_range`` is the
+    value of a Range header, to get only part of the data: the
+    ``content_range`` of the object is then set.
+    """
     if with_data:
+        kwargs = {}
+        if resp_chunk_size:
+            kwargs['resp_chunk_size'] = resp_chunk_size
+        if byte_range:
+            kwargs['headers'] = {'Range': byte_range}
         headers, data = swift_api(request).get_object(container_name,
-                                                      object_name)
+                                                      object_name,
+                                                      **kwargs)
     else:
         data = None
         headers = swift_api(request).head_object(container_name,
@@ -331,6 +345,7 @@ def swift_get_object(request, container_name, object_name, with_data=True):
         'content_type': headers.get('content-type'),
         'etag': headers.get('etag'),
         'timestamp': timestamp,
+        'content_range': headers.get('content-range'),
     }
     return StorageObject(obj_info,
                          container_name,
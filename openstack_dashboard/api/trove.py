@@ -27,6 +27,10 @@ LOG = logging.getLogger(__name__)
 
 
 def troveclient(request):
+    return base.cached_client(request, 'database', _troveclient)
+
+
+def _troveclient(request):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     trove_url = base.url_for(request, 'database')
@@ -21,9 +21,91 @@
 Context processors used by Horizon.
 """
 
+import logging
+import os
+import threading
+import time
+
 from django.conf import settings
 
 
+LOG = logging.getLogger(__name__)
+
+DEFAULT_ADMIN_NOTICE_FILE = '/etc/openstack-dashboard/admin-notice.txt'
+DEFAULT_ADMIN_NOTICE_CHECK_INTERVAL = 5
+
+
+class FileLine(object):
+    """The first line of a file, read again only when the file changes.
+
+    The modification time of the file is checked at most every ``interval``
+    seconds. A missing or unreadable file reads as an empty string.
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._line = ''
+        self._mtime = None
+        self._checked = None
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._line, self._mtime = '', None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path) as f:
+                self._line = f.readline().strip()
+            self._mtime = mtime
+        except IOError as e:
+            LOG.warning('Unable to read %s: %s' % (self.path, e))
+            self._line, self._mtime = '', None
+
+    def get(self):
+        now = time.time()
+        if self._checked is None or now - self._checked >= self.interval:
+            with self._lock:
+                if (self._checked is None or
+                        now - self._checked >= self.interval):
+                    self._reload()
+                    self._checked = now
+        return self._line
+
+
+_admin_notice = None
+_regions = None
+
+
+def get_admin_notice():
+    """Returns the notice shown to all the users, from ADMIN_NOTICE_FILE."""
+    global _admin_notice
+    path = getattr(settings, 'ADMIN_NOTICE_FILE', DEFAULT_ADMIN_NOTICE_FILE)
+    if _admin_notice is None or _admin_notice.path != path:
+        _admin_notice = FileLine(path, getattr(
+            settings, 'ADMIN_NOTICE_CHECK_INTERVAL',
+            DEFAULT_ADMIN_NOTICE_CHECK_INTERVAL))
+    return _admin_notice.get()
+
+
+def get_available_regions():
+    """Returns whether regions are supported, and the available regions.
+
+    Built once from the AVAILABLE_REGIONS setting, which doesn't change.
+    """
+    global _regions
+    if _regions is None:
+        available_regions = getattr(settings, 'AVAILABLE_REGIONS', [])
+        _regions = (len(available_regions) > 1,
+                    [{'endpoint': region[0], 'name': region[1]}
+                     for region in available_regions])
+    return _regions
+
+
 def openstack(request):
     """Context processor necessary for OpenStack Dashboard functionality.
 
@@ -36,6 +118,9 @@ def openstack(request):
 
         A dictionary containing information about region support, the current
         region, and available regions.
+
+    ``admin_notice``
+        The first line of ADMIN_NOTICE_FILE, or an empty string.
     """
     context = {}
 
@@ -45,21 +130,14 @@ def openstack(request):
         context['authorized_tenants'] = request.user.authorized_tenants
 
     # Region context/support
-    available_regions = getattr(settings, 'AVAILABLE_REGIONS', [])
-    regions = {'support': len(available_regions) > 1,
+    support, available = get_available_regions()
+    regions = {'support': support,
                'current': {'endpoint': request.session.get('region_endpoint'),
                            'name': request.session.get('region_name')},
-               'available': [{'endpoint': region[0], 'name':region[1]} for
-                             region in available_regions]}
+               'available': available}
     context['regions'] = regions
 
     # JT
-    admin_notice = ''
-    context['admin_notice'] = ''
-    with open('/etc/openstack-dashboard/admin-notice.txt') as f:
-        admin_notice = f.readline().strip()
-
-    if admin_notice != '':
-        context['admin_notice'] = admin_notice
+    context['admin_notice'] = get_admin_notice()
 
     return context
@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.conf import settings
 from django.core.urlresolvers import reverse_lazy
 from django.utils.translation import ugettext_lazy as _
 
@@ -27,9 +28,11 @@ from openstack_dashboard.dashboards.admin.aggregates \
     import tables as project_tables
 from openstack_dashboard.dashboards.admin.aggregates \
     import workflows as aggregate_workflows
+from openstack_dashboard.utils import concurrency
 
 
 INDEX_URL = constants.AGGREGATES_INDEX_URL
+DEFAULT_WORKERS = 4
 
 
 class IndexView(tables.MultiTableView):
@@ -37,11 +40,29 @@ class IndexView(tables.MultiTableView):
                      project_tables.AvailabilityZonesTable)
     template_name = constants.AGGREGATES_TEMPLATE_NAME
 
+    def _fetch(self):
+        """Fetches the aggregates and the zones concurrently, once.
+
+        The calls run on a pool of AGGREGATES_INDEX_WORKERS threads per
+        process.
+        """
+        if not hasattr(self, '_futures'):
+            pool = concurrency.get_pool(
+                'aggregates_index',
+                getattr(settings, 'AGGREGATES_INDEX_WORKERS',
+                        DEFAULT_WORKERS))
+            calls = (lambda: api.nova.aggregate_details_list(self.request),
+                     lambda: api.nova.availability_zone_list(self.request,
+                                                             detailed=True))
+            self._futures = concurrency.gather(pool, lambda call: call(),
+                                               calls)
+        return self._futures
+
     def get_host_aggregates_data(self):
         request = self.request
         aggregates = []
         try:
-            aggregates = api.nova.aggregate_details_list(self.request)
+            aggregates = self._fetch()[0].result()
         except Exception:
             exceptions.handle(request,
                               _('Unable to retrieve host aggregates list.'))
@@ -52,8 +73,7 @@ class IndexView(tables.MultiTableView):
         request = self.request
         availability_zones = []
         try:
-            availability_zones = \
-                api.nova.availability_zone_list(self.request, detailed=True)
+            availability_zones = self._fetch()[1].result()
         except Exception:
             exceptions.handle(request,
                               _('Unable to retrieve availability zone list.'))
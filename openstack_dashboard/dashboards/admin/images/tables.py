@@ -47,6 +47,7 @@ class UpdateRow(tables.Row):
 
     def get_data(self, request, image_id):
         image = api.glance.image_get(request, image_id)
+        image.upload = api.glance.image_upload_status(image_id)
         return image
 
 
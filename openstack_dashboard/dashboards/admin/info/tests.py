@@ -14,6 +14,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 from django.core.urlresolvers import reverse
 from django import http
 from mox import IgnoreArg  # noqa
@@ -136,3 +138,13 @@ class SystemInfoViewTests(test.BaseAdminViewTests):
         self.assertQuerysetEqual(quotas_tab._tables['quotas'].data,
                                  expected_tabs,
                                  ordered=False)
+
+    def test_client_stats(self):
+        self.mox.StubOutWithMock(api.base, 'client_stats')
+        stats = {'compute': {'hits': 3, 'misses': 1, 'evictions': 0}}
+        api.base.client_stats().AndReturn(stats)
+        self.mox.ReplayAll()
+
+        res = self.client.get(reverse('horizon:admin:info:client_stats'))
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(stats, json.loads(res.content))
@@ -25,4 +25,6 @@ from openstack_dashboard.dashboards.admin.info import views
 
 
 urlpatterns = patterns('openstack_dashboard.dashboards.admin.info.views',
-    url(r'^$', views.IndexView.as_view(), name='index'))
+    url(r'^$', views.IndexView.as_view(), name='index'),
+    url(r'^client_stats$', views.ClientStatsView.as_view(),
+        name='client_stats'))
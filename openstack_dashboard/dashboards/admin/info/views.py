@@ -16,8 +16,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
+from django import http
+from django.views import generic
+
 from horizon import tabs
 
+from openstack_dashboard import api
 from openstack_dashboard.dashboards.admin.info import constants
 from openstack_dashboard.dashboards.admin.info import tabs as project_tabs
 
@@ -25,3 +31,13 @@ from openstack_dashboard.dashboards.admin.info import tabs as project_tabs
 class IndexView(tabs.TabbedTableView):
     tab_group_class = project_tabs.SystemInfoTabs
     template_name = constants.INFO_TEMPLATE_NAME
+
+
+class ClientStatsView(generic.View):
+    """Returns the reuse counts of the API clients of the process, as JSON
+    by service.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return http.HttpResponse(json.dumps(api.base.client_stats()),
+                                 content_type='application/json')
@@ -74,6 +74,9 @@ class LiveMigrateInstance(tables.LinkAction):
 
 
 class AdminUpdateRow(project_tables.UpdateRow):
+    # The batched row updates only know the instances of the project.
+    batch_update_url = None
+
     def get_data(self, request, instance_id):
         instance = super(AdminUpdateRow, self).get_data(request, instance_id)
         tenant = api.keystone.tenant_get(request,
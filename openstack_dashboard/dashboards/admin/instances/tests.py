@@ -22,6 +22,7 @@ from django.utils.datastructures import SortedDict
 
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
@@ -77,9 +78,9 @@ class InstanceViewTest(test.BaseAdminViewTests):
                             AndRaise(self.exceptions.nova)
         api.keystone.tenant_list(IsA(http.HttpRequest)).\
                                  AndReturn([tenants, False])
-        for server in servers:
-            api.nova.flavor_get(IsA(http.HttpRequest), server.flavor["id"]). \
-                AndReturn(full_flavors[server.flavor["id"]])
+        for flavor_id in set(server.flavor["id"] for server in servers):
+            api.nova.flavor_get(IsA(http.HttpRequest), flavor_id) \
+                .InAnyOrder().AndReturn(full_flavors[flavor_id])
 
         self.mox.ReplayAll()
 
@@ -114,21 +115,28 @@ class InstanceViewTest(test.BaseAdminViewTests):
                                  AndReturn([tenants, False])
         for server in servers:
             api.nova.flavor_get(IsA(http.HttpRequest), server.flavor["id"]). \
-                AndRaise(self.exceptions.nova)
+                AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
         self.mox.ReplayAll()
 
         res = self.client.get(INDEX_URL)
         instances = res.context['table'].data
         self.assertTemplateUsed(res, 'admin/instances/index.html')
-        self.assertMessageCount(res, error=len(servers))
+        # The missing flavors are reported once for the page.
+        self.assertMessageCount(res, error=1)
         self.assertItemsEqual(instances, servers)
 
-    @test.create_stubs({api.nova: ('server_list',)})
+    @test.create_stubs({api.nova: ('server_list', 'flavor_list',),
+                        api.keystone: ('tenant_list',)})
     def test_index_server_list_exception(self):
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest),
                              all_tenants=True, search_opts=search_opts) \
                                 .AndRaise(self.exceptions.nova)
+        # The flavors and tenants are fetched along with the instances.
+        api.nova.flavor_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.flavors.list())
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
 
         self.mox.ReplayAll()
 
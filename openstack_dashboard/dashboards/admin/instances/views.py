@@ -26,6 +26,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
 from horizon import forms
+from horizon import messages
 from horizon import tables
 from horizon.utils import memoized
 
@@ -37,6 +38,7 @@ from openstack_dashboard.dashboards.admin.instances \
 from openstack_dashboard.dashboards.project.instances import views
 from openstack_dashboard.dashboards.project.instances.workflows \
     import update_instance
+from openstack_dashboard.utils import lookups
 
 
 # re-use console from project.instances.views to make reflection work
@@ -70,60 +72,81 @@ class AdminIndexView(tables.DataTableView):
     def has_more_data(self, table):
         return self._more
 
+    def _update_addresses(self, result):
+        instances, more = result
+        if instances:
+            api.network.servers_update_addresses(self.request, instances)
+
     def get_data(self):
         instances = []
         marker = self.request.GET.get(
             project_tables.AdminInstancesTable._meta.pagination_param, None)
+        # Gather our instances, their addresses, flavors and tenants
+        # concurrently.
+        graph = views.index_task_graph()
+        graph.add('instances', lambda: api.nova.server_list(
+            self.request,
+            search_opts={'marker': marker,
+                         'paginate': True},
+            all_tenants=True))
+        graph.add('addresses', self._update_addresses,
+                  requires=('instances',))
+        graph.add('flavors', lambda: api.nova.flavor_list(self.request))
+        graph.add('tenants', lambda: lookups.project_index(self.request))
+        results = graph.run()
+
         try:
-            instances, self._more = api.nova.server_list(
-                self.request,
-                search_opts={'marker': marker,
-                             'paginate': True},
-                all_tenants=True)
+            instances, self._more = results['instances'].result()
         except Exception:
             self._more = False
             exceptions.handle(self.request,
                               _('Unable to retrieve instance list.'))
         if instances:
             try:
-                api.network.servers_update_addresses(self.request, instances)
+                results['addresses'].result()
             except Exception:
                 exceptions.handle(
                     self.request,
                     message=_('Unable to retrieve IP addresses from Neutron.'),
                     ignore=True)
 
-            # Gather our flavors to correlate against IDs
+            # Correlate our instances to their flavors
             try:
-                flavors = api.nova.flavor_list(self.request)
+                flavors = results['flavors'].result()
             except Exception:
                 # If fails to retrieve flavor list, creates an empty list.
                 flavors = []
 
-            # Gather our tenants to correlate against IDs
+            # Correlate our instances to their tenants
             try:
-                tenants, has_more = api.keystone.tenant_list(self.request)
+                tenant_dict = results['tenants'].result()
             except Exception:
-                tenants = []
+                tenant_dict = {}
                 msg = _('Unable to retrieve instance project information.')
                 exceptions.handle(self.request, msg)
 
             full_flavors = SortedDict([(f.id, f) for f in flavors])
-            tenant_dict = SortedDict([(t.id, t) for t in tenants])
+            size_msg = _('Unable to retrieve instance size information.')
+            # Get the flavors missing from the list via nova api, at once.
+            try:
+                full_flavors.update(api.nova.flavor_get_many(
+                    self.request,
+                    [inst.flavor["id"] for inst in instances
+                     if inst.flavor["id"] not in full_flavors]))
+                missing_flavors = False
+            except Exception:
+                # Reported once for the page, not for each instance.
+                missing_flavors = True
+                exceptions.handle(self.request, size_msg)
             # Loop through instances to get flavor and tenant info.
             for inst in instances:
-                flavor_id = inst.flavor["id"]
-                try:
-                    if flavor_id in full_flavors:
-                        inst.full_flavor = full_flavors[flavor_id]
-                    else:
-                        # If the flavor_id is not in full_flavors list,
-                        # gets it via nova api.
-                        inst.full_flavor = api.nova.flavor_get(
-                            self.request, flavor_id)
-                except Exception:
-                    msg = _('Unable to retrieve instance size information.')
-                    exceptions.handle(self.request, msg)
+                flavor = full_flavors.get(inst.flavor["id"])
+                if flavor is None:
+                    if not missing_flavors:
+                        missing_flavors = True
+                        messages.error(self.request, size_msg)
+                else:
+                    inst.full_flavor = flavor
                 tenant = tenant_dict.get(inst.tenant_id, None)
                 inst.tenant_name = getattr(tenant, "name", None)
         return instances
@@ -67,9 +67,7 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
     def test_stats_for_line_chart(self):
         statistics = self.statistics.list()
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False) \
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
             .AndReturn([self.tenants.list(), False])
 
         ceilometerclient = self.stub_ceilometerclient()
@@ -98,9 +96,7 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
     def test_stats_for_line_chart_attr_max(self):
         statistics = self.statistics.list()
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False) \
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
             .AndReturn([self.tenants.list(), False])
 
         ceilometerclient = self.stub_ceilometerclient()
@@ -153,17 +149,13 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
         self._verify_series(res._container[0], 4.55, '2012-12-21T11:00:55',
                             expected_names)
 
-    @test.create_stubs({api.keystone: ('tenant_list',)})
-    def test_report(self):
+    def _stub_report(self):
         meters = self.meters.list()
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.meters = self.mox.CreateMockAnything()
         ceilometerclient.meters.list(None).AndReturn(meters)
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False). \
-            MultipleTimes()\
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
             .AndReturn([self.tenants.list(), False])
 
         statistics = self.statistics.list()
@@ -185,11 +177,58 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
         self.mox.ReplayAll()
 
+        # One row per meter, project and statistic.
+        return 3 * len(self.tenants.list()) * len(statistics)
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_report(self):
+        self._stub_report()
+
         # generate report with mock data
         res = self.client.post(reverse('horizon:admin:metering:report'),
                                data={"date_options": "7"})
 
         self.assertTemplateUsed(res, 'admin/metering/report.html')
+        # One table per project, the tenants being listed only once.
+        self.assertEqual(len(self.tenants.list()),
+                         len(res.context['tables']))
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_report_export_csv(self):
+        row_count = self._stub_report()
+
+        res = self.client.post(reverse('horizon:admin:metering:report_export'),
+                               data={"date_options": "7", "format": "csv"})
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        lines = ''.join(res.streaming_content).splitlines()
+        self.assertEqual(lines[0],
+                         'Project,Service,Meter,Description,Day,'
+                         'Value (Avg),Unit')
+        self.assertEqual(row_count, len(lines) - 1)
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_report_export_json(self):
+        row_count = self._stub_report()
+
+        res = self.client.get(reverse('horizon:admin:metering:report_export'),
+                              {"date_options": "7", "format": "json"})
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line)
+                for line in ''.join(res.streaming_content).splitlines()]
+        self.assertEqual(row_count, len(rows))
+        self.assertEqual(self.tenants.first().name, rows[0]['project'])
+
+
+    def test_report_export_invalid_dates(self):
+        res = self.client.get(reverse('horizon:admin:metering:report_export'),
+                              {"date_options": "other",
+                               "date_from": "not a date"})
+
+        self.assertRedirectsNoFollow(res, INDEX_URL)
 
 
 class MeteringStatsTabTests(test.APITestCase):
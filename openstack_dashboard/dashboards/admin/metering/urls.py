@@ -20,4 +20,6 @@ from openstack_dashboard.dashboards.admin.metering import views
 urlpatterns = patterns('openstack_dashboard.dashboards.admin.metering.views',
     url(r'^$', views.IndexView.as_view(), name='index'),
     url(r'^samples$', views.SamplesView.as_view(), name='samples'),
-    url(r'^report$', views.ReportView.as_view(), name='report'))
+    url(r'^report$', views.ReportView.as_view(), name='report'),
+    url(r'^report/export$', views.ReportExportView.as_view(),
+        name='report_export'))
@@ -15,24 +15,34 @@
 from datetime import datetime  # noqa
 from datetime import timedelta  # noqa
 
+import itertools
 import json
+import logging
 
+from django.core.urlresolvers import reverse
 from django.http import HttpResponse   # noqa
+from django.http import HttpResponseRedirect   # noqa
+from django.http import StreamingHttpResponse   # noqa
 from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import TemplateView  # noqa
 
 from horizon import exceptions
+from horizon import messages
 from horizon import tables
 from horizon import tabs
+from horizon.utils import csvbase
 
-from openstack_dashboard import api
 from openstack_dashboard.api import ceilometer
 
 from openstack_dashboard.dashboards.admin.metering import tables as \
     metering_tables
 from openstack_dashboard.dashboards.admin.metering import tabs as \
     metering_tabs
+from openstack_dashboard.utils import lookups
+
+
+LOG = logging.getLogger(__name__)
 
 
 class IndexView(tabs.TabbedTableView):
@@ -125,47 +135,12 @@ class ReportView(tables.MultiTableView):
         return handled
 
     def load_data(self, request):
-        meters = ceilometer.Meters(request)
-        services = {
-            _('Nova'): meters.list_nova(),
-            _('Neutron'): meters.list_neutron(),
-            _('Glance'): meters.list_glance(),
-            _('Cinder'): meters.list_cinder(),
-            _('Swift_meters'): meters.list_swift(),
-            _('Kwapi'): meters.list_kwapi(),
-        }
         project_rows = {}
-        date_options = request.POST.get('date_options', None)
-        date_from = request.POST.get('date_from', None)
-        date_to = request.POST.get('date_to', None)
-        for meter in meters._cached_meters.values():
-            for name, m_list in services.items():
-                if meter in m_list:
-                    service = name
-            # show detailed samples
-            # samples = ceilometer.sample_list(request, meter.name)
-            res, unit = query_data(request,
-                                   date_from,
-                                   date_to,
-                                   date_options,
-                                   "project",
-                                   meter.name,
-                                   3600 * 24)
-            for re in res:
-                values = getattr(re, meter.name.replace(".", "_"))
-                if values:
-                    for value in values:
-                        row = {"name": 'none',
-                               "project": re.id,
-                               "meter": meter.name,
-                               "description": meter.description,
-                               "service": service,
-                               "time": value._apiresource.period_end,
-                               "value": value._apiresource.avg}
-                        if re.id not in project_rows:
-                            project_rows[re.id] = [row]
-                        else:
-                            project_rows[re.id].append(row)
+        for row in report_rows(request,
+                               request.POST.get('date_options', None),
+                               request.POST.get('date_from', None),
+                               request.POST.get('date_to', None)):
+            project_rows.setdefault(row['project'], []).append(row)
         return project_rows
 
     def get_context_data(self, **kwargs):
@@ -174,6 +149,58 @@ class ReportView(tables.MultiTableView):
         return context
 
 
+class ReportCsvRenderer(csvbase.BaseCsvStreamingResponse):
+
+    columns = [_("Project"), _("Service"), _("Meter"), _("Description"),
+               _("Day"), _("Value (Avg)"), _("Unit")]
+
+    def get_row_data(self):
+        for row in self.context['rows']:
+            yield (row['project'],
+                   row['service'],
+                   row['meter'],
+                   row['description'],
+                   metering_tables.show_date(row['time']),
+                   row['value'],
+                   row['unit'])
+
+
+class ReportExportView(TemplateView):
+    """Streams the daily report as CSV, or as NDJSON with format=json.
+
+    The rows are sent as their statistics arrive, without holding the
+    whole report in memory. The dates, meters and tenants are checked
+    before the response starts, errors redirecting to the index.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        params = request.POST or request.GET
+        index_url = reverse('horizon:admin:metering:index')
+        try:
+            rows = report_rows(request,
+                               params.get('date_options', None),
+                               params.get('date_from', None),
+                               params.get('date_to', None))
+        except ValueError as e:
+            messages.error(request, unicode(e))
+            return HttpResponseRedirect(index_url)
+        except Exception:
+            exceptions.handle(request, _('Unable to generate the report.'),
+                              redirect=index_url)
+        if params.get('format', 'csv') == 'json':
+            response = StreamingHttpResponse(
+                (json.dumps(row, default=unicode) + '\n' for row in rows),
+                content_type='application/x-ndjson')
+            response['Content-Disposition'] = \
+                'attachment; filename="report.json"'
+            return response
+        return ReportCsvRenderer(request=request,
+                                 template=None,
+                                 context={'rows': rows},
+                                 content_type='text/csv',
+                                 filename='report.csv')
+
+
 def _calc_period(date_from, date_to):
     if date_from and date_to:
         if date_to < date_from:
@@ -234,6 +261,106 @@ def _calc_date_args(date_from, date_to, date_options):
     return date_from, date_to
 
 
+def _timestamp_query(date_from, date_to):
+    additional_query = []
+    if date_from:
+        additional_query += [{'field': 'timestamp',
+                              'op': 'ge',
+                              'value': date_from}]
+    if date_to:
+        additional_query += [{'field': 'timestamp',
+                              'op': 'le',
+                              'value': date_to}]
+    return additional_query
+
+
+def _tenant_query(tenant):
+    return [{"field": "project_id",
+             "op": "eq",
+             "value": tenant.id}]
+
+
+def _tenant_list(request):
+    try:
+        tenants = lookups.project_list(request)
+    except Exception:
+        tenants = []
+        exceptions.handle(request,
+                          _('Unable to retrieve tenant list.'))
+    return tenants
+
+
+def report_rows(request, date_options, date_from, date_to):
+    """Returns an iterator over the rows of the daily report, meter by meter.
+
+    The dates are checked (raising ValueError), and the meters (with their
+    units) and the tenants listed, by this call. The daily statistics of
+    every (meter, tenant) pair are then fetched as the rows are iterated
+    over, see :func:`_report_row_stream`.
+    """
+    date_from, date_to = _calc_date_args(date_from, date_to, date_options)
+    meters = ceilometer.Meters(request)
+    services = (
+        (_('Nova'), meters.list_nova()),
+        (_('Neutron'), meters.list_neutron()),
+        (_('Glance'), meters.list_glance()),
+        (_('Cinder'), meters.list_cinder()),
+        (_('Swift_meters'), meters.list_swift()),
+        (_('Kwapi'), meters.list_kwapi()),
+    )
+    meter_services = {}
+    for service, m_list in services:
+        for meter in m_list:
+            meter_services.setdefault(meter.name, service)
+
+    additional_query = _timestamp_query(date_from, date_to)
+    tenants = _tenant_list(request)
+    ceilometer_usage = ceilometer.CeilometerUsage(request)
+    pairs = [(meter, tenant) for meter in meters._cached_meters.values()
+             for tenant in tenants]
+
+    def statistics(pair):
+        meter, tenant = pair
+        aggregate = ceilometer.ResourceAggregate(query=_tenant_query(tenant),
+                                                 identifier=tenant.name)
+        ceilometer_usage.update_with_statistics(
+            aggregate, meter_names=[meter.name], period=3600 * 24,
+            additional_query=additional_query)
+        return getattr(aggregate, meter.name.replace(".", "_"))
+
+    return _report_row_stream(pairs, statistics, meter_services)
+
+
+def _report_row_stream(pairs, statistics, meter_services):
+    """Yields the rows of the (meter, tenant) pairs of the daily report.
+
+    The statistics of the pairs are fetched on the shared Ceilometer pool,
+    a bounded number at a time, and the rows of a pair are yielded as soon
+    as it and the pairs before it are done. Pairs whose statistics can't
+    be obtained are left out of the report. The rows may be sent while
+    they are produced, so other errors are logged and end the report.
+    """
+    try:
+        futures = ceilometer.imap_statistics(statistics, pairs)
+        for (meter, tenant), future in itertools.izip(pairs, futures):
+            if future.exception() is not None:
+                LOG.warning('Unable to retrieve %s statistics of tenant %s: '
+                            '%s' % (meter.name, tenant.id, future.exception()))
+                continue
+            for value in future.result() or []:
+                yield {"name": 'none',
+                       "project": tenant.name,
+                       "meter": meter.name,
+                       "description": meter.description,
+                       "service": meter_services.get(meter.name, ''),
+                       "time": value._apiresource.period_end,
+                       "value": value._apiresource.avg,
+                       "unit": meter.unit}
+    except Exception:
+        LOG.exception('Unable to generate the daily report, it is '
+                      'incomplete.')
+
+
 def query_data(request,
                date_from,
                date_to,
@@ -246,15 +373,7 @@ def query_data(request,
                                          date_options)
     if not period:
         period = _calc_period(date_from, date_to)
-    additional_query = []
-    if date_from:
-        additional_query += [{'field': 'timestamp',
-                              'op': 'ge',
-                              'value': date_from}]
-    if date_to:
-        additional_query += [{'field': 'timestamp',
-                              'op': 'le',
-                              'value': date_to}]
+    additional_query = _timestamp_query(date_from, date_to)
 
     # TODO(lsmola) replace this by logic implemented in I1 in bugs
     # 1226479 and 1226482, this is just a quick fix for RC1
@@ -265,23 +384,10 @@ def query_data(request,
     except Exception:
         unit = ""
     if group_by == "project":
-        try:
-            tenants, more = api.keystone.tenant_list(
-                request,
-                domain=None,
-                paginate=False)
-        except Exception:
-            tenants = []
-            exceptions.handle(request,
-                              _('Unable to retrieve tenant list.'))
+        tenants = _tenant_list(request)
         queries = {}
         for tenant in tenants:
-            tenant_query = [{
-                            "field": "project_id",
-                            "op": "eq",
-                            "value": tenant.id}]
-
-            queries[tenant.name] = tenant_query
+            queries[tenant.name] = _tenant_query(tenant)
 
         ceilometer_usage = ceilometer.CeilometerUsage(request)
         resources = ceilometer_usage.resource_aggregates_with_statistics(
@@ -19,6 +19,8 @@
 #    under the License.
 
 import datetime
+import gzip
+import StringIO
 
 from django.core.urlresolvers import reverse
 from django import http
@@ -187,3 +189,77 @@ class UsageViewTests(test.BaseAdminViewTests):
                                                             obj.disk_gb_hours,
                                                             obj.vcpu_hours)
                 self.assertContains(res, row)
+
+    def test_usage_csv_export(self):
+        self._test_usage_csv_export()
+
+    def test_usage_csv_export_gzip(self):
+        self._test_usage_csv_export(accept_encoding='gzip, deflate')
+
+    def _test_usage_csv_export(self, accept_encoding=''):
+        self.mox.StubOutWithMock(api.nova, 'usage_list')
+        self.mox.StubOutWithMock(api.nova, 'extension_supported')
+        self.mox.StubOutWithMock(api.keystone, 'tenant_list')
+        usage_obj = [api.nova.NovaUsage(u) for u in self.usages.list()]
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
+        api.nova.extension_supported(
+            'SimpleTenantUsage', IsA(http.HttpRequest)) \
+            .AndReturn(True)
+        # The period is exported a week at a time.
+        api.nova.usage_list(IsA(http.HttpRequest),
+                            datetime.datetime(2014, 1, 1, 0, 0, 0),
+                            datetime.datetime(2014, 1, 7, 23, 59, 59)) \
+            .AndReturn(usage_obj)
+        api.nova.usage_list(IsA(http.HttpRequest),
+                            datetime.datetime(2014, 1, 8, 0, 0, 0),
+                            datetime.datetime(2014, 1, 10, 23, 59, 59)) \
+            .AndReturn(usage_obj)
+        self.mox.ReplayAll()
+
+        csv_url = reverse('horizon:admin:overview:index') + \
+            "?start=2014-01-01&end=2014-01-10&format=csv&stream=true"
+        res = self.client.get(csv_url, HTTP_ACCEPT_ENCODING=accept_encoding)
+        content = ''.join(res.streaming_content)
+        if accept_encoding:
+            self.assertEqual('gzip', res['Content-Encoding'])
+            content = gzip.GzipFile(fileobj=StringIO.StringIO(content)).read()
+        else:
+            self.assertFalse(res.has_header('Content-Encoding'))
+
+        rows = content.splitlines()
+        self.assertEqual('Start,End,Project Name,VCPUs,Ram (MB),Disk (GB),'
+                         'Usage (Hours)', rows[0])
+        self.assertEqual(1 + 2 * len(usage_obj), len(rows))
+        self.assertTrue(rows[1].startswith('2014-01-01,2014-01-07,'))
+        self.assertTrue(rows[-1].startswith('2014-01-08,2014-01-10,'))
+
+    def test_usage_csv_export_marks_missing_windows(self):
+        self.mox.StubOutWithMock(api.nova, 'usage_list')
+        self.mox.StubOutWithMock(api.nova, 'extension_supported')
+        self.mox.StubOutWithMock(api.keystone, 'tenant_list')
+        usage_obj = [api.nova.NovaUsage(u) for u in self.usages.list()]
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
+        api.nova.extension_supported(
+            'SimpleTenantUsage', IsA(http.HttpRequest)) \
+            .AndReturn(True)
+        api.nova.usage_list(IsA(http.HttpRequest),
+                            datetime.datetime(2014, 1, 1, 0, 0, 0),
+                            datetime.datetime(2014, 1, 7, 23, 59, 59)) \
+            .AndRaise(self.exceptions.nova)
+        api.nova.usage_list(IsA(http.HttpRequest),
+                            datetime.datetime(2014, 1, 8, 0, 0, 0),
+                            datetime.datetime(2014, 1, 10, 23, 59, 59)) \
+            .AndReturn(usage_obj)
+        self.mox.ReplayAll()
+
+        csv_url = reverse('horizon:admin:overview:index') + \
+            "?start=2014-01-01&end=2014-01-10&format=csv&stream=true"
+        res = self.client.get(csv_url)
+        rows = ''.join(res.streaming_content).splitlines()
+
+        self.assertEqual(2 + len(usage_obj), len(rows))
+        self.assertEqual('2014-01-01,2014-01-07,Error: unable to retrieve '
+                         'the usage of this period.', rows[1])
+        self.assertTrue(rows[-1].startswith('2014-01-08,2014-01-10,'))
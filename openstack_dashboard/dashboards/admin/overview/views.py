@@ -26,8 +26,8 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon.utils import csvbase
 
-from openstack_dashboard import api
 from openstack_dashboard import usage
+from openstack_dashboard.utils import lookups
 
 
 class GlobalUsageCsvRenderer(csvbase.BaseCsvResponse):
@@ -45,11 +45,43 @@ class GlobalUsageCsvRenderer(csvbase.BaseCsvResponse):
                    floatformat(u.vcpu_hours, 2))
 
 
+class GlobalUsageCsvExportRenderer(csvbase.BaseCsvStreamingResponse):
+
+    columns = [_("Start"), _("End"), _("Project Name"), _("VCPUs"),
+               _("Ram (MB)"), _("Disk (GB)"), _("Usage (Hours)")]
+
+    def get_row_data(self):
+        projects = self.context['projects']
+        for start, end, usage_list in self.context['windows']:
+            if usage_list is None:
+                yield usage.BaseUsage.missing_window_row(start, end)
+                continue
+            for u in usage_list:
+                project = projects.get(u.tenant_id)
+                yield (start.date(),
+                       end.date(),
+                       getattr(project, "name", None) or u.tenant_id,
+                       u.vcpus,
+                       u.memory_mb,
+                       u.local_gb,
+                       floatformat(u.vcpu_hours, 2))
+
+
 class GlobalOverview(usage.UsageView):
     table_class = usage.GlobalUsageTable
     usage_class = usage.GlobalUsage
     template_name = 'admin/overview/usage.html'
     csv_response_class = GlobalUsageCsvRenderer
+    csv_export_response_class = GlobalUsageCsvExportRenderer
+
+    def get_export_context(self, windows):
+        context = super(GlobalOverview, self).get_export_context(windows)
+        try:
+            context['projects'] = lookups.project_index(self.request)
+        except Exception:
+            context['projects'] = {}
+            exceptions.handle(self.request, ignore=True)
+        return context
 
     def get_context_data(self, **kwargs):
         context = super(GlobalOverview, self).get_context_data(**kwargs)
@@ -60,17 +92,17 @@ class GlobalOverview(usage.UsageView):
         data = super(GlobalOverview, self).get_data()
         # Pre-fill project names
         try:
-            projects, has_more = api.keystone.tenant_list(self.request)
+            projects = lookups.project_index(self.request)
         except Exception:
-            projects = []
+            projects = {}
             exceptions.handle(self.request,
                               _('Unable to retrieve project list.'))
         for instance in data:
-            project = filter(lambda t: t.id == instance.tenant_id, projects)
+            project = projects.get(instance.tenant_id)
             # If we could not get the project name, show the tenant_id with
             # a 'Deleted' identifier instead.
             if project:
-                instance.project_name = getattr(project[0], "name", None)
+                instance.project_name = getattr(project, "name", None)
             else:
                 deleted = _("Deleted")
                 instance.project_name = translation.string_concat(
@@ -22,6 +22,7 @@ from keystoneclient.exceptions import Conflict  # noqa
 
 from openstack_dashboard import api
 from openstack_dashboard.api import keystone
+from openstack_dashboard.utils import lookups
 
 
 class ViewMembersLink(tables.LinkAction):
@@ -109,6 +110,7 @@ class DeleteTenantsAction(tables.DeleteAction):
 
     def delete(self, request, obj_id):
         api.keystone.tenant_delete(request, obj_id)
+        lookups.project_list_cache.clear()
 
 
 class TenantFilterAction(tables.FilterAction):
@@ -151,6 +153,7 @@ class UpdateCell(tables.UpdateAction):
                 name=project_obj.name,
                 description=project_obj.description,
                 enabled=project_obj.enabled)
+            lookups.project_list_cache.clear()
 
         except Conflict:
             # Returning a nice error message about name conflict. The message
@@ -719,16 +719,25 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         return [user for user in self.users.list()
                 if user.project_id == project_id]
 
-    def _get_proj_groups(self, project_id):
-        return [group for group in self.groups.list()
-                if group.project_id == project_id]
+    def _stub_role_assignments_init(self, users, groups, roles):
+        # Each of the users and groups has all the roles on the project.
+        role_ids = set(role.id for role in roles)
+        api.keystone.project_role_assignments(IsA(http.HttpRequest),
+                                              self.tenant.id,
+                                              groups=[]) \
+            .AndReturn((dict((user.id, role_ids) for user in users), {}))
+        api.keystone.project_role_assignments(
+            IsA(http.HttpRequest),
+            self.tenant.id,
+            users=[],
+            groups=[group.id for group in groups]) \
+            .AndReturn(({}, dict((group.id, role_ids) for group in groups)))
 
     @test.create_stubs({api.keystone: ('get_default_role',
-                                       'roles_for_user',
+                                       'project_role_assignments',
                                        'tenant_get',
                                        'domain_get',
                                        'user_list',
-                                       'roles_for_group',
                                        'group_list',
                                        'role_list'),
                         quotas: ('get_tenant_quota_data',
@@ -762,18 +771,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
+        self._stub_role_assignments_init(proj_users, groups, roles)
 
         self.mox.ReplayAll()
 
@@ -804,11 +802,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'project_role_assignments',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -825,7 +822,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
 
         # get/init
@@ -848,18 +844,8 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        self._stub_role_assignments_init(proj_users, groups, roles)
         workflow_data = {}
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
 
         workflow_data[USER_ROLE_PREFIX + "1"] = ['3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['2']  # member role
@@ -885,91 +871,56 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
+        user_roles = {'1': set(['1', '2']),  # current admin user
+                      '2': set(['1']),
+                      '3': set(['2']),
+                      '4': set(['2'])}  # user of another domain
+        group_roles = {'1': set(['1', '2']),
+                       '2': set(['1']),
+                       '3': set(['2'])}
+        api.keystone.project_role_assignments(IsA(http.HttpRequest),
+                                              self.tenant.id) \
+            .AndReturn((user_roles, group_roles))
+        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
+            .AndReturn(users)
 
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='2',
-                                             role='1')
-        # add role 2
+        # Only the changed assignments are sent. The admin user can't
+        # revoke their own roles on the current project, warning.
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='2',
                                           role='2')
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='3',
-                                             role='2')
-        # add role 1
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
                                           role='1')
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             user='2',
+                                             role='1')
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             user='3',
+                                             role='2')
 
         # Group assignments
         api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group - try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
-        for role in roles:
-            api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                           role=role.id,
-                                           group='1',
-                                           project=self.tenant.id)
-
-        # member group 1 - has role 1, will remove it
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
-        api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                       role='1',
-                                       group='2',
-                                       project=self.tenant.id)
-        # add role 2
+                                domain=domain_id).AndReturn(groups)
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='2',
                                     project=self.tenant.id)
-
-        # member group 3 - has role 2
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                       role='2',
-                                       group='3',
-                                       project=self.tenant.id)
-        # add role 1
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='1',
                                     group='3',
                                     project=self.tenant.id)
+        # admin group - remove all roles on current project
+        for role_id, group_id in (('1', '1'), ('2', '1'),
+                                  ('1', '2'), ('2', '3')):
+            api.keystone.remove_group_role(IsA(http.HttpRequest),
+                                           role=role_id,
+                                           group=group_id,
+                                           project=self.tenant.id)
 
         nova_updated_quota = dict([(key, updated_quota[key]) for key in
                                    quotas.NOVA_QUOTA_FIELDS])
@@ -1038,11 +989,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'project_role_assignments',
                                        'remove_tenant_user',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1080,25 +1030,16 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        self._stub_role_assignments_init(proj_users, groups, roles)
 
         workflow_data = {}
+        role_ids = [role.id for role in roles]
         for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-            role_ids = [role.id for role in roles]
             if role_ids:
                 workflow_data.setdefault(USER_ROLE_PREFIX + role_ids[0], []) \
                              .append(user.id)
 
         for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-            role_ids = [role.id for role in roles]
             if role_ids:
                 workflow_data.setdefault(GROUP_ROLE_PREFIX + role_ids[0], []) \
                              .append(group.id)
@@ -1142,11 +1083,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'project_role_assignments',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1162,7 +1102,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
 
         # get/init
@@ -1185,22 +1124,9 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                       project=self.tenant.id).AndReturn(proj_users)
-
+        self._stub_role_assignments_init(proj_users, groups, roles)
         workflow_data = {}
 
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
         # Group role assignment data
@@ -1225,24 +1151,21 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
+        # Roles '1' and '2' for users and groups '1' and '3', role '2' for
+        # user and group '2'.
+        user_roles = {'1': set(['1', '2']),
+                      '2': set(['2']),
+                      '3': set(['1'])}
+        group_roles = {'1': set(['1', '2']),
+                       '2': set(['2']),
+                       '3': set(['1'])}
+        api.keystone.project_role_assignments(IsA(http.HttpRequest),
+                                              self.tenant.id) \
+            .AndReturn((user_roles, group_roles))
+        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
+            .AndReturn(users)
 
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # add role 2
+        # user 3 - add role 2
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
@@ -1250,28 +1173,9 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         # Group assignment
         api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group 1- try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member group 1 - has no change
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-
-        # member group 3 - has role 1
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-
-        # add role 2
+                                domain=domain_id).AndReturn(groups)
+
+        # group 3 - add role 2
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='3',
@@ -1306,11 +1210,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'project_role_assignments',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1347,19 +1250,8 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                       project=self.tenant.id).AndReturn(proj_users)
-
+        self._stub_role_assignments_init(proj_users, groups, roles)
         workflow_data = {}
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
 
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
@@ -1384,21 +1276,16 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id).AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id).AndReturn((roles[1],))
+        user_roles = {'1': set(['1', '2']),
+                      '2': set(['2']),
+                      '3': set(['1'])}
+        api.keystone.project_role_assignments(IsA(http.HttpRequest),
+                                              self.tenant.id) \
+            .AndReturn((user_roles, {}))
+        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
+            .AndReturn(users)
 
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id).AndReturn((roles[0],))
-        # add role 2
+        # user 3 - add role 2
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
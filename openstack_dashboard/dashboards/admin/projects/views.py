@@ -96,6 +96,8 @@ class ProjectUsageView(usage.UsageView):
     usage_class = usage.ProjectUsage
     template_name = 'admin/projects/usage.html'
     csv_response_class = project_views.ProjectUsageCsvRenderer
+    csv_export_response_class = \
+        project_views.ProjectUsageCsvExportRenderer
     csv_template_name = 'project/overview/usage.csv'
 
     def get_data(self):
@@ -34,6 +34,7 @@ from openstack_dashboard.api import cinder
 from openstack_dashboard.api import keystone
 from openstack_dashboard.api import nova
 from openstack_dashboard.usage import quotas
+from openstack_dashboard.utils import lookups
 
 INDEX_URL = "horizon:admin:projects:index"
 ADD_USER_URL = "horizon:admin:projects:create_user"
@@ -199,23 +200,19 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
         # Figure out users & roles
         if project_id:
             try:
-                project_members = api.keystone.user_list(request,
-                    project=project_id)
+                user_roles, group_roles = \
+                    api.keystone.project_role_assignments(request,
+                                                          project_id,
+                                                          groups=[])
             except Exception:
-                exceptions.handle(request, err_msg)
-
-            for user in project_members:
-                try:
-                    roles = api.keystone.roles_for_user(self.request,
-                                                        user.id,
-                                                        project_id)
-                except Exception:
-                    exceptions.handle(request,
-                                      err_msg,
-                                      redirect=reverse(INDEX_URL))
-                for role in roles:
-                    field_name = self.get_member_field_name(role.id)
-                    self.fields[field_name].initial.append(user.id)
+                exceptions.handle(request,
+                                  err_msg,
+                                  redirect=reverse(INDEX_URL))
+
+            for user_id, role_ids in sorted(user_roles.items()):
+                for role_id in role_ids:
+                    field_name = self.get_member_field_name(role_id)
+                    self.fields[field_name].initial.append(user_id)
 
     class Meta:
         name = _("Project Members")
@@ -301,18 +298,22 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
 
         # Figure out groups & roles
         if project_id:
-            for group in all_groups:
-                try:
-                    roles = api.keystone.roles_for_group(self.request,
-                                                         group=group.id,
-                                                         project=project_id)
-                except Exception:
-                    exceptions.handle(request,
-                                      err_msg,
-                                      redirect=reverse(INDEX_URL))
-                for role in roles:
-                    field_name = self.get_member_field_name(role.id)
-                    self.fields[field_name].initial.append(group.id)
+            try:
+                user_roles, group_roles = \
+                    api.keystone.project_role_assignments(
+                        request,
+                        project_id,
+                        users=[],
+                        groups=[group.id for group in all_groups])
+            except Exception:
+                exceptions.handle(request,
+                                  err_msg,
+                                  redirect=reverse(INDEX_URL))
+
+            for group_id, group_name in groups_list:
+                for role_id in group_roles.get(group_id, ()):
+                    field_name = self.get_member_field_name(role_id)
+                    self.fields[field_name].initial.append(group_id)
 
     class Meta:
         name = _("Project Groups")
@@ -381,6 +382,7 @@ class CreateProject(workflows.Workflow):
         except Exception:
             exceptions.handle(request, ignore=True)
             return False
+        lookups.project_list_cache.clear()
 
         project_id = self.object.id
 
@@ -518,11 +520,17 @@ class UpdateProject(workflows.Workflow):
     def format_status_message(self, message):
         return message % self.context.get('name', 'unknown project')
 
-    def handle(self, request, data):
-        # FIXME(gabriel): This should be refactored to use Python's built-in
-        # sets and do this all in a single "roles to add" and "roles to remove"
-        # pass instead of the multi-pass thing happening now.
+    def _requested_roles(self, data, step_slug, roles):
+        """Returns the ids of the roles chosen for each member, by its id."""
+        member_step = self.get_step(step_slug)
+        requested = {}
+        for role in roles:
+            field_name = member_step.get_member_field_name(role.id)
+            for member_id in data[field_name]:
+                requested.setdefault(member_id, set()).add(role.id)
+        return requested
 
+    def handle(self, request, data):
         project_id = data['project_id']
         domain_id = ''
         # update project info
@@ -538,91 +546,63 @@ class UpdateProject(workflows.Workflow):
         except Exception:
             exceptions.handle(request, ignore=True)
             return False
+        lookups.project_list_cache.clear()
 
-        # update project members
+        # update project members, only sending the role assignments which
+        # changed.
         users_to_modify = 0
-        # Project-user member step
-        member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
         try:
             # Get our role options
             available_roles = api.keystone.role_list(request)
-            # Get the users currently associated with this project so we
-            # can diff against it.
-            project_members = api.keystone.user_list(request,
-                                                     project=project_id)
-            users_to_modify = len(project_members)
-
-            for user in project_members:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_user(self.request,
-                                                            user.id,
-                                                            project_id)
-                current_role_ids = [role.id for role in current_roles]
-
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Check if the user is in the list of users with this role.
-                    if user.id in data[field_name]:
-                        # Add it if necessary
-                        if role.id not in current_role_ids:
-                            # user role has changed
-                            api.keystone.add_tenant_user_role(
-                                request,
-                                project=project_id,
-                                user=user.id,
-                                role=role.id)
-                        else:
-                            # User role is unchanged, so remove it from the
-                            # remaining roles list to avoid removing it later.
-                            index = current_role_ids.index(role.id)
-                            current_role_ids.pop(index)
-
-                # Prevent admins from doing stupid things to themselves.
-                is_current_user = user.id == request.user.id
-                is_current_project = project_id == request.user.tenant_id
-                admin_roles = [role for role in current_roles
-                               if role.name.lower() == 'admin']
-                if len(admin_roles):
-                    removing_admin = any([role.id in current_role_ids
-                                          for role in admin_roles])
-                else:
-                    removing_admin = False
-                if is_current_user and is_current_project and removing_admin:
-                    # Cannot remove "admin" role on current(admin) project
-                    msg = _('You cannot revoke your administrative privileges '
-                            'from the project you are currently logged into. '
-                            'Please switch to another project with '
-                            'administrative privileges or remove the '
-                            'administrative role manually via the CLI.')
-                    messages.warning(request, msg)
-
-                # Otherwise go through and revoke any removed roles.
-                else:
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_tenant_user_role(
-                            request,
-                            project=project_id,
-                            user=user.id,
-                            role=id_to_delete)
-                users_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many users may be added for exception handling.
-                users_to_modify += len(data[field_name])
-            for role in available_roles:
-                users_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for user_id in data[field_name]:
-                    if not filter(lambda x: user_id == x.id, project_members):
-                        api.keystone.add_tenant_user_role(request,
-                                                          project=project_id,
-                                                          user=user_id,
-                                                          role=role.id)
-                    users_added += 1
-                users_to_modify -= users_added
+            # Get the roles currently assigned on this project so we
+            # can diff against them.
+            user_roles, group_roles = api.keystone.project_role_assignments(
+                request, project_id)
+            # Only the users of the domain of the project are listed in
+            # the workflow, leave the others alone.
+            if domain_id:
+                domain_users = api.keystone.user_list(request,
+                                                      domain=domain_id)
+                domain_user_ids = [user.id for user in domain_users]
+                user_roles = dict((user_id, role_ids)
+                                  for user_id, role_ids in user_roles.items()
+                                  if user_id in domain_user_ids)
+            grants, revokes = api.keystone.role_assignments_diff(
+                user_roles,
+                self._requested_roles(data, PROJECT_USER_MEMBER_SLUG,
+                                      available_roles))
+
+            # Prevent admins from doing stupid things to themselves.
+            admin_role_ids = [role.id for role in available_roles
+                              if role.name.lower() == 'admin']
+            is_current_project = project_id == request.user.tenant_id
+            removing_admin = any(user_id == request.user.id and
+                                 role_id in admin_role_ids
+                                 for user_id, role_id in revokes)
+            if is_current_project and removing_admin:
+                # Cannot remove "admin" role on current(admin) project
+                msg = _('You cannot revoke your administrative privileges '
+                        'from the project you are currently logged into. '
+                        'Please switch to another project with '
+                        'administrative privileges or remove the '
+                        'administrative role manually via the CLI.')
+                messages.warning(request, msg)
+                revokes = [(user_id, role_id) for user_id, role_id in revokes
+                           if user_id != request.user.id]
+
+            users_to_modify = len(set(user_id for user_id, role_id
+                                      in grants + revokes))
+            for user_id, role_id in grants:
+                api.keystone.add_tenant_user_role(request,
+                                                  project=project_id,
+                                                  user=user_id,
+                                                  role=role_id)
+            for user_id, role_id in revokes:
+                api.keystone.remove_tenant_user_role(request,
+                                                     project=project_id,
+                                                     user=user_id,
+                                                     role=role_id)
+            users_to_modify = 0
         except Exception:
             if PROJECT_GROUP_ENABLED:
                 group_msg = _(", update project groups")
@@ -638,67 +618,35 @@ class UpdateProject(workflows.Workflow):
         if PROJECT_GROUP_ENABLED:
             # update project groups
             groups_to_modify = 0
-            member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
             try:
-                # Get the groups currently associated with this project so we
-                # can diff against it.
-                project_groups = api.keystone.group_list(request,
-                                                         domain=domain_id,
-                                                         project=project_id)
-                groups_to_modify = len(project_groups)
-                for group in project_groups:
-                    # Check if there have been any changes in the roles of
-                    # Existing project members.
-                    current_roles = api.keystone.roles_for_group(
-                        self.request,
-                        group=group.id,
-                        project=project_id)
-                    current_role_ids = [role.id for role in current_roles]
-                    for role in available_roles:
-                        # Check if the group is in the list of groups with
-                        # this role.
-                        field_name = member_step.get_member_field_name(role.id)
-                        if group.id in data[field_name]:
-                            # Add it if necessary
-                            if role.id not in current_role_ids:
-                                # group role has changed
-                                api.keystone.add_group_role(
-                                    request,
-                                    role=role.id,
-                                    group=group.id,
-                                    project=project_id)
-                            else:
-                                # Group role is unchanged, so remove it from
-                                # the remaining roles list to avoid removing it
-                                # later.
-                                index = current_role_ids.index(role.id)
-                                current_role_ids.pop(index)
-
-                    # Revoke any removed roles.
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_group_role(request,
-                                                       role=id_to_delete,
-                                                       group=group.id,
-                                                       project=project_id)
-                    groups_to_modify -= 1
-
-                # Grant new roles on the project.
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Count how many groups may be added for error handling.
-                    groups_to_modify += len(data[field_name])
-                for role in available_roles:
-                    groups_added = 0
-                    field_name = member_step.get_member_field_name(role.id)
-                    for group_id in data[field_name]:
-                        if not filter(lambda x: group_id == x.id,
-                                      project_groups):
-                            api.keystone.add_group_role(request,
-                                                        role=role.id,
-                                                        group=group_id,
-                                                        project=project_id)
-                        groups_added += 1
-                    groups_to_modify -= groups_added
+                # Only the groups of the domain of the project are listed
+                # in the workflow, leave the others alone.
+                if domain_id:
+                    domain_groups = api.keystone.group_list(request,
+                                                            domain=domain_id)
+                    domain_group_ids = [group.id for group in domain_groups]
+                    group_roles = dict((group_id, role_ids)
+                                       for group_id, role_ids
+                                       in group_roles.items()
+                                       if group_id in domain_group_ids)
+                grants, revokes = api.keystone.role_assignments_diff(
+                    group_roles,
+                    self._requested_roles(data, PROJECT_GROUP_MEMBER_SLUG,
+                                          available_roles))
+
+                groups_to_modify = len(set(group_id for group_id, role_id
+                                           in grants + revokes))
+                for group_id, role_id in grants:
+                    api.keystone.add_group_role(request,
+                                                role=role_id,
+                                                group=group_id,
+                                                project=project_id)
+                for group_id, role_id in revokes:
+                    api.keystone.remove_group_role(request,
+                                                   role=role_id,
+                                                   group=group_id,
+                                                   project=project_id)
+                groups_to_modify = 0
             except Exception:
                 exceptions.handle(request, _('Failed to modify %s project '
                                              'members, update project groups '
@@ -728,6 +676,7 @@ class UpdateProject(workflows.Workflow):
                 api.neutron.tenant_quota_update(request,
                                                 project_id,
                                                 **neutron_data)
+            quotas.invalidate_tenant_quota_usages(request, project_id)
             return True
         except Exception:
             exceptions.handle(request, _('Modified project information and '
@@ -44,6 +44,11 @@ class VolumesFilterAction(tables.FilterAction):
                 if q in volume.name.lower()]
 
 
+class UpdateRow(project_tables.UpdateRow):
+    # The batched row updates only know the volumes of the project.
+    batch_update_url = None
+
+
 class VolumesTable(project_tables.VolumesTable):
     name = tables.Column("name",
                          verbose_name=_("Name"),
@@ -55,7 +60,7 @@ class VolumesTable(project_tables.VolumesTable):
         name = "volumes"
         verbose_name = _("Volumes")
         status_columns = ["status"]
-        row_class = project_tables.UpdateRow
+        row_class = UpdateRow
         table_actions = (project_tables.DeleteVolume, VolumesFilterAction)
         row_actions = (project_tables.DeleteVolume,)
         columns = ('tenant', 'host', 'name', 'size', 'status', 'volume_type',
@@ -68,6 +68,7 @@ class ReleaseIPs(tables.BatchAction):
 
     def action(self, request, obj_id):
         api.network.tenant_floating_ip_release(request, obj_id)
+        quotas.invalidate_tenant_quota_usages(request)
 
 
 class AssociateIP(tables.LinkAction):
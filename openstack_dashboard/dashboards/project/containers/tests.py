@@ -28,6 +28,7 @@ from django.utils import http as utils_http
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
+from openstack_dashboard.api import swift
 from openstack_dashboard.dashboards.project.containers import forms
 from openstack_dashboard.dashboards.project.containers import tables
 from openstack_dashboard.dashboards.project.containers import views
@@ -306,16 +307,21 @@ class SwiftTests(test.TestCase):
         for container in self.containers.list():
             for obj in self.objects.list():
                 self.mox.ResetAll()  # mandatory in a for loop
-                api.swift.swift_get_object(IsA(http.HttpRequest),
-                                           container.name,
-                                           obj.name).AndReturn(obj)
+                api.swift.swift_get_object(
+                    IsA(http.HttpRequest),
+                    container.name,
+                    obj.name,
+                    resp_chunk_size=views.DEFAULT_DOWNLOAD_CHUNK_SIZE,
+                    byte_range=None).AndReturn(obj)
                 self.mox.ReplayAll()
 
                 download_url = reverse(
                     'horizon:project:containers:object_download',
                     args=[container.name, obj.name])
                 res = self.client.get(download_url)
-                self.assertEqual(res.content, obj.data)
+                self.assertEqual(''.join(res.streaming_content), obj.data)
+                self.assertEqual(200, res.status_code)
+                self.assertEqual('bytes', res['Accept-Ranges'])
                 self.assertTrue(res.has_header('Content-Disposition'))
                 # Check that the returned Content-Disposition filename is well
                 # surrounded by double quotes and with commas removed
@@ -326,6 +332,30 @@ class SwiftTests(test.TestCase):
                     'attachment; filename=%s' % expected_name
                 )
 
+    @test.create_stubs({api.swift: ('swift_get_object',)})
+    def test_download_range(self):
+        container = self.containers.first()
+        obj = swift.StorageObject({'name': 'test_object',
+                                   'bytes': 4,
+                                   'content_range': 'bytes 5-8/9'},
+                                  container.name,
+                                  data=iter(['Da', 'ta']))
+        api.swift.swift_get_object(
+            IsA(http.HttpRequest),
+            container.name,
+            obj.name,
+            resp_chunk_size=views.DEFAULT_DOWNLOAD_CHUNK_SIZE,
+            byte_range='bytes=5-').AndReturn(obj)
+        self.mox.ReplayAll()
+
+        download_url = reverse('horizon:project:containers:object_download',
+                               args=[container.name, obj.name])
+        res = self.client.get(download_url, HTTP_RANGE='bytes=5-')
+        self.assertEqual(206, res.status_code)
+        self.assertEqual('bytes 5-8/9', res['Content-Range'])
+        self.assertEqual('4', res['Content-Length'])
+        self.assertEqual('Data', ''.join(res.streaming_content))
+
     @test.create_stubs({api.swift: ('swift_get_containers',)})
     def test_copy_index(self):
         ret = (self.containers.list(), False)
@@ -22,6 +22,9 @@
 Views for managing Swift containers.
 """
 
+import re
+
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django import http
 from django.utils.functional import cached_property  # noqa
@@ -45,6 +48,12 @@ from openstack_dashboard.dashboards.project.containers import tables
 import os
 
 
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 512 * 1024
+# A single range of bytes, the only kind forwarded to Swift: several ranges
+# would be sent back as a multipart document.
+BYTE_RANGE_RE = re.compile(r'^bytes=(\d+-\d*|-\d+)$')
+
+
 def for_url(container_name):
     """Build a URL friendly container name.
 
@@ -202,9 +211,24 @@ class UploadView(forms.ModalFormView):
 
 
 def object_download(request, container_name, object_path):
+    """Streams the data of an object, or the requested range of it.
+
+    The data is read from Swift SWIFT_DOWNLOAD_CHUNK_SIZE bytes at a time as
+    it is sent, and Range requests let interrupted downloads be resumed.
+    """
+    byte_range = request.META.get('HTTP_RANGE')
+    if byte_range and not BYTE_RANGE_RE.match(byte_range):
+        byte_range = None
+    chunk_size = getattr(settings, 'SWIFT_DOWNLOAD_CHUNK_SIZE',
+                         DEFAULT_DOWNLOAD_CHUNK_SIZE)
     try:
-        obj = api.swift.swift_get_object(request, container_name, object_path)
-    except Exception:
+        obj = api.swift.swift_get_object(request, container_name, object_path,
+                                         resp_chunk_size=chunk_size,
+                                         byte_range=byte_range)
+    except Exception as e:
+        if getattr(e, 'http_status', None) == 416:
+            # The range isn't satisfiable, e.g. it starts after the end.
+            return http.HttpResponse(status=416)
         redirect = reverse("horizon:project:containers:index")
         exceptions.handle(request,
                           _("Unable to retrieve object."),
@@ -215,11 +239,16 @@ def object_download(request, container_name, object_path):
     if not os.path.splitext(obj.name)[1] and obj.orig_name:
         name, ext = os.path.splitext(obj.orig_name)
         filename = "%s%s" % (filename, ext)
-    response = http.HttpResponse()
+    response = http.StreamingHttpResponse(obj.data)
     safe_name = filename.replace(",", "").encode('utf-8')
     response['Content-Disposition'] = 'attachment; filename="%s"' % safe_name
     response['Content-Type'] = 'application/octet-stream'
-    response.write(obj.data)
+    response['Accept-Ranges'] = 'bytes'
+    if obj.bytes is not None:
+        response['Content-Length'] = obj.bytes
+    if obj.get('content_range'):
+        response.status_code = 206
+        response['Content-Range'] = obj.content_range
     return response
 
 
@@ -184,6 +184,8 @@ class UpdateRow(tables.Row):
 
     def get_data(self, request, image_id):
         image = api.glance.image_get(request, image_id)
+        image.upload = api.glance.image_upload_status(
+            image_id, request.user.tenant_id)
         return image
 
     def load_cells(self, image=None):
@@ -196,6 +198,20 @@ class UpdateRow(tables.Row):
             self.classes.append('category-' + category)
 
 
+class ImageStatusColumn(tables.Column):
+    """The status of an image, with the progress of its data upload."""
+
+    def get_data(self, image):
+        data = super(ImageStatusColumn, self).get_data(image)
+        upload = getattr(image, 'upload', None)
+        if upload and upload['status'] == 'uploading' and upload['size']:
+            data = _("%(status)s (%(percent)d%%, %(rate)s/s)") % {
+                'status': data,
+                'percent': 100 * upload['uploaded'] // upload['size'],
+                'rate': filters.filesizeformat(upload['rate'])}
+        return data
+
+
 class ImagesTable(tables.DataTable):
     STATUS_CHOICES = (
         ("active", True),
@@ -211,11 +227,11 @@ class ImagesTable(tables.DataTable):
     image_type = tables.Column(get_image_type,
                                verbose_name=_("Type"),
                                filters=(filters.title,))
-    status = tables.Column("status",
-                           filters=(filters.title,),
-                           verbose_name=_("Status"),
-                           status=True,
-                           status_choices=STATUS_CHOICES)
+    status = ImageStatusColumn("status",
+                               filters=(filters.title,),
+                               verbose_name=_("Status"),
+                               status=True,
+                               status_choices=STATUS_CHOICES)
     public = tables.Column("is_public",
                            verbose_name=_("Public"),
                            empty_value=False,
@@ -18,6 +18,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import tempfile
 
 from django.conf import settings
@@ -155,6 +156,21 @@ class ImageViewTests(test.TestCase):
         self.assertNoFormErrors(res)
         self.assertEqual(res.status_code, 302)
 
+    @test.create_stubs({api.glance: ('image_upload_status',)})
+    def test_upload_status(self):
+        tenant_id = self.request.user.tenant_id
+        status = {'status': 'uploading', 'tenant_id': tenant_id,
+                  'size': 1000, 'uploaded': 200, 'rate': 100.0,
+                  'error': None}
+        api.glance.image_upload_status('1', tenant_id).AndReturn(status)
+        api.glance.image_upload_status('2', tenant_id).AndReturn(None)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:images:images:upload_status')
+        res = self.client.get(url, {'image_id': ['1', '2']})
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'1': status, '2': None}, json.loads(res.content))
+
     @test.create_stubs({api.glance: ('image_get',)})
     def test_image_detail_get(self):
         image = self.images.first()
@@ -21,9 +21,13 @@
 """
 Views for managing images.
 """
+import json
+
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
+from django import http
 from django.utils.translation import ugettext_lazy as _
+from django.views import generic
 
 from horizon import exceptions
 from horizon import forms
@@ -45,6 +49,23 @@ class CreateView(forms.ModalFormView):
     success_url = reverse_lazy("horizon:project:images:index")
 
 
+class UploadStatusView(generic.View):
+    """Returns the progress of the uploads of images, as JSON by image id.
+
+    The images are given as ``image_id`` query parameters. Images whose
+    upload isn't known, e.g. because it finished long ago or belongs to
+    another project, are null.
+    """
+
+    def get(self, request, *args, **kwargs):
+        tenant_id = request.user.tenant_id
+        statuses = dict((image_id,
+                         api.glance.image_upload_status(image_id, tenant_id))
+                        for image_id in request.GET.getlist('image_id'))
+        return http.HttpResponse(json.dumps(statuses),
+                                 content_type='application/json')
+
+
 class UpdateView(forms.ModalFormView):
     form_class = project_forms.UpdateImageForm
     template_name = 'project/images/images/update.html'
@@ -37,6 +37,8 @@ from openstack_dashboard import api
 from openstack_dashboard.dashboards.project.access_and_security.floating_ips \
     import workflows
 from openstack_dashboard.dashboards.project.instances import tabs
+from openstack_dashboard.usage import quotas
+from openstack_dashboard.utils import row_updates
 
 
 LOG = logging.getLogger(__name__)
@@ -92,6 +94,7 @@ class TerminateInstance(tables.BatchAction):
 
     def action(self, request, obj_id):
         api.nova.server_delete(request, obj_id)
+        quotas.invalidate_tenant_quota_usages(request)
 
 
 class RebootInstance(tables.BatchAction):
@@ -515,6 +518,7 @@ class SimpleAssociateIP(tables.Action):
                 request, instance_id).split('_')[0]
 
             fip = api.network.tenant_floating_ip_allocate(request)
+            quotas.invalidate_tenant_quota_usages(request)
             api.network.floating_ip_associate(request, fip.id, target_id)
             messages.success(request,
                              _("Successfully associated floating IP: %s")
@@ -593,13 +597,16 @@ def get_instance_error(instance):
     return message
 
 
-class UpdateRow(tables.Row):
+class UpdateRow(row_updates.BatchUpdateRow):
     ajax = True
+    batch_update_url = "horizon:project:instances:rows_update"
 
     def get_data(self, request, instance_id):
         instance = api.nova.server_get(request, instance_id)
-        instance.full_flavor = api.nova.flavor_get(request,
-                                                   instance.flavor["id"])
+        flavor_id = instance.flavor["id"]
+        flavor = api.nova.flavor_get_many(request, [flavor_id])[flavor_id]
+        if flavor is not None:
+            instance.full_flavor = flavor
         error = get_instance_error(instance)
         if error:
             messages.error(request, error)
@@ -30,6 +30,7 @@ from django.utils.http import urlencode
 
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
 
 from horizon.workflows import views
 
@@ -48,11 +49,14 @@ SEC_GROUP_ROLE_PREFIX = \
 
 
 class InstanceTests(test.TestCase):
+    def _images_by_id(self):
+        return dict((image.id, image) for image in self.images.list())
+
     @test.create_stubs({api.nova: ('flavor_list',
                                    'server_list',
                                    'tenant_absolute_limits',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network:
                             ('floating_ip_simple_associate_supported',
                              'servers_update_addresses',),
@@ -64,8 +68,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -86,11 +90,15 @@ class InstanceTests(test.TestCase):
         self.assertItemsEqual(instances, self.servers.list())
 
     @test.create_stubs({api.nova: ('server_list',
+                                   'flavor_list',
                                    'tenant_absolute_limits',)})
     def test_index_server_list_exception(self):
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndRaise(self.exceptions.nova)
+        # The flavors are fetched along with the instances.
+        api.nova.flavor_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.flavors.list())
         api.nova.tenant_absolute_limits(IsA(http.HttpRequest), reserved=True) \
            .MultipleTimes().AndReturn(self.limits['absolute'])
 
@@ -107,7 +115,7 @@ class InstanceTests(test.TestCase):
                                    'flavor_get',
                                    'tenant_absolute_limits',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network:
                             ('floating_ip_simple_associate_supported',
                              'servers_update_addresses',),
@@ -125,11 +133,11 @@ class InstanceTests(test.TestCase):
         api.network.servers_update_addresses(IsA(http.HttpRequest), servers)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndRaise(self.exceptions.nova)
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
-        for server in servers:
-            api.nova.flavor_get(IsA(http.HttpRequest), server.flavor["id"]). \
-                AndReturn(full_flavors[server.flavor["id"]])
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
+        for flavor_id in set(server.flavor["id"] for server in servers):
+            api.nova.flavor_get(IsA(http.HttpRequest), flavor_id) \
+                .InAnyOrder().AndReturn(full_flavors[flavor_id])
         api.nova.tenant_absolute_limits(IsA(http.HttpRequest), reserved=True) \
            .MultipleTimes().AndReturn(self.limits['absolute'])
         api.network.floating_ip_simple_associate_supported(
@@ -149,7 +157,7 @@ class InstanceTests(test.TestCase):
                                    'flavor_get',
                                    'tenant_absolute_limits',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network:
                             ('floating_ip_simple_associate_supported',
                              'servers_update_addresses',),
@@ -170,8 +178,8 @@ class InstanceTests(test.TestCase):
             .AndReturn([servers, False])
         api.network.servers_update_addresses(IsA(http.HttpRequest), servers)
         api.nova.flavor_list(IsA(http.HttpRequest)).AndReturn(flavors)
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         for server in servers:
             api.nova.flavor_get(IsA(http.HttpRequest), server.flavor["id"]). \
                 AndRaise(self.exceptions.nova)
@@ -187,14 +195,15 @@ class InstanceTests(test.TestCase):
         instances = res.context['instances_table'].data
 
         self.assertTemplateUsed(res, 'project/instances/index.html')
-        self.assertMessageCount(res, error=len(servers))
+        # The error is reported once for the page.
+        self.assertMessageCount(res, error=1)
         self.assertItemsEqual(instances, self.servers.list())
 
     @test.create_stubs({api.nova: ('flavor_list',
                                    'server_list',
                                    'tenant_absolute_limits',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network:
                             ('floating_ip_simple_associate_supported',
                              'servers_update_addresses',),
@@ -211,8 +220,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -234,7 +243,7 @@ class InstanceTests(test.TestCase):
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
                                    'server_delete',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_terminate_instance(self):
         servers = self.servers.list()
@@ -245,8 +254,8 @@ class InstanceTests(test.TestCase):
             .AndReturn([servers, False])
         api.network.servers_update_addresses(IsA(http.HttpRequest), servers)
         api.nova.flavor_list(IgnoreArg()).AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         api.nova.server_delete(IsA(http.HttpRequest), server.id)
         self.mox.ReplayAll()
 
@@ -258,7 +267,7 @@ class InstanceTests(test.TestCase):
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
                                    'server_delete',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_terminate_instance_exception(self):
         servers = self.servers.list()
@@ -269,8 +278,8 @@ class InstanceTests(test.TestCase):
             .AndReturn([servers, False])
         api.network.servers_update_addresses(IsA(http.HttpRequest), servers)
         api.nova.flavor_list(IgnoreArg()).AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         api.nova.server_delete(IsA(http.HttpRequest), server.id) \
                           .AndRaise(self.exceptions.nova)
 
@@ -285,7 +294,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_pause_instance(self):
         servers = self.servers.list()
@@ -296,8 +305,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -315,7 +324,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_pause_instance_exception(self):
         servers = self.servers.list()
@@ -326,8 +335,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -346,7 +355,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_unpause_instance(self):
         servers = self.servers.list()
@@ -357,8 +366,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -376,7 +385,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_unpause_instance_exception(self):
         servers = self.servers.list()
@@ -388,8 +397,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -407,15 +416,15 @@ class InstanceTests(test.TestCase):
     @test.create_stubs({api.nova: ('server_reboot',
                                    'server_list',
                                    'flavor_list',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_reboot_instance(self):
         servers = self.servers.list()
         server = servers[0]
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -433,7 +442,7 @@ class InstanceTests(test.TestCase):
     @test.create_stubs({api.nova: ('server_reboot',
                                    'server_list',
                                    'flavor_list',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_reboot_instance_exception(self):
         servers = self.servers.list()
@@ -441,8 +450,8 @@ class InstanceTests(test.TestCase):
 
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -461,7 +470,7 @@ class InstanceTests(test.TestCase):
     @test.create_stubs({api.nova: ('server_reboot',
                                    'server_list',
                                    'flavor_list',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_soft_reboot_instance(self):
         servers = self.servers.list()
@@ -469,8 +478,8 @@ class InstanceTests(test.TestCase):
 
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -489,7 +498,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_suspend_instance(self):
         servers = self.servers.list()
@@ -500,8 +509,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -519,7 +528,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_suspend_instance_exception(self):
         servers = self.servers.list()
@@ -530,8 +539,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -550,7 +559,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_resume_instance(self):
         servers = self.servers.list()
@@ -562,8 +571,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -581,7 +590,7 @@ class InstanceTests(test.TestCase):
                                    'server_list',
                                    'flavor_list',
                                    'extension_supported',),
-                        api.glance: ('image_list_detailed',),
+                        api.glance: ('image_get_many',),
                         api.network: ('servers_update_addresses',)})
     def test_resume_instance_exception(self):
         servers = self.servers.list()
@@ -593,8 +602,8 @@ class InstanceTests(test.TestCase):
             .MultipleTimes().AndReturn(True)
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.glance.image_list_detailed(IgnoreArg()) \
-            .AndReturn((self.images.list(), False))
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(self._images_by_id())
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndReturn([servers, False])
@@ -2840,3 +2849,41 @@ class InstanceAjaxTests(test.TestCase):
         # a different availability zone.', u'']]
         self.assertEqual(messages[0][0], 'error')
         self.assertTrue(messages[0][1].startswith('Failed'))
+
+    @test.create_stubs({api.nova: ("server_get",
+                                   "flavor_get",
+                                   "extension_supported"),
+                        api.glance: ("image_get_many",),
+                        api.neutron: ("is_extension_supported",)})
+    def test_rows_update(self):
+        servers = self.servers.list()[:2]
+        flavors = SortedDict([(f.id, f) for f in self.flavors.list()])
+
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest))\
+            .MultipleTimes().AndReturn(True)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                                           'security-group')\
+            .MultipleTimes().AndReturn(True)
+        for server in servers:
+            api.nova.server_get(IsA(http.HttpRequest), server.id)\
+                .AndReturn(server)
+        api.nova.server_get(IsA(http.HttpRequest), 'deleted')\
+            .AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
+        for flavor_id in set(server.flavor["id"] for server in servers):
+            api.nova.flavor_get(IsA(http.HttpRequest), flavor_id)\
+                .InAnyOrder().AndReturn(flavors[flavor_id])
+        api.glance.image_get_many(IsA(http.HttpRequest), IgnoreArg())\
+            .AndReturn({})
+
+        self.mox.ReplayAll()
+
+        obj_ids = [server.id for server in servers] + ['deleted']
+        res = self.client.get(reverse('horizon:project:instances:'
+                                      'rows_update'),
+                              {'obj_id': obj_ids},
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(res.content)
+        self.assertItemsEqual(obj_ids[:2], data['rows'].keys())
+        self.assertItemsEqual(obj_ids[:2], data['intervals'].keys())
+        self.assertEqual(['deleted'], data['deleted'])
+        self.assertIn(servers[0].name, data['rows'][servers[0].id])
@@ -32,6 +32,7 @@ VIEW_MOD = 'openstack_dashboard.dashboards.project.instances.views'
 urlpatterns = patterns(VIEW_MOD,
     url(r'^$', views.IndexView.as_view(), name='index'),
     url(r'^launch$', views.LaunchInstanceView.as_view(), name='launch'),
+    url(r'^rows$', views.RowsUpdateView.as_view(), name='rows_update'),
     url(r'^(?P<instance_id>[^/]+)/$',
         views.DetailView.as_view(), name='detail'),
     url(INSTANCES % 'update', views.UpdateView.as_view(), name='update'),
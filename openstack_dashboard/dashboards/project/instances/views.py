@@ -21,6 +21,7 @@
 """
 Views for managing instances.
 """
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django import http
@@ -30,6 +31,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
 from horizon import forms
+from horizon import messages
 from horizon import tables
 from horizon import tabs
 from horizon.utils import memoized
@@ -44,6 +46,28 @@ from openstack_dashboard.dashboards.project.instances \
     import tabs as project_tabs
 from openstack_dashboard.dashboards.project.instances \
     import workflows as project_workflows
+from openstack_dashboard.utils import concurrency
+from openstack_dashboard.utils import row_updates
+
+
+DEFAULT_INDEX_WORKERS = 10
+
+
+def index_task_graph():
+    """Returns a :class:`TaskGraph` for the calls of the instance indexes.
+
+    The calls run on a pool of INSTANCE_INDEX_WORKERS threads per process.
+    """
+    return concurrency.TaskGraph(concurrency.get_pool(
+        'instance_index',
+        getattr(settings, 'INSTANCE_INDEX_WORKERS', DEFAULT_INDEX_WORKERS)))
+
+
+def _image_ids(instances):
+    # Instances booted from a volume have no image.
+    return [instance.image['id'] for instance in instances
+            if isinstance(getattr(instance, 'image', None), dict)
+            and 'id' in instance.image]
 
 
 class IndexView(tables.DataTableView):
@@ -53,15 +77,34 @@ class IndexView(tables.DataTableView):
     def has_more_data(self, table):
         return self._more
 
+    def _update_addresses(self, result):
+        instances, more = result
+        if instances:
+            api.network.servers_update_addresses(self.request, instances)
+
+    def _get_images(self, result):
+        instances, more = result
+        return api.glance.image_get_many(self.request,
+                                         _image_ids(instances))
+
     def get_data(self):
         marker = self.request.GET.get(
             project_tables.InstancesTable._meta.pagination_param, None)
-        # Gather our instances
+        # Gather our instances, their addresses, flavors and images
+        # concurrently.
+        graph = index_task_graph()
+        graph.add('instances', lambda: api.nova.server_list(
+            self.request,
+            search_opts={'marker': marker,
+                         'paginate': True}))
+        graph.add('addresses', self._update_addresses,
+                  requires=('instances',))
+        graph.add('flavors', lambda: api.nova.flavor_list(self.request))
+        graph.add('images', self._get_images, requires=('instances',))
+        results = graph.run()
+
         try:
-            instances, self._more = api.nova.server_list(
-                self.request,
-                search_opts={'marker': marker,
-                             'paginate': True})
+            instances, self._more = results['instances'].result()
         except Exception:
             self._more = False
             instances = []
@@ -70,31 +113,40 @@ class IndexView(tables.DataTableView):
 
         if instances:
             try:
-                api.network.servers_update_addresses(self.request, instances)
+                results['addresses'].result()
             except Exception:
                 exceptions.handle(
                     self.request,
                     message=_('Unable to retrieve IP addresses from Neutron.'),
                     ignore=True)
 
-            # Gather our flavors and images and correlate our instances to them
+            # Correlate our instances to their flavors and images
             try:
-                flavors = api.nova.flavor_list(self.request)
+                flavors = results['flavors'].result()
             except Exception:
                 flavors = []
                 exceptions.handle(self.request, ignore=True)
 
             try:
-                # TODO(gabriel): Handle pagination.
-                images, more = api.glance.image_list_detailed(self.request)
+                image_map = results['images'].result()
             except Exception:
-                images = []
+                image_map = {}
                 exceptions.handle(self.request, ignore=True)
 
             full_flavors = SortedDict([(str(flavor.id), flavor)
                                        for flavor in flavors])
-            image_map = SortedDict([(str(image.id), image)
-                                    for image in images])
+            size_msg = _('Unable to retrieve instance size information.')
+            # Get the flavors missing from the list via nova api, at once.
+            try:
+                full_flavors.update(api.nova.flavor_get_many(
+                    self.request,
+                    [instance.flavor["id"] for instance in instances
+                     if instance.flavor["id"] not in full_flavors]))
+                missing_flavors = False
+            except Exception:
+                # Reported once for the page, not for each instance.
+                missing_flavors = True
+                exceptions.handle(self.request, size_msg)
 
             # Loop through instances to get flavor info.
             for instance in instances:
@@ -108,18 +160,36 @@ class IndexView(tables.DataTableView):
                         instance.image = {'name':
                                 instance.image if instance.image else _("-")}
 
-                try:
-                    flavor_id = instance.flavor["id"]
-                    if flavor_id in full_flavors:
-                        instance.full_flavor = full_flavors[flavor_id]
-                    else:
-                        # If the flavor_id is not in full_flavors list,
-                        # get it via nova api.
-                        instance.full_flavor = api.nova.flavor_get(
-                            self.request, flavor_id)
-                except Exception:
-                    msg = _('Unable to retrieve instance size information.')
-                    exceptions.handle(self.request, msg)
+                flavor = full_flavors.get(instance.flavor["id"])
+                if flavor is None:
+                    if not missing_flavors:
+                        missing_flavors = True
+                        messages.error(self.request, size_msg)
+                else:
+                    instance.full_flavor = flavor
+        return instances
+
+
+class RowsUpdateView(row_updates.BatchRowUpdateView):
+    table_class = project_tables.InstancesTable
+
+    def get_rows_data(self, obj_ids):
+        instances = row_updates.get_many(
+            lambda obj_id: api.nova.server_get(self.request, obj_id),
+            obj_ids)
+        flavors = api.nova.flavor_get_many(
+            self.request, [instance.flavor["id"] for instance in instances])
+        image_map = api.glance.image_get_many(self.request,
+                                              _image_ids(instances))
+        for instance in instances:
+            if isinstance(getattr(instance, 'image', None), dict):
+                if instance.image.get('id') in image_map:
+                    instance.image = image_map[instance.image['id']]
+            if flavors[instance.flavor["id"]] is not None:
+                instance.full_flavor = flavors[instance.flavor["id"]]
+            error = project_tables.get_instance_error(instance)
+            if error:
+                messages.error(self.request, error)
         return instances
 
 
@@ -752,6 +752,7 @@ class LaunchInstance(workflows.Workflow):
                                    instance_count=int(context['count']),
                                    admin_pass=context['admin_pass'],
                                    disk_config=context['disk_config'])
+            quotas.invalidate_tenant_quota_usages(request)
             return True
         except Exception:
             exceptions.handle(request)
@@ -0,0 +1,126 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django import http
+from mox import IsA  # noqa
+
+from openstack_dashboard import api
+from openstack_dashboard.test import helpers as test
+
+from openstack_dashboard.dashboards.project.network_topology import views
+
+
+JSON_URL = reverse('horizon:project:network_topology:json')
+
+
+class NetworkTopologyJSONTests(test.TestCase):
+    def setUp(self):
+        super(NetworkTopologyJSONTests, self).setUp()
+        cache.clear()
+
+    def _stub_topology(self, routers=None):
+        api.nova.server_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.servers.list(), False])
+        api.neutron.network_list(IsA(http.HttpRequest),
+                                 **{'router:external': True}) \
+            .AndReturn([n for n in self.networks.list()
+                        if n['router:external']])
+        api.neutron.network_list_for_tenant(IsA(http.HttpRequest),
+                                            self.tenant.id) \
+            .AndReturn(self.networks.list())
+        api.neutron.port_list(IsA(http.HttpRequest),
+                              tenant_id=self.tenant.id) \
+            .AndReturn(self.ports.list())
+        api.neutron.router_list(IsA(http.HttpRequest),
+                                tenant_id=self.tenant.id) \
+            .AndReturn(routers or self.routers.list())
+
+    @test.create_stubs({api.nova: ('server_list',),
+                        api.neutron: ('network_list',
+                                      'network_list_for_tenant',
+                                      'port_list',
+                                      'router_list')})
+    def test_json_view_is_cached_with_etag(self):
+        self._stub_topology()
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        self.assertEqual(200, res.status_code)
+        data = json.loads(res.content)
+        self.assertEqual(len(self.servers.list()), len(data['servers']))
+        network_ids = [network['id'] for network in data['networks']]
+        self.assertEqual(len(set(network_ids)), len(network_ids))
+
+        # The cached topology is served without calling the APIs again.
+        res = self.client.get(JSON_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(304, res.status_code)
+
+    @test.create_stubs({api.nova: ('server_list',),
+                        api.neutron: ('network_list',
+                                      'network_list_for_tenant',
+                                      'port_list',
+                                      'router_list')})
+    def test_json_view_delta(self):
+        self._stub_topology(routers=self.routers.list()[:1])
+        self._stub_topology()
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        version = res['ETag'].strip('"')
+        cache.delete('network_topology:%s:%s' % (self.tenant.id,
+                                                 self.user.id))
+
+        res = self.client.get(JSON_URL, {'since': version})
+        data = json.loads(res.content)
+        self.assertEqual(version, data['since'])
+        self.assertNotEqual(version, data['version'])
+        self.assertEqual([router.id for router in self.routers.list()[1:]],
+                         [router['id'] for router
+                          in data['delta']['routers']['updated']])
+        self.assertEqual([], data['delta']['servers']['updated'])
+        self.assertEqual([], data['delta']['servers']['deleted'])
+
+    @test.create_stubs({api.nova: ('server_list',),
+                        api.neutron: ('network_list',
+                                      'network_list_for_tenant',
+                                      'port_list',
+                                      'router_list')})
+    def test_json_view_is_cached_per_user(self):
+        self._stub_topology()
+        self._stub_topology()
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        etag = res['ETag']
+
+        # Another user of the project doesn't get the cached topology.
+        self.setActiveUser(id='other',
+                           token=self.token,
+                           username='other',
+                           tenant_id=self.tenant.id,
+                           service_catalog=self.service_catalog,
+                           authorized_tenants=self.tenants.list())
+        res = self.client.get(JSON_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, res.status_code)
+        self.assertNotEqual(etag, res['ETag'])
+
+    def test_scope_depends_on_region(self):
+        self.request.user.services_region = 'RegionOne'
+        scope = views._scope(self.request)
+        self.request.user.services_region = 'RegionTwo'
+        self.assertNotEqual(scope, views._scope(self.request))
@@ -18,16 +18,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import json
+import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django.http import HttpResponse  # noqa
+from django.http import HttpResponseNotModified  # noqa
+from django.utils.http import parse_etags
 from django.views.generic import TemplateView  # noqa
 from django.views.generic import View  # noqa
 
 from openstack_dashboard import api
+from openstack_dashboard.utils import concurrency
 
 from openstack_dashboard.dashboards.project.network_topology.instances \
     import tables as instances_tables
@@ -48,6 +54,9 @@ from openstack_dashboard.dashboards.project.routers import\
     views as r_views
 
 
+LOG = logging.getLogger(__name__)
+
+
 class NTCreateRouterView (r_views.CreateView):
     template_name = 'project/network_topology/create_router.html'
     success_url = reverse_lazy("horizon:project:network_topology:index")
@@ -92,7 +101,102 @@ class NetworkTopologyView (TemplateView):
     template_name = 'project/network_topology/index.html'
 
 
+DEFAULT_WORKERS = 5
+DEFAULT_CACHE_TTL = 5
+# How long the snapshots of past versions are kept to compute deltas.
+VERSIONS_TTL = 300
+CACHE_PREFIX = 'network_topology'
+RESOURCES = ('servers', 'networks', 'ports', 'routers')
+
+
+def _scope(request):
+    """Returns what the topology depends on: the project, the user and
+    the region.
+
+    Users of a project may see different resources, e.g. admins, so each
+    one gets their own cached topology and versions, for each region.
+    """
+    return '%s:%s:%s' % (request.user.tenant_id, request.user.id,
+                         request.user.services_region)
+
+
+def _cache_key(scope, version=None):
+    if version is None:
+        return '%s:%s' % (CACHE_PREFIX, scope)
+    return '%s:%s:%s' % (CACHE_PREFIX, scope, version)
+
+
+def _version(scope, data):
+    return hashlib.md5(
+        json.dumps([scope, data], sort_keys=True)).hexdigest()
+
+
+def _fetch(request):
+    """Runs the nova and neutron calls of the topology concurrently.
+
+    As before, an empty server list is used when nova fails, and empty
+    neutron lists when any of the neutron calls fails.
+    """
+    tenant_id = request.user.tenant_id
+    calls = (
+        ('servers', lambda: api.nova.server_list(request)[0]),
+        ('public_networks', lambda: api.neutron.network_list(
+            request, **{'router:external': True})),
+        ('networks', lambda: api.neutron.network_list_for_tenant(
+            request, tenant_id)),
+        ('ports', lambda: api.neutron.port_list(request,
+                                                tenant_id=tenant_id)),
+        ('routers', lambda: api.neutron.router_list(request,
+                                                    tenant_id=tenant_id)),
+    )
+    pool = concurrency.get_pool(
+        'network_topology',
+        getattr(settings, 'NETWORK_TOPOLOGY_WORKERS', DEFAULT_WORKERS))
+    futures = concurrency.gather(pool, lambda call: call[1](), calls)
+    results = {}
+    for (name, call), future in zip(calls, futures):
+        if future.exception() is not None:
+            LOG.debug('Unable to retrieve topology %s: %s'
+                      % (name, future.exception()))
+            results[name] = None
+        else:
+            results[name] = future.result()
+    if results['servers'] is None:
+        results['servers'] = []
+    neutron = ('public_networks', 'networks', 'ports', 'routers')
+    if any(results[name] is None for name in neutron):
+        for name in neutron:
+            results[name] = []
+    return results
+
+
+def _delta(old, new):
+    """Returns the resources added, changed and deleted since ``old``."""
+    delta = {}
+    for resource in RESOURCES:
+        old_items = dict((item['id'], item) for item in old[resource])
+        new_ids = set()
+        updated = []
+        for item in new[resource]:
+            new_ids.add(item['id'])
+            if old_items.get(item['id']) != item:
+                updated.append(item)
+        delta[resource] = {
+            'updated': updated,
+            'deleted': [id for id in old_items if id not in new_ids]}
+    return delta
+
+
 class JSONView(View):
+    """Serves the topology drawn by the canvas.
+
+    The topology of each user of a project is cached for
+    NETWORK_TOPOLOGY_CACHE_TTL seconds (0 disables the cache) and served
+    with its version as ETag, so
+    polling clients get a 304 while it doesn't change. A client passing a
+    previous version as ``since`` gets only the resources which changed.
+    """
+
     def add_resource_url(self, view, resources):
         tenant_id = self.request.user.tenant_id
         for resource in resources:
@@ -101,20 +205,9 @@ class JSONView(View):
                 continue
             resource['url'] = reverse(view, None, [str(resource['id'])])
 
-    def _check_router_external_port(self, ports, router_id, network_id):
-        for port in ports:
-            if (port['network_id'] == network_id
-                    and port['device_id'] == router_id):
-                return True
-        return False
-
-    def get(self, request, *args, **kwargs):
+    def build(self, request):
+        results = _fetch(request)
         data = {}
-        # Get nova data
-        try:
-            servers, more = api.nova.server_list(request)
-        except Exception:
-            servers = []
         console_type = getattr(settings, 'CONSOLE_TYPE', 'AUTO')
         if console_type == 'SPICE':
             console = 'spice'
@@ -124,57 +217,38 @@ class JSONView(View):
                             'status': server.status,
                             'console': console,
                             'task': getattr(server, 'OS-EXT-STS:task_state'),
-                            'id': server.id} for server in servers]
+                            'id': server.id} for server in results['servers']]
         self.add_resource_url('horizon:project:instances:detail',
                               data['servers'])
 
-        # Get neutron data
         # if we didn't specify tenant_id, all networks shown as admin user.
         # so it is need to specify the networks. However there is no need to
         # specify tenant_id for subnet. The subnet which belongs to the public
         # network is needed to draw subnet information on public network.
-        try:
-            neutron_public_networks = api.neutron.network_list(
-                request,
-                **{'router:external': True})
-            neutron_networks = api.neutron.network_list_for_tenant(
-                request,
-                request.user.tenant_id)
-            neutron_ports = api.neutron.port_list(request)
-            neutron_routers = api.neutron.router_list(
-                request,
-                tenant_id=request.user.tenant_id)
-        except Exception:
-            neutron_public_networks = []
-            neutron_networks = []
-            neutron_ports = []
-            neutron_routers = []
-
         networks = [{'name': network.name,
                     'id': network.id,
                     'subnets': [{'cidr': subnet.cidr}
                                 for subnet in network.subnets],
                     'router:external': network['router:external']}
-                    for network in neutron_networks]
+                    for network in results['networks']]
         self.add_resource_url('horizon:project:networks:detail',
                               networks)
         # Add public networks to the networks list
-        for publicnet in neutron_public_networks:
-            found = False
-            for network in networks:
-                if publicnet.id == network['id']:
-                    found = True
-            if not found:
-                try:
-                    subnets = [{'cidr': subnet.cidr}
-                               for subnet in publicnet.subnets]
-                except Exception:
-                    subnets = []
-                networks.append({
-                    'name': publicnet.name,
-                    'id': publicnet.id,
-                    'subnets': subnets,
-                    'router:external': publicnet['router:external']})
+        network_ids = set(network['id'] for network in networks)
+        for publicnet in results['public_networks']:
+            if publicnet.id in network_ids:
+                continue
+            network_ids.add(publicnet.id)
+            try:
+                subnets = [{'cidr': subnet.cidr}
+                           for subnet in publicnet.subnets]
+            except Exception:
+                subnets = []
+            networks.append({
+                'name': publicnet.name,
+                'id': publicnet.id,
+                'subnets': subnets,
+                'router:external': publicnet['router:external']})
         data['networks'] = sorted(networks,
                                   key=lambda x: x.get('router:external'),
                                   reverse=True)
@@ -186,7 +260,7 @@ class JSONView(View):
                           'device_owner': port.device_owner,
                           'status': port.status
                           }
-                         for port in neutron_ports]
+                         for port in results['ports']]
         self.add_resource_url('horizon:project:networks:ports:detail',
                               data['ports'])
 
@@ -195,10 +269,12 @@ class JSONView(View):
             'name': router.name,
             'status': router.status,
             'external_gateway_info': router.external_gateway_info}
-            for router in neutron_routers]
+            for router in results['routers']]
 
         # user can't see port on external network. so we are
         # adding fake port based on router information
+        router_ports = set((port['network_id'], port['device_id'])
+                           for port in data['ports'])
         for router in data['routers']:
             external_gateway_info = router.get('external_gateway_info')
             if not external_gateway_info:
@@ -207,9 +283,7 @@ class JSONView(View):
                 'network_id')
             if not external_network:
                 continue
-            if self._check_router_external_port(data['ports'],
-                                                router['id'],
-                                                external_network):
+            if (external_network, router['id']) in router_ports:
                 continue
             fake_port = {'id': 'gateway%s' % external_network,
                          'network_id': external_network,
@@ -219,5 +293,44 @@ class JSONView(View):
 
         self.add_resource_url('horizon:project:routers:detail',
                               data['routers'])
+        return data
+
+    def snapshot(self, request):
+        """Returns the cached ``(version, data)`` of the project topology."""
+        ttl = getattr(settings, 'NETWORK_TOPOLOGY_CACHE_TTL',
+                      DEFAULT_CACHE_TTL)
+        scope = _scope(request)
+        key = _cache_key(scope)
+        snapshot = cache.get(key) if ttl else None
+        if snapshot is None:
+            data = self.build(request)
+            snapshot = (_version(scope, data), data)
+            if ttl:
+                cache.set(key, snapshot, ttl)
+                cache.set(_cache_key(scope, snapshot[0]), data,
+                          VERSIONS_TTL)
+        return snapshot
+
+    def get(self, request, *args, **kwargs):
+        version, data = self.snapshot(request)
+        etag = '"%s"' % version
+        if version in parse_etags(request.META.get('HTTP_IF_NONE_MATCH',
+                                                   '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        since = request.GET.get('since')
+        if since:
+            if since == version:
+                old = data
+            else:
+                old = cache.get(_cache_key(_scope(request), since))
+            if old is not None:
+                data = {'version': version,
+                        'since': since,
+                        'delta': _delta(old, data)}
         json_string = json.dumps(data, ensure_ascii=False)
-        return HttpResponse(json_string, content_type='text/json')
+        response = HttpResponse(json_string, content_type='text/json')
+        response['ETag'] = etag
+        return response
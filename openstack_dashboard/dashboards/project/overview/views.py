@@ -47,11 +47,36 @@ class ProjectUsageCsvRenderer(csvbase.BaseCsvResponse):
                    capfirst(inst['state']))
 
 
+class ProjectUsageCsvExportRenderer(csvbase.BaseCsvStreamingResponse):
+
+    columns = [_("Start"), _("End"), _("Instance Name"), _("VCPUs"),
+               _("Ram (MB)"), _("Disk (GB)"), _("Usage (Hours)"),
+               _("Uptime(Seconds)"), _("State")]
+
+    def get_row_data(self):
+        for start, end, usage_list in self.context['windows']:
+            if usage_list is None:
+                yield usage.BaseUsage.missing_window_row(start, end)
+                continue
+            for u in usage_list:
+                for inst in u.server_usages:
+                    yield (start.date(),
+                           end.date(),
+                           inst['name'],
+                           inst['vcpus'],
+                           inst['memory_mb'],
+                           inst['local_gb'],
+                           floatformat(inst['hours'], 2),
+                           inst['uptime'],
+                           capfirst(inst['state']))
+
+
 class ProjectOverview(usage.UsageView):
     table_class = usage.ProjectUsageTable
     usage_class = usage.ProjectUsage
     template_name = 'project/overview/usage.html'
     csv_response_class = ProjectUsageCsvRenderer
+    csv_export_response_class = ProjectUsageCsvExportRenderer
 
     def get_data(self):
         super(ProjectOverview, self).get_data()
@@ -0,0 +1,93 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Reduction of Graphite series to the pixel width of the charts.
+
+A chart can't show more than one column of points per pixel, so a 90 day
+series with a datapoint every minute is mostly wasted bytes. Each series
+is cut into one bucket per pixel, and only the minimum and maximum of each
+bucket are kept, in time order: the drawn line keeps its peaks and dips.
+
+NumPy is used when available, with a pure Python fallback.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _minmax_python(datapoints, size):
+    result = []
+    for start in range(0, len(datapoints), size):
+        bucket = datapoints[start:start + size]
+        points = [(p[0], i) for i, p in enumerate(bucket) if p[0] is not None]
+        if not points:
+            result.append(bucket[0])
+            continue
+        low = min(points)[1]
+        high = max(points, key=lambda p: (p[0], -p[1]))[1]
+        for i in sorted(set((low, high))):
+            result.append(bucket[i])
+    return result
+
+
+def _minmax_numpy(datapoints, size):
+    count = len(datapoints)
+    buckets = -(-count // size)
+    values = numpy.array([numpy.nan if p[0] is None else p[0]
+                          for p in datapoints], dtype=float)
+    values = numpy.append(values, [numpy.nan] * (buckets * size - count))
+    values = values.reshape(buckets, size)
+
+    empty = numpy.isnan(values).all(axis=1)
+    low = numpy.where(numpy.isnan(values), numpy.inf, values).argmin(axis=1)
+    high = numpy.where(numpy.isnan(values), -numpy.inf, values).argmax(axis=1)
+    offsets = numpy.arange(buckets) * size
+    first = offsets + numpy.minimum(low, high)
+    second = offsets + numpy.maximum(low, high)
+    # Empty buckets keep their first (null) point, and buckets whose
+    # minimum and maximum are the same point keep it once.
+    first[empty] = offsets[empty]
+    keep_second = ~empty & (second != first)
+
+    indexes = numpy.column_stack((first, second)).ravel()
+    mask = numpy.column_stack((numpy.ones(buckets, dtype=bool),
+                               keep_second)).ravel()
+    return [datapoints[i] for i in indexes[mask]]
+
+
+def minmax(datapoints, width):
+    """Reduces ``[value, timestamp]`` datapoints to ``width`` buckets.
+
+    Keeps at most two points (the minimum and the maximum) per bucket.
+    Buckets without any value keep a single null point, so gaps in the
+    data stay visible. Series already small enough are returned as is.
+    """
+    if width < 1 or len(datapoints) <= 2 * width:
+        return datapoints
+    size = -(-len(datapoints) // width)
+    if numpy is not None:
+        return _minmax_numpy(datapoints, size)
+    return _minmax_python(datapoints, size)
+
+
+def downsample_series(series_list, width):
+    """Returns a copy of a Graphite JSON render result, downsampled."""
+    result = []
+    for series in series_list:
+        series = dict(series)
+        series['datapoints'] = minmax(series['datapoints'], width)
+        result.append(series)
+    return result
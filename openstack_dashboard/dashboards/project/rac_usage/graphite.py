@@ -0,0 +1,470 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Client for the Graphite render API used by the Usage Graphs panel.
+
+Rendered graphs are stored in the Django cache (memcached in production),
+so every WSGI process shares the same results. The cache lifetime grows
+with the requested time window: a 90 day graph barely changes from one
+minute to the next, a 7 day one changes more often.
+
+Calls go through a pooled keep-alive session with timeouts and retries.
+When Graphite keeps failing a circuit breaker stops calling it for a
+while, and the last known results are served instead when available.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import urllib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+import requests
+
+
+LOG = logging.getLogger(__name__)
+
+# Can be overridden with the GRAPHITE_URL setting.
+RENDER_URL = 'http://yyc-graphite.cloud.cybera.ca/render'
+
+# Connect and read timeouts, in seconds (GRAPHITE_TIMEOUT setting).
+DEFAULT_TIMEOUT = (3.05, 20)
+
+# Failed calls are retried GRAPHITE_RETRIES times, waiting RETRY_BACKOFF,
+# then twice as long, etc. between attempts.
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.2
+
+# Size of the per process connection pool.
+POOL_SIZE = 10
+
+# The circuit opens after BREAKER_THRESHOLD consecutive failed calls and
+# lets a trial call through after BREAKER_RESET_TIMEOUT seconds.
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+# Last known results are kept this long to be served while Graphite is
+# unavailable.
+STALE_TTL = 24 * 60 * 60
+
+CACHE_PREFIX = 'rac_usage:graphite'
+
+# Cache lifetime, in seconds, of the windows offered by the usage tabs.
+# Can be overridden with the GRAPHITE_CACHE_TTLS setting.
+DEFAULT_CACHE_TTLS = {
+    '7d': 60,
+    '14d': 120,
+    '30d': 300,
+    '90d': 900,
+}
+MIN_CACHE_TTL = 60
+MAX_CACHE_TTL = 900
+
+# How long a process may hold the fetch lock of a key, and how long other
+# processes wait for it before fetching on their own.
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.1
+
+# Separates the query name prepended to every series of a batched render
+# call from the series name.
+BATCH_SEPARATOR = '|'
+
+# Hit and miss counters are kept for a day.
+STATS_TIMEOUT = 24 * 60 * 60
+
+
+class GraphiteUnavailable(Exception):
+    """Graphite couldn't be reached and no stale result is available."""
+
+
+class CircuitBreaker(object):
+    """Stops calls to a failing service for a while.
+
+    The circuit is closed as long as calls succeed. After ``threshold``
+    consecutive failures it opens and :meth:`allow` refuses every call for
+    ``reset_timeout`` seconds, then lets a single trial call through: the
+    circuit closes again if it succeeds, and stays open otherwise.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.time() - self._opened_at >= self.reset_timeout:
+                # Half open: let this call through, and keep refusing the
+                # others until it reports back.
+                self._opened_at = time.time()
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                if self._opened_at is None:
+                    LOG.warning('Graphite failed %d times in a row, not '
+                                'calling it for %d seconds'
+                                % (self._failures, self.reset_timeout))
+                self._opened_at = time.time()
+
+
+_breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the keep-alive session shared by the threads of a process."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def render_url():
+    return getattr(settings, 'GRAPHITE_URL', RENDER_URL)
+
+
+_WINDOW_RE = re.compile(r'^(\d+)(s|min|h|d|w|mon|y)$')
+_WINDOW_UNITS = {
+    's': 1,
+    'min': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60,
+    'mon': 30 * 24 * 60 * 60,
+    'y': 365 * 24 * 60 * 60,
+}
+
+
+def window_seconds(from_date):
+    """Returns the length in seconds of a Graphite relative time window.
+
+    ``from_date`` is given without the leading minus sign, e.g. ``'7d'``.
+    Returns ``None`` if the window can't be parsed.
+    """
+    match = _WINDOW_RE.match(from_date or '')
+    if not match:
+        return None
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+
+
+def cache_ttl(from_date):
+    """Returns how long a graph for the given time window may be cached."""
+    ttls = getattr(settings, 'GRAPHITE_CACHE_TTLS', DEFAULT_CACHE_TTLS)
+    if from_date in ttls:
+        return ttls[from_date]
+    seconds = window_seconds(from_date)
+    if seconds is None:
+        return MIN_CACHE_TTL
+    # One minute of caching per week of data.
+    return max(MIN_CACHE_TTL, min(MAX_CACHE_TTL, seconds // 10080))
+
+
+def cache_key(project_id, instance_id, query, from_date, data_format,
+              width=None):
+    parts = [project_id, instance_id, query, from_date, data_format]
+    if width is not None:
+        parts.append(width)
+    raw = '|'.join(str(part) for part in parts)
+    return '%s:%s' % (CACHE_PREFIX, hashlib.md5(raw).hexdigest())
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Collapses concurrent calls for the same key into a single call.
+
+    The first thread asking for a key runs the function, the others wait
+    for it and get the same result (or exception). Returns a tuple of the
+    result and whether it was shared with another caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+_single_flight = SingleFlight()
+
+
+def _incr(name):
+    key = '%s:stats:%s' % (CACHE_PREFIX, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, STATS_TIMEOUT):
+            cache.incr(key)
+
+
+def stats():
+    """Returns the shared hit and miss counters of the render cache."""
+    names = ('hits', 'misses')
+    keys = ['%s:stats:%s' % (CACHE_PREFIX, name) for name in names]
+    values = cache.get_many(keys)
+    result = dict((name, values.get(key, 0))
+                  for name, key in zip(names, keys))
+    total = result['hits'] + result['misses']
+    result['hit_ratio'] = float(result['hits']) / total if total else 0.0
+    return result
+
+
+def _get(url):
+    timeout = getattr(settings, 'GRAPHITE_TIMEOUT', DEFAULT_TIMEOUT)
+    r = get_session().get(url, timeout=timeout)
+    r.raise_for_status()
+    return r.content, r.headers.get('content-type', 'text/html')
+
+
+def _fetch(url):
+    """Calls Graphite, retrying connection errors, timeouts and 5xx errors.
+
+    Raises :class:`GraphiteUnavailable` when every attempt failed or the
+    circuit is open. Other HTTP errors are raised as is.
+    """
+    if not _breaker.allow():
+        raise GraphiteUnavailable('Graphite circuit is open.')
+    retries = getattr(settings, 'GRAPHITE_RETRIES', DEFAULT_RETRIES)
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            result = _get(url)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code < 500:
+                _breaker.success()
+                raise
+            error = e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        else:
+            _breaker.success()
+            return result
+        LOG.info('Graphite call failed (attempt %d of %d): %s'
+                 % (attempt + 1, retries + 1, error))
+    _breaker.failure()
+    raise GraphiteUnavailable(str(error))
+
+
+def _stale_key(key):
+    return '%s:stale' % key
+
+
+def _store(key, value, ttl):
+    cache.set(key, value, ttl)
+    cache.set(_stale_key(key), value, STALE_TTL)
+
+
+def _wait_for(key):
+    """Waits for another process to fill ``key`` and returns its value."""
+    deadline = time.time() + LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get('%s:lock' % key) is None:
+            # The other process gave up without storing a result.
+            return None
+    return None
+
+
+def _release(lock_key, token):
+    """Deletes the fetch lock of a key, if it is still held with ``token``.
+
+    A lock which timed out may have been taken by another process since,
+    it is left for that process to release.
+    """
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _render(key, url, ttl):
+    value = cache.get(key)
+    if value is not None:
+        _incr('hits')
+        return value
+
+    lock_key = '%s:lock' % key
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, LOCK_TIMEOUT):
+        value = _wait_for(key)
+        if value is not None:
+            _incr('hits')
+            return value
+        # The lock was released or expired: take it if it is free, and
+        # fetch anyway otherwise, without releasing the other's lock.
+        cache.add(lock_key, token, LOCK_TIMEOUT)
+
+    try:
+        _incr('misses')
+        LOG.debug('Graphite cache miss, fetching %s' % url)
+        try:
+            value = _fetch(url)
+        except GraphiteUnavailable:
+            value = cache.get(_stale_key(key))
+            if value is None:
+                raise
+            LOG.info('Graphite unavailable, serving stale %s' % url)
+            return value
+        _store(key, value, ttl)
+        return value
+    finally:
+        _release(lock_key, token)
+
+
+def render(url, project_id, query, from_date, data_format, instance_id=None,
+           width=None):
+    """Returns the ``(content, content_type)`` of a Graphite render call.
+
+    Results are cached per (project, instance, query, window, format), and
+    per ``width`` when given (for rendered images).
+    Concurrent requests for the same key result in a single call to
+    Graphite: threads of this process wait on each other, other processes
+    wait on a lock stored in the cache.
+
+    Raises :class:`GraphiteUnavailable` if Graphite can't be reached and
+    there is no stale result to fall back on.
+    """
+    key = cache_key(project_id, instance_id, query, from_date, data_format,
+                    width=width)
+    value, shared = _single_flight.do(key, _render, key, url,
+                                      cache_ttl(from_date))
+    if shared:
+        _incr('hits')
+    return value
+
+
+def _fetch_batch(url, keys, ttl):
+    """Fetches a batched render call and caches its series per query."""
+    try:
+        content, content_type = _fetch(url)
+    except GraphiteUnavailable:
+        stale = cache.get_many([_stale_key(key) for key in keys.values()])
+        if len(stale) < len(keys):
+            raise
+        LOG.info('Graphite unavailable, serving stale %s' % url)
+        return dict((name, json.loads(stale[_stale_key(key)][0]))
+                    for name, key in keys.items())
+    series_by_query = dict((name, []) for name in keys)
+    for series in json.loads(content):
+        name, sep, target = series['target'].partition(BATCH_SEPARATOR)
+        if name in series_by_query:
+            series['target'] = target
+            series_by_query[name].append(series)
+    for name, series in series_by_query.items():
+        _store(keys[name], (json.dumps(series), 'application/json'), ttl)
+    return series_by_query
+
+
+def render_batch(project_id, from_date, queries, instance_id=None):
+    """Returns the JSON series of several queries over one time window.
+
+    ``queries`` maps query names to lists of Graphite targets. Queries found
+    in the cache are served from it; all the others are fetched with a
+    single render call. Every target is prefixed with its query name using
+    ``aliasSub`` so the returned series can be split back per query, and
+    each query is then cached on its own, sharing entries with
+    :func:`render` for the JSON format. Like :func:`render`, falls back on
+    stale results when Graphite is unavailable.
+
+    Returns a dict mapping query names to lists of series.
+    """
+    results = {}
+    keys = {}
+    for name in queries:
+        key = cache_key(project_id, instance_id, name, from_date, 'json')
+        value = cache.get(key)
+        if value is None:
+            keys[name] = key
+        else:
+            _incr('hits')
+            results[name] = json.loads(value[0])
+    if not keys:
+        return results
+
+    params = [('from', '-%s' % from_date), ('format', 'json')]
+    for name in sorted(keys):
+        for target in queries[name]:
+            params.append(('target', "aliasSub(%s, '^', '%s%s')"
+                           % (target, name, BATCH_SEPARATOR)))
+    url = '%s?%s' % (render_url(), urllib.urlencode(params))
+    batch_key = cache_key(project_id, instance_id, ','.join(sorted(keys)),
+                          from_date, 'json')
+
+    for name in keys:
+        _incr('misses')
+    LOG.debug('Graphite cache miss for %d queries, fetching %s'
+              % (len(keys), url))
+    fetched, shared = _single_flight.do(batch_key, _fetch_batch, url, keys,
+                                        cache_ttl(from_date))
+    results.update(fetched)
+    return results
@@ -0,0 +1,270 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import BaseHTTPServer
+import json
+import threading
+
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied  # noqa
+from django.http import QueryDict  # noqa
+from django.test.utils import override_settings
+
+from openstack_dashboard.dashboards.project.rac_usage import downsample
+from openstack_dashboard.dashboards.project.rac_usage import graphite
+from openstack_dashboard.dashboards.project.rac_usage import views
+from openstack_dashboard.test import helpers as test
+
+
+class FakeGraphiteHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.server.responses:
+            status, content = self.server.responses.pop(0)
+        else:
+            status, content = 200, '[]'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeGraphite(object):
+    """A local Graphite render API serving canned responses."""
+
+    def __init__(self):
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0),
+                                                FakeGraphiteHandler)
+        self.server.responses = []
+        self.server.paths = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/render' % self.server.server_port
+
+    @property
+    def paths(self):
+        return self.server.paths
+
+    def respond(self, content, status=200):
+        self.server.responses.append((status, content))
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class GraphiteTests(test.TestCase):
+    def setUp(self):
+        super(GraphiteTests, self).setUp()
+        cache.clear()
+        self.graphite = FakeGraphite()
+        self.addCleanup(self.graphite.stop)
+        settings = override_settings(GRAPHITE_URL=self.graphite.url,
+                                     GRAPHITE_RETRIES=1,
+                                     GRAPHITE_TIMEOUT=(1, 1))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.mox.stubs.Set(graphite, 'RETRY_BACKOFF', 0)
+        self.mox.stubs.Set(graphite, '_breaker',
+                           graphite.CircuitBreaker(2, 60))
+
+    def url(self, target):
+        return '%s?target=%s' % (graphite.render_url(), target)
+
+    def test_cache_ttl_scales_with_window(self):
+        self.assertEqual(60, graphite.cache_ttl('7d'))
+        self.assertEqual(900, graphite.cache_ttl('90d'))
+        self.assertEqual(graphite.MIN_CACHE_TTL, graphite.cache_ttl('1h'))
+        self.assertEqual(graphite.MAX_CACHE_TTL, graphite.cache_ttl('2y'))
+        self.assertEqual(graphite.MIN_CACHE_TTL, graphite.cache_ttl('bogus'))
+
+    def test_render_is_cached(self):
+        self.graphite.respond('[]')
+
+        for i in range(3):
+            content, content_type = graphite.render(
+                self.url('a'), 'p1', 'q', '7d', 'json')
+            self.assertEqual('[]', content)
+            self.assertEqual('application/json', content_type)
+
+        self.assertEqual(1, len(self.graphite.paths))
+        stats = graphite.stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_render_key_includes_instance(self):
+        self.graphite.respond('[1]')
+        self.graphite.respond('[2]')
+
+        first = graphite.render(self.url('a'), 'p1', 'q', '7d', 'json',
+                                instance_id='i1')
+        second = graphite.render(self.url('b'), 'p1', 'q', '7d', 'json',
+                                 instance_id='i2')
+        self.assertEqual('[1]', first[0])
+        self.assertEqual('[2]', second[0])
+
+    def test_single_flight_shares_result(self):
+        flight = graphite.SingleFlight()
+        self.assertEqual((4, False), flight.do('key', lambda x: x * 2, 2))
+
+    def test_render_keeps_the_lock_of_another_process(self):
+        self.mox.stubs.Set(graphite, 'LOCK_TIMEOUT', 0)
+        self.graphite.respond('[]')
+        key = graphite.cache_key('p1', None, 'q', '7d', 'json')
+        lock_key = '%s:lock' % key
+        cache.set(lock_key, 'other', 60)
+
+        content, content_type = graphite.render(self.url('a'), 'p1', 'q',
+                                                '7d', 'json')
+        self.assertEqual('[]', content)
+        self.assertEqual('other', cache.get(lock_key))
+
+    def test_render_releases_its_lock(self):
+        self.graphite.respond('[]')
+        key = graphite.cache_key('p1', None, 'q', '7d', 'json')
+
+        graphite.render(self.url('a'), 'p1', 'q', '7d', 'json')
+        self.assertIsNone(cache.get('%s:lock' % key))
+
+    def test_render_retries_server_errors(self):
+        self.graphite.respond('oops', status=500)
+        self.graphite.respond('[]')
+
+        content, content_type = graphite.render(self.url('a'), 'p1', 'q',
+                                                '7d', 'json')
+        self.assertEqual('[]', content)
+        self.assertEqual(2, len(self.graphite.paths))
+
+    def test_render_serves_stale_result_when_unavailable(self):
+        self.graphite.respond('[1]')
+        graphite.render(self.url('a'), 'p1', 'q', '7d', 'json')
+        # Expire the fresh entry, keeping the stale one.
+        cache.delete(graphite.cache_key('p1', None, 'q', '7d', 'json'))
+        self.graphite.respond('oops', status=500)
+        self.graphite.respond('oops', status=500)
+
+        content, content_type = graphite.render(self.url('a'), 'p1', 'q',
+                                                '7d', 'json')
+        self.assertEqual('[1]', content)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        for i in range(4):
+            self.graphite.respond('oops', status=500)
+        for i in range(2):
+            self.assertRaises(graphite.GraphiteUnavailable, graphite.render,
+                              self.url('a'), 'p1', 'q', '7d', 'json')
+        self.assertTrue(graphite._breaker.is_open)
+
+        # Graphite isn't called any more while the circuit is open.
+        self.assertRaises(graphite.GraphiteUnavailable, graphite.render,
+                          self.url('a'), 'p1', 'q', '7d', 'json')
+        self.assertEqual(4, len(self.graphite.paths))
+
+    def test_render_batch_splits_series_per_query(self):
+        series = [{'target': 'cpu|region-a', 'datapoints': [[1, 100]]},
+                  {'target': 'memory|region-a', 'datapoints': [[2, 100]]},
+                  {'target': 'memory|region-b', 'datapoints': [[3, 100]]}]
+        self.graphite.respond(json.dumps(series))
+
+        queries = {'cpu': ['a'], 'memory': ['b'], 'disk': ['c']}
+        result = graphite.render_batch('p1', '7d', queries)
+        self.assertEqual(['region-a'], [s['target'] for s in result['cpu']])
+        self.assertEqual(['region-a', 'region-b'],
+                         [s['target'] for s in result['memory']])
+        self.assertEqual([], result['disk'])
+
+        # Each query is now cached on its own.
+        result = graphite.render_batch('p1', '7d', {'memory': ['b']})
+        self.assertEqual(2, len(result['memory']))
+        content, content_type = graphite.render(self.url('b'), 'p1',
+                                                'memory', '7d', 'json')
+        self.assertEqual(2, len(json.loads(content)))
+        self.assertEqual(1, len(self.graphite.paths))
+
+    def test_batch_data_invalid_response_is_unavailable(self):
+        self.graphite.respond('not json')
+        self.request.method = 'GET'
+        self.request.GET = QueryDict('queries=project_allocated_cpu&from=7d')
+
+        response = views.RACBatchData.as_view()(self.request)
+        self.assertEqual(503, response.status_code)
+
+    def test_batch_data_client_error_is_unavailable(self):
+        self.graphite.respond('[]', status=400)
+        self.request.method = 'GET'
+        self.request.GET = QueryDict('queries=project_allocated_cpu&from=7d')
+
+        response = views.RACBatchData.as_view()(self.request)
+        self.assertEqual(503, response.status_code)
+
+    def test_cache_stats_are_only_shown_to_admins(self):
+        self.request.method = 'GET'
+        self.assertRaises(PermissionDenied,
+                          views.RACCacheStats.as_view(), self.request)
+
+        self.request.user.roles = [self.roles.admin._info]
+        response = views.RACCacheStats.as_view()(self.request)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(graphite.stats(), json.loads(response.content))
+
+    def test_query_targets(self):
+        query = views.instance_queries('p1', 'i1')['instance_actual_memory']
+        targets = views.query_targets(query)
+        self.assertEqual(2, len(targets))
+        self.assertTrue(targets[0].startswith('aliasByNode(scale('))
+
+
+class DownsampleTests(test.TestCase):
+    def datapoints(self, values):
+        return [[value, 1000 + i] for i, value in enumerate(values)]
+
+    def test_small_series_is_unchanged(self):
+        points = self.datapoints([1, 2, 3, 4])
+        self.assertEqual(points, downsample.minmax(points, 2))
+
+    def test_keeps_min_and_max_of_each_bucket_in_order(self):
+        points = self.datapoints([5, 9, 1, 4, None, None, 2, 2, 7, 3, 3, 0])
+        result = downsample.minmax(points, 4)
+        self.assertEqual([[9, 1001], [1, 1002],
+                          [4, 1003],
+                          [2, 1006], [7, 1008],
+                          [3, 1009], [0, 1011]], result)
+
+    def test_empty_buckets_keep_a_null_point(self):
+        points = self.datapoints([None] * 6 + [1, 2, 3])
+        result = downsample.minmax(points, 3)
+        self.assertEqual([[None, 1000], [None, 1003], [1, 1006], [3, 1008]],
+                         result)
+
+    def test_python_and_numpy_agree(self):
+        if downsample.numpy is None:
+            self.skipTest('NumPy is not installed.')
+        values = [None if i % 7 == 0 else (i * 37) % 101 for i in range(997)]
+        points = self.datapoints(values)
+        self.assertEqual(downsample._minmax_python(points, 13),
+                         downsample._minmax_numpy(points, 13))
+
+    def test_downsample_series_doesnt_modify_its_input(self):
+        series = [{'target': 'a', 'datapoints': self.datapoints(range(100))}]
+        result = downsample.downsample_series(series, 10)
+        self.assertEqual(100, len(series[0]['datapoints']))
+        self.assertEqual(20, len(result[0]['datapoints']))
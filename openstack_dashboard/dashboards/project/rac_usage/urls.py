@@ -9,5 +9,7 @@ urlpatterns = patterns('openstack_dashboard.dashboards.project.rac_usage.views',
     url(r'^index$', views.RACUsageView.as_view(), name='index'),
     url(r'^project_data$', views.RACProjectData.as_view(), name='project_data'),
     url(r'^instance_data$', views.RACInstanceData.as_view(), name='instance_data'),
+    url(r'^batch_data$', views.RACBatchData.as_view(), name='batch_data'),
+    url(r'^cache_stats$', views.RACCacheStats.as_view(), name='cache_stats'),
     url(r'^warning$', views.WarningView.as_view(), name='warning'),
 )
@@ -1,14 +1,91 @@
+import json
+import logging
+import urlparse
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied  # noqa
 from django.template.defaultfilters import capfirst  # noqa
 from django.template.defaultfilters import floatformat  # noqa
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import TemplateView  # noqa
 from django import http
 
+import requests
+
 from horizon.utils import csvbase
 from horizon import tabs
 
+from openstack_dashboard.utils import concurrency
+
+from . import downsample
+from . import graphite
 from .tabs import RACUsageTabs
-import requests
+
+
+LOG = logging.getLogger(__name__)
+
+# Errors of Graphite calls answered with the warning page: Graphite being
+# unreachable, HTTP errors and responses which aren't valid JSON.
+GRAPHITE_ERRORS = (graphite.GraphiteUnavailable, requests.RequestException,
+                   ValueError)
+
+# Pixel width of the charts, when the request doesn't give one.
+DEFAULT_WIDTH = 800
+MAX_WIDTH = 4000
+
+
+def project_queries(project_id):
+    return {
+        'project_allocated_instances': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.instances), 3)" % project_id,
+        'project_allocated_cpu': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.cpu), 3)" % project_id,
+        'project_allocated_memory': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.memory), 3)" % project_id,
+        'project_allocated_ephemeral_disk': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.disk), 3)" % project_id,
+    }
+
+
+def instance_queries(project_id, instance_id):
+    return {
+        'instance_actual_cpu_time': "aliasByNode(derivative(summarize(projects.%s.instances.%s.cpu.cpu_time, '10min', 'avg')), 5)" % (project_id, instance_id),
+        'instance_actual_memory': "aliasByNode(scale(projects.%s.instances.%s.memory.available, 1024), 5)&target=aliasByNode(scale(projects.%s.instances.%s.memory.used,1024),5)&yMin=0" % (project_id, instance_id, project_id, instance_id),
+        'instance_actual_network_bytes': "aliasByNode(derivative(summarize(projects.%s.instances.%s.interface.eth0.rx_bytes, '10min', 'max')), 6)&target=aliasByNode(derivative(summarize(projects.%s.instances.%s.interface.eth0.tx_bytes,'10min','max')),6)&yMin=0" % (project_id, instance_id, project_id, instance_id),
+        'instance_actual_disk_usage': "aliasByNode(projects.%s.instances.%s.disk.vda.bytes_used,6)&yMin=0" % (project_id, instance_id),
+        'instance_actual_disk_io': "aliasByNode(derivative(summarize(projects.%s.instances.%s.disk.vda.wr_req,'10min','avg')),6)&target=aliasByNode(derivative(summarize(projects.%s.instances.%s.disk.vda.rd_req,'10min','avg')), 6)&yMin=0" % (project_id, instance_id, project_id, instance_id),
+    }
+
+
+def chart_width(request):
+    """Returns the pixel width of the chart the request asks data for."""
+    try:
+        width = int(request.GET.get('width', DEFAULT_WIDTH))
+    except ValueError:
+        width = DEFAULT_WIDTH
+    return max(1, min(MAX_WIDTH, width))
+
+
+def image_width(data_format, width):
+    """Returns the width rendered results depend on, if any.
+
+    JSON is cached at full resolution and downsampled per response, only
+    rendered images depend on the requested width.
+    """
+    if data_format == 'json':
+        return None
+    return width
+
+
+def render_response(content, content_type, data_format, width):
+    """Returns a render result, JSON series being reduced to ``width``."""
+    if data_format == 'json':
+        series = downsample.downsample_series(json.loads(content), width)
+        content = json.dumps(series)
+    return http.HttpResponse(content, content_type=content_type)
+
+
+def query_targets(query):
+    """Splits a query string into its list of Graphite targets."""
+    return [value for key, value in urlparse.parse_qsl('target=%s' % query)
+            if key == 'target']
+
 
 class RACUsageView(tabs.TabView):
     tab_group_class = RACUsageTabs
@@ -22,19 +99,22 @@ class RACProjectData(TemplateView):
         from_date = self.request.GET.get('from', '7d')
         project_id = self.request.user.tenant_id
         data_format = self.request.GET.get('format', False)
-        base_url = 'http://yyc-graphite.cloud.cybera.ca/render?from=-%s&width=800&format=%s&target=' % (from_date, data_format)
+        width = chart_width(self.request)
+        base_url = '%s?from=-%s&width=%s&format=%s&target=' % (graphite.render_url(), from_date, width, data_format)
         query_results = {}
-        queries = {
-            'project_allocated_instances': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.instances), 3)" % project_id,
-            'project_allocated_cpu': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.cpu), 3)" % project_id,
-            'project_allocated_memory': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.memory), 3)" % project_id,
-            'project_allocated_ephemeral_disk': "aliasByNode(keepLastValue(projects.%s.cloud_usage.*.disk), 3)" % project_id,
-        }
+        queries = project_queries(project_id)
 
         query = self.request.GET.get('query', False)
         if query:
-            r = requests.get("%s%s" % (base_url, queries[query]))
-            return http.HttpResponse(r.content)
+            try:
+                content, content_type = graphite.render(
+                    "%s%s" % (base_url, queries[query]), project_id, query,
+                    from_date, data_format,
+                    width=image_width(data_format, width))
+            except graphite.GraphiteUnavailable:
+                return unavailable(request)
+            return render_response(content, content_type, data_format,
+                                   width)
 
 class RACInstanceData(TemplateView):
     def get(self, request, *args, **kwargs):
@@ -42,21 +122,87 @@ class RACInstanceData(TemplateView):
         instance_id = self.request.GET.get('instance', False)
         data_format = self.request.GET.get('format', False)
         project_id = self.request.user.tenant_id
-        base_url = 'http://yyc-graphite.cloud.cybera.ca/render?from=-%s&width=800&format=%s&target=' % (from_date, data_format)
+        width = chart_width(self.request)
+        base_url = '%s?from=-%s&width=%s&format=%s&target=' % (graphite.render_url(), from_date, width, data_format)
         query_results = {}
-        queries = {
-            'instance_actual_cpu_time': "aliasByNode(derivative(summarize(projects.%s.instances.%s.cpu.cpu_time, '10min', 'avg')), 5)" % (project_id, instance_id),
-            'instance_actual_memory': "aliasByNode(scale(projects.%s.instances.%s.memory.available, 1024), 5)&target=aliasByNode(scale(projects.%s.instances.%s.memory.used,1024),5)&yMin=0" % (project_id, instance_id, project_id, instance_id),
-            'instance_actual_network_bytes': "aliasByNode(derivative(summarize(projects.%s.instances.%s.interface.eth0.rx_bytes, '10min', 'max')), 6)&target=aliasByNode(derivative(summarize(projects.%s.instances.%s.interface.eth0.tx_bytes,'10min','max')),6)&yMin=0" % (project_id, instance_id, project_id, instance_id),
-            'instance_actual_disk_usage': "aliasByNode(projects.%s.instances.%s.disk.vda.bytes_used,6)&yMin=0" % (project_id, instance_id),
-            'instance_actual_disk_io': "aliasByNode(derivative(summarize(projects.%s.instances.%s.disk.vda.wr_req,'10min','avg')),6)&target=aliasByNode(derivative(summarize(projects.%s.instances.%s.disk.vda.rd_req,'10min','avg')), 6)&yMin=0" % (project_id, instance_id, project_id, instance_id),
-        }
+        queries = instance_queries(project_id, instance_id)
 
         query = self.request.GET.get('query', False)
         if query:
-            r = requests.get("%s%s" % (base_url, queries[query]))
-            return http.HttpResponse(r.content)
+            try:
+                content, content_type = graphite.render(
+                    "%s%s" % (base_url, queries[query]), project_id, query,
+                    from_date, data_format, instance_id=instance_id,
+                    width=image_width(data_format, width))
+            except graphite.GraphiteUnavailable:
+                return unavailable(request)
+            return render_response(content, content_type, data_format,
+                                   width)
+
+
+class RACBatchData(TemplateView):
+    """Returns the JSON series of several queries and time windows at once.
+
+    Takes comma separated ``queries`` and ``from`` windows, and an optional
+    ``instance``, and the ``width`` in pixels the series are downsampled
+    to. The queries of each window are combined into a single
+    Graphite render call, and the windows are fetched concurrently on a
+    bounded worker pool. The response maps query names to windows to lists
+    of series.
+    """
+    def get(self, request, *args, **kwargs):
+        project_id = self.request.user.tenant_id
+        instance_id = self.request.GET.get('instance', None)
+        if instance_id:
+            queries = instance_queries(project_id, instance_id)
+        else:
+            queries = project_queries(project_id)
+        names = [name for name in
+                 self.request.GET.get('queries', '').split(',') if name]
+        names = names or queries.keys()
+        windows = [window for window in
+                   self.request.GET.get('from', '7d').split(',') if window]
+        unknown = [name for name in names if name not in queries]
+        if unknown or not windows:
+            return http.HttpResponseBadRequest()
+
+        targets = dict((name, query_targets(queries[name])) for name in names)
+        pool = concurrency.get_pool(
+            'graphite', getattr(settings, 'GRAPHITE_BATCH_WORKERS', 4))
+        futures = [(window, pool.submit(graphite.render_batch, project_id,
+                                        window, targets,
+                                        instance_id=instance_id))
+                   for window in windows]
+        width = chart_width(self.request)
+        data = dict((name, {}) for name in names)
+        try:
+            for window, future in futures:
+                for name, series in future.result().items():
+                    data[name][window] = downsample.downsample_series(
+                        series, width)
+        except GRAPHITE_ERRORS as e:
+            LOG.warning('Unable to fetch the usage graphs: %s' % e)
+            return unavailable(request)
+        return http.HttpResponse(json.dumps(data),
+                                 content_type='application/json')
+
+
+class RACCacheStats(TemplateView):
+    """Returns the Graphite cache statistics of the process, for admins."""
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        return http.HttpResponse(json.dumps(graphite.stats()),
+                                 content_type='application/json')
 
 
 class WarningView(TemplateView):
     template_name = "project/_warning.html"
+
+
+def unavailable(request):
+    """Renders the warning page with a 503 status, Graphite being down."""
+    response = WarningView.as_view()(request)
+    response.status_code = 503
+    return response
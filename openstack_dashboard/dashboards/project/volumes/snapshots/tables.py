@@ -25,6 +25,7 @@ from horizon import tables
 from openstack_dashboard import api
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
+from openstack_dashboard.usage import quotas
 
 from openstack_dashboard.dashboards.project.volumes \
     .volumes import tables as volume_tables
@@ -46,6 +47,7 @@ class DeleteVolumeSnapshot(tables.DeleteAction):
 
     def delete(self, request, obj_id):
         api.cinder.volume_snapshot_delete(request, obj_id)
+        quotas.invalidate_tenant_quota_usages(request)
 
 
 class CreateVolumeFromSnapshot(tables.LinkAction):
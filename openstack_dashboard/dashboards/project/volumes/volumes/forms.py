@@ -348,6 +348,7 @@ class CreateForm(forms.SelfHandlingForm):
                                           metadata=metadata,
                                           availability_zone=az,
                                           source_volid=volume_id)
+            quotas.invalidate_tenant_quota_usages(request)
             message = _('Creating volume "%s"') % data['name']
             messages.info(request, message)
             return volume
@@ -365,7 +366,11 @@ class CreateForm(forms.SelfHandlingForm):
 
     @memoized
     def get_image(self, request, id):
-        return glance.image_get(request, id)
+        image = glance.image_get_many(request, [id]).get(id)
+        if image is None:
+            # Raises the error the image couldn't be retrieved with.
+            image = glance.image_get(request, id)
+        return image
 
     @memoized
     def get_volume(self, request, id):
@@ -471,6 +476,7 @@ class CreateSnapshotForm(forms.SelfHandlingForm):
                                                      data['name'],
                                                      data['description'],
                                                      force=force)
+            quotas.invalidate_tenant_quota_usages(request)
 
             messages.info(request, message)
             return snapshot
@@ -30,6 +30,7 @@ from openstack_dashboard import api
 from openstack_dashboard.api import cinder
 from openstack_dashboard import policy
 from openstack_dashboard.usage import quotas
+from openstack_dashboard.utils import row_updates
 
 
 DELETABLE_STATES = ("available", "error", "error_extending")
@@ -52,6 +53,7 @@ class DeleteVolume(tables.DeleteAction):
         name = self.table.get_object_display(obj)
         try:
             cinder.volume_delete(request, obj_id)
+            quotas.invalidate_tenant_quota_usages(request)
         except Exception:
             msg = _('Unable to delete volume "%s". One or more snapshots '
                     'depend on it.')
@@ -162,8 +164,9 @@ class EditVolume(tables.LinkAction):
         return volume.status in ("available", "in-use")
 
 
-class UpdateRow(tables.Row):
+class UpdateRow(row_updates.BatchUpdateRow):
     ajax = True
+    batch_update_url = "horizon:project:volumes:volumes:rows_update"
 
     def get_data(self, request, volume_id):
         volume = cinder.volume_get(request, volume_id)
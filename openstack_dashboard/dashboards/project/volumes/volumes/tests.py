@@ -18,6 +18,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
+from cinderclient import exceptions as cinder_exceptions
 import django
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -447,6 +450,37 @@ class VolumeViewTests(test.TestCase):
         redirect_url = reverse('horizon:project:volumes:index')
         self.assertRedirectsNoFollow(res, redirect_url)
 
+    @test.create_stubs({cinder: ('volume_type_list',
+                                 'availability_zone_list',
+                                 'extension_supported'),
+                        api.glance: ('image_get',),
+                        quotas: ('tenant_limit_usages',)})
+    def test_create_volume_from_missing_image(self):
+        usage_limit = {'maxTotalVolumeGigabytes': 200,
+                       'gigabytesUsed': 20,
+                       'volumesUsed': len(self.cinder_volumes.list()),
+                       'maxTotalVolumes': 6}
+        image = self.images.first()
+
+        cinder.volume_type_list(IsA(http.HttpRequest)).\
+                                AndReturn(self.volume_types.list())
+        cinder.extension_supported(IsA(http.HttpRequest), 'AvailabilityZones')\
+            .AndReturn(True)
+        cinder.availability_zone_list(IsA(http.HttpRequest)).AndReturn(
+            self.cinder_availability_zones.list())
+        api.glance.image_get(IsA(http.HttpRequest), str(image.id)) \
+            .MultipleTimes().AndRaise(self.exceptions.glance)
+        quotas.tenant_limit_usages(IsA(http.HttpRequest)).\
+                                AndReturn(usage_limit)
+
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:volumes:volumes:create')
+        res = self.client.get(url, {'image_id': image.id})
+
+        self.assertTemplateUsed(res, 'project/volumes/volumes/create.html')
+        self.assertMessageCount(res, error=1)
+
     @test.create_stubs({cinder: ('volume_create',
                                  'volume_type_list',
                                  'volume_list',
@@ -1035,3 +1069,26 @@ class VolumeViewTests(test.TestCase):
         self.assertFormError(res, 'form', None,
                              "New size for extend must be greater than "
                              "current size.")
+
+    @test.create_stubs({cinder: ('volume_get',),
+                        api.nova: ('server_get',)})
+    def test_rows_update(self):
+        volumes = self.cinder_volumes.list()
+        for volume in volumes:
+            cinder.volume_get(IsA(http.HttpRequest), volume.id) \
+                .AndReturn(volume)
+        cinder.volume_get(IsA(http.HttpRequest), 'deleted') \
+            .AndRaise(cinder_exceptions.NotFound(404, 'Not found.'))
+        # The attachment column looks up the instances volume_get didn't.
+        api.nova.server_get(IsA(http.HttpRequest), IsA(basestring)) \
+            .MultipleTimes().AndReturn(self.servers.first())
+
+        self.mox.ReplayAll()
+
+        obj_ids = [volume.id for volume in volumes] + ['deleted']
+        url = reverse('horizon:project:volumes:volumes:rows_update')
+        res = self.client.get(url, {'obj_id': obj_ids},
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(res.content)
+        self.assertItemsEqual(obj_ids[:-1], data['rows'].keys())
+        self.assertEqual(['deleted'], data['deleted'])
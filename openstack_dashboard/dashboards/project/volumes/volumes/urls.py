@@ -25,6 +25,7 @@ VIEWS_MOD = ('openstack_dashboard.dashboards.project.volumes.volumes.views')
 
 urlpatterns = patterns(VIEWS_MOD,
     url(r'^create/$', views.CreateView.as_view(), name='create'),
+    url(r'^rows$', views.RowsUpdateView.as_view(), name='rows_update'),
     url(r'^(?P<volume_id>[^/]+)/extend/$',
         views.ExtendView.as_view(),
         name='extend'),
@@ -31,6 +31,7 @@ from horizon.utils import memoized
 from openstack_dashboard import api
 from openstack_dashboard.api import cinder
 from openstack_dashboard.usage import quotas
+from openstack_dashboard.utils import row_updates
 
 from openstack_dashboard.dashboards.project.volumes \
     .volumes import forms as project_forms
@@ -41,6 +42,15 @@ from openstack_dashboard.dashboards.project.volumes \
     .volumes import tabs as project_tabs
 
 
+class RowsUpdateView(row_updates.BatchRowUpdateView):
+    table_class = project_tables.VolumesTable
+
+    def get_rows_data(self, obj_ids):
+        # volume_get also gets the instances the volumes are attached to.
+        return row_updates.get_many(
+            lambda obj_id: cinder.volume_get(self.request, obj_id), obj_ids)
+
+
 class DetailView(tabs.TabView):
     tab_group_class = project_tabs.VolumeDetailTabs
     template_name = 'project/volumes/volumes/detail.html'
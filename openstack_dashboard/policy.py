@@ -19,6 +19,7 @@
 
 import logging
 import os.path
+import time
 
 from django.conf import settings
 
@@ -34,6 +35,27 @@ CONF = cfg.CONF
 
 _ENFORCER = None
 _BASE_PATH = getattr(settings, 'POLICY_FILES_PATH', '')
+# How often, in seconds, the policy files are checked for changes.
+DEFAULT_RELOAD_INTERVAL = 60
+
+
+class Enforcer(policy.Enforcer):
+    """An Enforcer checking its policy file for changes at most every
+    POLICY_RELOAD_INTERVAL seconds, instead of on every enforce() call.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Enforcer, self).__init__(*args, **kwargs)
+        self._loaded_at = None
+
+    def load_rules(self, force_reload=False):
+        interval = getattr(settings, 'POLICY_RELOAD_INTERVAL',
+                           DEFAULT_RELOAD_INTERVAL)
+        now = time.time()
+        if (force_reload or self._loaded_at is None
+                or now - self._loaded_at >= interval):
+            super(Enforcer, self).load_rules(force_reload=force_reload)
+            self._loaded_at = now
 
 
 def _get_enforcer():
@@ -42,7 +64,7 @@ def _get_enforcer():
         _ENFORCER = {}
         policy_files = getattr(settings, 'POLICY_FILES', {})
         for service in policy_files.keys():
-            enforcer = policy.Enforcer()
+            enforcer = Enforcer()
             enforcer.policy_path = os.path.join(_BASE_PATH,
                                                 policy_files[service])
             if os.path.isfile(enforcer.policy_path):
@@ -116,6 +138,31 @@ def check(actions, request, target={}):
 
     credentials = _user_to_credentials(request, user)
 
+    # Tables check the same actions for every row, so decisions are
+    # memoized on the request.
+    try:
+        key = (tuple(actions), user.id, user.project_id,
+               frozenset(target.items()))
+        hash(key)
+    except TypeError:
+        key = None
+    decisions = getattr(request, '_policy_decisions', None)
+    if decisions is None:
+        decisions = {}
+        try:
+            request._policy_decisions = decisions
+        except AttributeError:
+            pass
+    if key is not None and key in decisions:
+        return decisions[key]
+
+    decision = _check(actions, target, credentials)
+    if key is not None:
+        decisions[key] = decision
+    return decision
+
+
+def _check(actions, target, credentials):
     enforcer = _get_enforcer()
 
     for action in actions:
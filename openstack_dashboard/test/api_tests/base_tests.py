@@ -20,6 +20,8 @@
 
 from __future__ import absolute_import
 
+from django.test.utils import override_settings
+
 from horizon import exceptions
 
 from openstack_dashboard.api import base as api_base
@@ -73,6 +75,27 @@ class APIResourceWrapperTests(test.TestCase):
         with self.assertRaises(AttributeError):
             resource.baz
 
+    def test_instance_attribute_overrides_wrapped_attribute(self):
+        resource = APIResource.get_instance()
+        resource.foo = 'override'
+        self.assertEqual('override', resource.foo)
+        self.assertEqual('foo', resource._apiresource.foo)
+
+    def test_property_overrides_wrapped_attribute(self):
+        class PropertyResource(APIResource):
+            @property
+            def foo(self):
+                return 'property'
+
+            @property
+            def bar(self):
+                raise AttributeError('bar')
+
+        resource = PropertyResource(APIResource.get_instance()._apiresource)
+        self.assertEqual('property', resource.foo)
+        # A property failing falls back to the wrapped attribute.
+        self.assertEqual('bar', resource.bar)
+
     def test_repr(self):
         resource = APIResource.get_instance()
         resource_str = resource.__repr__()
@@ -170,6 +193,48 @@ class ApiHelperTests(test.TestCase):
         with self.assertRaises(exceptions.ServiceCatalogException):
             url = api_base.url_for(self.request, 'image')
 
+    def test_url_for_secondary_endpoint_type(self):
+        image = api_base.get_service_from_catalog(
+            self.request.user.service_catalog, 'image')
+        del image['endpoints'][0]['internalURL']
+
+        with override_settings(SECONDARY_ENDPOINT_TYPE='adminURL'):
+            url = api_base.url_for(self.request, 'image',
+                                   endpoint_type='internalURL')
+        self.assertEqual(url, 'http://admin.glance.example.com:9292/v1')
+
+        with self.assertRaises(exceptions.ServiceCatalogException):
+            api_base.url_for(self.request, 'image',
+                             endpoint_type='internalURL')
+
+    def test_is_service_enabled(self):
+        self.assertTrue(api_base.is_service_enabled(self.request, 'image'))
+        self.assertTrue(api_base.is_service_enabled(self.request, 'compute',
+                                                    service_name='nova'))
+        self.assertFalse(api_base.is_service_enabled(self.request, 'compute',
+                                                     service_name='other'))
+        self.assertFalse(api_base.is_service_enabled(self.request,
+                                                     'notAnApi'))
+
+        self.request.user.services_region = "RegionTwo"
+        self.assertTrue(api_base.is_service_enabled(self.request, 'compute'))
+        self.assertFalse(api_base.is_service_enabled(self.request, 'image'))
+        self.assertTrue(api_base.is_service_enabled(self.request,
+                                                    'identity'))
+
+    @override_settings(SERVICE_CATALOG_INDEX_CACHE_SIZE=10)
+    def test_catalog_index_is_reused_for_the_token(self):
+        api_base.catalog_index_cache.clear()
+        index = api_base.get_catalog_index(self.request)
+        self.request.user.service_catalog = []
+
+        self.assertIs(api_base.get_catalog_index(self.request), index)
+        url = api_base.url_for(self.request, 'image')
+        self.assertEqual(url, 'http://public.glance.example.com:9292/v1')
+
+        api_base.catalog_index_cache.clear()
+        self.assertFalse(api_base.is_service_enabled(self.request, 'image'))
+
 
 class QuotaSetTests(test.TestCase):
 
@@ -213,3 +278,35 @@ class QuotaSetTests(test.TestCase):
     def test_quotaset_add_with_wrong_type(self):
         quota_set = api_base.QuotaSet({'foo': 1, 'bar': 10})
         self.assertRaises(ValueError, quota_set.add, {'test': 7})
+
+
+class CachedClientTests(test.TestCase):
+    def setUp(self):
+        super(CachedClientTests, self).setUp()
+        api_base._clients.clients = None
+
+    def test_cached_client_is_reused(self):
+        built = []
+
+        def factory(request):
+            built.append(object())
+            return built[-1]
+
+        with self.settings(API_CLIENT_CACHE_SIZE=2):
+            first = api_base.cached_client(self.request, 'compute', factory)
+            second = api_base.cached_client(self.request, 'compute', factory)
+            api_base.cached_client(self.request, 'volume', factory, 1)
+            api_base.cached_client(self.request, 'volume', factory, 2)
+            # The compute client was the least recently used one.
+            third = api_base.cached_client(self.request, 'compute', factory)
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(4, len(built))
+
+    def test_cached_client_disabled(self):
+        with self.settings(API_CLIENT_CACHE_SIZE=0):
+            first = api_base.cached_client(self.request, 'compute',
+                                           lambda request: object())
+            second = api_base.cached_client(self.request, 'compute',
+                                            lambda request: object())
+        self.assertIsNot(first, second)
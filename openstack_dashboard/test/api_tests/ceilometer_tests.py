@@ -215,6 +215,48 @@ class CeilometerApiTests(test.APITestCase):
         # check that only one resource is returned
         self.assertEqual(len(data), 1)
 
+    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
+                                                         "get_tenant")})
+    def test_global_data_get_partial_statistic_data(self):
+        class TempUsage(api.base.APIResourceWrapper):
+            _attrs = ["id", "tenant", "user", "resource", "fake_meter_1",
+                      "fake_meter_2"]
+
+            meters = ["fake_meter_1",
+                      "fake_meter_2"]
+
+            default_query = ["Fake query"]
+            stats_attr = "max"
+
+        resources = self.resources.list()
+        user = self.ceilometer_users.list()[0]
+        tenant = self.ceilometer_tenants.list()[0]
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.resources = self.mox.CreateMockAnything()
+        ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources[:1])
+
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        ceilometerclient.statistics.list(meter_name=IsA(str),
+                                         period=None, q=IsA(list)).\
+            AndRaise(self.exceptions.ceilometer)
+
+        api.ceilometer.CeilometerUsage\
+                .get_user(IsA(str)).AndReturn(user)
+        api.ceilometer.CeilometerUsage\
+                .get_tenant(IsA(str)).AndReturn(tenant)
+
+        self.mox.ReplayAll()
+
+        ceilometer_usage = api.ceilometer.CeilometerUsage(http.HttpRequest)
+        data = ceilometer_usage.global_data_get(
+            used_cls=TempUsage, query=["fake_query"], with_statistics=True)
+
+        # The resource is still listed, without statistics.
+        self.assertEqual(len(data), 1)
+        self.assertIsNone(data[0].fake_meter_1)
+        self.assertIsNone(data[0].fake_meter_2)
+
     @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
                                                          "get_tenant")})
     def test_global_data_get_without_statistic_data(self):
@@ -19,8 +19,12 @@
 #    under the License.
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test.utils import override_settings
 
+from mox import IsA  # noqa
+
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
 
@@ -112,3 +116,49 @@ class GlanceApiTests(test.APITestCase):
         self.mox.ReplayAll()
         image = api.glance.image_get(self.request, 'empty')
         self.assertIsNone(image.name)
+
+    @override_settings(IMAGE_CACHE_TTL=60)
+    def test_image_get_many_fetches_missing_images_once(self):
+        api.glance.image_cache.clear()
+        images = self.images.list()[:2]
+        glanceclient = self.stub_glanceclient()
+        glanceclient.images = self.mox.CreateMockAnything()
+        for image in images:
+            glanceclient.images.get(image.id).InAnyOrder().AndReturn(image)
+        glanceclient.images.get('missing').InAnyOrder() \
+            .AndRaise(self.exceptions.glance)
+        self.mox.ReplayAll()
+
+        image_ids = [image.id for image in images]
+        result = api.glance.image_get_many(self.request,
+                                           image_ids + ['missing'])
+        self.assertEqual(set(image_ids), set(result))
+        # The images are now served from the cache.
+        result = api.glance.image_get_many(self.request, image_ids)
+        self.assertEqual(set(image_ids), set(result))
+        api.glance.image_cache.clear()
+
+    def test_image_create_uploads_data_in_background(self):
+        cache.clear()
+        image = self.images.first()
+        data = SimpleUploadedFile('image.img', 'x' * 1000)
+        glanceclient = self.stub_glanceclient()
+        glanceclient.images = self.mox.CreateMockAnything()
+        glanceclient.images.create(name=image.name).AndReturn(image)
+        glanceclient.images.update(
+            image.id, data=IsA(api.glance.ImageUpload), purge_props=False) \
+            .WithSideEffects(lambda image_id, data, **kwargs: data.read(300)
+                             and data.read()) \
+            .AndReturn(image)
+        self.mox.ReplayAll()
+
+        api.glance.image_create(self.request, name=image.name, data=data)
+        status = api.glance.image_upload_status(image.id)
+        self.assertEqual('done', status['status'])
+        self.assertEqual(1000, status['size'])
+        self.assertEqual(1000, status['uploaded'])
+        self.assertEqual(status, api.glance.image_upload_status(
+            image.id, self.request.user.tenant_id))
+        self.assertIsNone(api.glance.image_upload_status(image.id,
+                                                         'other_tenant'))
+        self.assertIsNone(api.glance.image_upload_status('unknown'))
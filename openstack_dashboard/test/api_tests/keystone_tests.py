@@ -30,6 +30,11 @@ class FakeConnection(object):
     pass
 
 
+class FakeRoleAssignment(object):
+    def __init__(self, info):
+        self._info = info
+
+
 class ClientConnectionTests(test.TestCase):
     def setUp(self):
         super(ClientConnectionTests, self).setUp()
@@ -84,6 +89,31 @@ class RoleAPITests(test.APITestCase):
         # (it would show up in mox as an unexpected method call)
         role = api.keystone.get_default_role(self.request)
 
+    def test_project_role_assignments(self):
+        keystoneclient = self.stub_keystoneclient()
+        tenant = self.tenants.first()
+        assignments = [
+            FakeRoleAssignment({'role': {'id': '1'}, 'user': {'id': 'u1'}}),
+            FakeRoleAssignment({'role': {'id': '2'}, 'user': {'id': 'u1'}}),
+            FakeRoleAssignment({'role': {'id': '2'}, 'group': {'id': 'g1'}})]
+        keystoneclient.role_assignments = self.mox.CreateMockAnything()
+        keystoneclient.role_assignments.list(project=tenant.id) \
+            .AndReturn(assignments)
+        self.mox.ReplayAll()
+
+        user_roles, group_roles = api.keystone.project_role_assignments(
+            self.request, tenant.id)
+        self.assertEqual({'u1': set(['1', '2'])}, user_roles)
+        self.assertEqual({'g1': set(['2'])}, group_roles)
+
+    def test_role_assignments_diff(self):
+        current = {'u1': set(['1', '2']), 'u2': set(['1'])}
+        requested = {'u1': set(['2', '3']), 'u3': set(['1'])}
+        grants, revokes = api.keystone.role_assignments_diff(current,
+                                                             requested)
+        self.assertEqual([('u1', '3'), ('u3', '1')], grants)
+        self.assertEqual([('u1', '1'), ('u2', '1')], revokes)
+
 
 class ServiceAPITests(test.APITestCase):
     def test_service_wrapper(self):
@@ -23,14 +23,48 @@ class NeutronApiTests(test.APITestCase):
         networks = {'networks': self.api_networks.list()}
         subnets = {'subnets': self.api_subnets.list()}
 
+        subnet_ids = sorted(set(subnet_id
+                                for network in self.api_networks.list()
+                                for subnet_id in network['subnets']))
+
         neutronclient = self.stub_neutronclient()
         neutronclient.list_networks().AndReturn(networks)
-        neutronclient.list_subnets().AndReturn(subnets)
+        neutronclient.list_subnets(id=subnet_ids).AndReturn(subnets)
         self.mox.ReplayAll()
 
         ret_val = api.neutron.network_list(self.request)
         for n in ret_val:
             self.assertIsInstance(n, api.neutron.Network)
+            for subnet in n.subnets:
+                self.assertIsInstance(subnet, api.neutron.Subnet)
+
+    def test_network_list_with_subnet_index(self):
+        networks = {'networks': self.api_networks.list()}
+        subnets = [api.neutron.Subnet(subnet)
+                   for subnet in self.api_subnets.list()]
+        subnet_index = dict((subnet.id, subnet) for subnet in subnets)
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks().AndReturn(networks)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.network_list(self.request,
+                                           subnet_index=subnet_index)
+        self.assertEqual(len(self.api_networks.list()), len(ret_val))
+
+    def test_network_list_for_tenant(self):
+        tenant_id = self.request.user.tenant_id
+        networks = {'networks': []}
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks(tenant_id=tenant_id, shared=False) \
+            .InAnyOrder().AndReturn(networks)
+        neutronclient.list_networks(shared=True) \
+            .InAnyOrder().AndReturn(networks)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.network_list_for_tenant(self.request, tenant_id)
+        self.assertEqual([], ret_val)
 
     def test_network_get(self):
         network = {'network': self.api_networks.first()}
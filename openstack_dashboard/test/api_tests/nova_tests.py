@@ -26,6 +26,7 @@ from django import http
 from django.test.utils import override_settings
 
 from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
 from novaclient.v1_1 import servers
 
 from openstack_dashboard import api
@@ -232,3 +233,134 @@ class ComputeApiTests(test.APITestCase):
                             "maxTotalInstances": 10}
         for key in expected_results.keys():
             self.assertEqual(ret_val[key], expected_results[key])
+
+    @override_settings(FLAVOR_CACHE_TTL=60)
+    def test_flavor_get_many_caches_flavors(self):
+        api.nova.flavor_catalog.clear()
+        flavor = self.flavors.first()
+        novaclient = self.stub_novaclient()
+        novaclient.flavors = self.mox.CreateMockAnything()
+        novaclient.flavors.get(flavor.id).AndReturn(flavor)
+        novaclient.flavors.get('deleted') \
+            .AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
+        novaclient.flavors.get('broken').AndRaise(self.exceptions.nova)
+        novaclient.flavors.get('broken').AndRaise(self.exceptions.nova)
+
+        novaclient.flavors.get('broken').AndReturn(flavor)
+        self.mox.ReplayAll()
+
+        flavor_ids = [flavor.id, flavor.id, 'deleted', 'broken']
+        for i in range(2):
+            # Errors other than NotFound are raised, and only the flavor
+            # which failed to load is fetched again.
+            self.assertRaises(nova_exceptions.ClientException,
+                              api.nova.flavor_get_many,
+                              self.request, flavor_ids)
+        flavors = api.nova.flavor_get_many(self.request, flavor_ids)
+        self.assertEqual({flavor.id: flavor,
+                          'deleted': None,
+                          'broken': flavor}, flavors)
+        api.nova.flavor_catalog.clear()
+
+    @override_settings(FLAVOR_CACHE_TTL=60)
+    def test_flavor_get_many_caches_flavors_per_region(self):
+        api.nova.flavor_catalog.clear()
+        flavor = self.flavors.first()
+        novaclient = self.stub_novaclient()
+        novaclient.flavors = self.mox.CreateMockAnything()
+        novaclient.flavors.get(flavor.id).AndReturn(flavor)
+        novaclient.flavors.get(flavor.id) \
+            .AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
+        self.mox.ReplayAll()
+
+        flavors = api.nova.flavor_get_many(self.request, [flavor.id])
+        self.assertEqual({flavor.id: flavor}, flavors)
+        # The same id is another flavor in another region.
+        self.request.user.services_region = 'RegionTwo'
+        flavors = api.nova.flavor_get_many(self.request, [flavor.id])
+        self.assertEqual({flavor.id: None}, flavors)
+        api.nova.flavor_catalog.clear()
+
+    @override_settings(FLAVOR_CACHE_TTL=60)
+    def test_flavor_get_many_caches_private_flavors_per_project(self):
+        api.nova.flavor_catalog.clear()
+        public = self.flavors.first()
+        private = [flavor for flavor in self.flavors.list()
+                   if not flavor.is_public][0]
+        novaclient = self.stub_novaclient()
+        novaclient.flavors = self.mox.CreateMockAnything()
+        novaclient.flavors.get(public.id).AndReturn(public)
+        novaclient.flavors.get(private.id).AndReturn(private)
+        novaclient.flavors.get(private.id) \
+            .AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
+        self.mox.ReplayAll()
+
+        flavor_ids = [public.id, private.id]
+        flavors = api.nova.flavor_get_many(self.request, flavor_ids)
+        self.assertEqual({public.id: public, private.id: private}, flavors)
+
+        # Another project only gets the public flavor from the catalog.
+        self.request.user.tenant_id = 'other'
+        flavors = api.nova.flavor_get_many(self.request, flavor_ids)
+        self.assertEqual({public.id: public, private.id: None}, flavors)
+        api.nova.flavor_catalog.clear()
+
+    @override_settings(FLAVOR_CACHE_TTL=60)
+    def test_flavor_delete_invalidates_flavor_catalog(self):
+        api.nova.flavor_catalog.clear()
+        flavor = self.flavors.first()
+        novaclient = self.stub_novaclient()
+        novaclient.flavors = self.mox.CreateMockAnything()
+        novaclient.flavors.get(flavor.id).AndReturn(flavor)
+        novaclient.flavors.delete(flavor.id)
+        novaclient.flavors.get(flavor.id) \
+            .AndRaise(nova_exceptions.NotFound(404, 'Not found.'))
+        self.mox.ReplayAll()
+
+        api.nova.flavor_get_many(self.request, [flavor.id])
+        api.nova.flavor_delete(self.request, flavor.id)
+        flavors = api.nova.flavor_get_many(self.request, [flavor.id])
+        self.assertIsNone(flavors[flavor.id])
+        api.nova.flavor_catalog.clear()
+
+    @override_settings(AGGREGATE_CACHE_TTL=60)
+    def test_aggregate_details_list_is_cached(self):
+        api.nova.aggregate_cache.clear()
+        self.request.user.roles = [self.roles.admin._info]
+        aggregates = self.aggregates.list()
+        novaclient = self.stub_novaclient()
+        novaclient.aggregates = self.mox.CreateMockAnything()
+        novaclient.aggregates.list().AndReturn(aggregates)
+        for aggregate in aggregates:
+            novaclient.aggregates.get_details(aggregate.id) \
+                .InAnyOrder().AndReturn(aggregate)
+        novaclient.aggregates.delete(aggregates[0].id)
+        novaclient.aggregates.list().AndReturn([])
+        self.mox.ReplayAll()
+
+        for i in range(2):
+            result = api.nova.aggregate_details_list(self.request)
+            self.assertEqual(len(aggregates), len(result))
+        # Changing an aggregate empties the cache.
+        api.nova.aggregate_delete(self.request, aggregates[0].id)
+        self.assertEqual([], api.nova.aggregate_details_list(self.request))
+        api.nova.aggregate_cache.clear()
+
+    @override_settings(AGGREGATE_CACHE_TTL=60)
+    def test_availability_zone_list_is_not_cached_for_members(self):
+        api.nova.aggregate_cache.clear()
+        self.request.user.roles = [self.roles.admin._info]
+        zones = self.availability_zones.list()
+        novaclient = self.stub_novaclient()
+        novaclient.availability_zones = self.mox.CreateMockAnything()
+        novaclient.availability_zones.list(detailed=True).AndReturn(zones)
+        novaclient.availability_zones.list(detailed=True).AndReturn([])
+        self.mox.ReplayAll()
+
+        self.assertEqual(len(zones), len(
+            api.nova.availability_zone_list(self.request, detailed=True)))
+        # The zones cached for the admin aren't served to members.
+        self.request.user.roles = [self.roles.member._info]
+        self.assertEqual([], api.nova.availability_zone_list(self.request,
+                                                             detailed=True))
+        api.nova.aggregate_cache.clear()
@@ -140,6 +140,27 @@ class SwiftApiTests(test.APITestCase):
                                          object.name)
         self.assertEqual(obj.name, object.name)
 
+    def test_swift_get_object_range_in_chunks(self):
+        container = self.containers.first()
+        object = self.objects.first()
+        headers = {'content-length': '4', 'content-range': 'bytes 5-8/9'}
+
+        swift_api = self.stub_swiftclient()
+        swift_api.get_object(container.name, object.name,
+                             resp_chunk_size=2,
+                             headers={'Range': 'bytes=5-'}) \
+            .AndReturn([headers, iter(['Da', 'ta'])])
+
+        self.mox.ReplayAll()
+
+        obj = api.swift.swift_get_object(self.request,
+                                         container.name,
+                                         object.name,
+                                         resp_chunk_size=2,
+                                         byte_range='bytes=5-')
+        self.assertEqual('bytes 5-8/9', obj.content_range)
+        self.assertEqual(['Da', 'ta'], list(obj.data))
+
     def test_swift_get_object_without_data(self):
         container = self.containers.first()
         object = self.objects.first()
@@ -0,0 +1,140 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Micro-benchmarks of the work tables do for each of their rows.
+
+Tables read many fields of each of their rows through the wrappers of
+:mod:`openstack_dashboard.api`, and check the policy rules of the row
+actions of every row. Run the benchmarks with::
+
+    DJANGO_SETTINGS_MODULE=openstack_dashboard.test.settings \\
+        python -m openstack_dashboard.test.benchmarks [number]
+
+For Server, Network, Port and Volume wrappers, this prints the time taken to
+wrap an API object, and to read one of its wrapped fields, in microseconds.
+Each is the best of three runs of ``number`` (10000 by default) iterations.
+
+It then prints the time taken to check the policy rules of the row actions
+of the instances table for one row, in microseconds, evaluating every check
+(as before decisions were memoized) and through :func:`policy.check`, over
+a table of ``ROWS`` rows rendered ``number / ROWS`` times.
+"""
+
+import sys
+import timeit
+
+from django.test.client import RequestFactory  # noqa
+from openstack_auth import utils as auth_utils
+
+from openstack_dashboard import api
+from openstack_dashboard.dashboards.project.instances import tables
+from openstack_dashboard import policy
+from openstack_dashboard.test.test_data import utils
+
+
+DEFAULT_NUMBER = 10000
+# Number of rows of the tables whose policy checks are measured.
+ROWS = 100
+
+
+def _fields(wrapper):
+    """Returns the names of the wrapped fields ``wrapper`` has a value for.
+
+    Properties of the wrapper classes are left out, some of them make API
+    calls.
+    """
+    if isinstance(wrapper, api.base.APIDictWrapper):
+        names = list(wrapper._apidict)
+    else:
+        names = [attr for attr in wrapper._attrs
+                 if not isinstance(getattr(type(wrapper), attr, None),
+                                   property)]
+    return [name for name in names if hasattr(wrapper, name)]
+
+
+def wrappers(data):
+    """Returns the wrappers to measure, as (name, wrap function) pairs."""
+    server = data.servers.first()
+    network = data.api_networks.first()
+    port = data.api_ports.first()
+    volume = data.cinder_volumes.first()
+    # The neutron wrappers modify the dict they wrap.
+    return (('Server', lambda: api.nova.Server(server, None)),
+            ('Network', lambda: api.neutron.Network(dict(network))),
+            ('Port', lambda: api.neutron.Port(dict(port))),
+            ('Volume', lambda: api.cinder.Volume(volume)))
+
+
+def policy_checks(data):
+    """Returns the policy check benchmarks, as (name, function) pairs.
+
+    Each function checks the policy rules of the row actions of the
+    instances table for the ``ROWS`` rows of a table, with a new request
+    like a page rendering it.
+    """
+    rules = [action.policy_rules
+             for action in tables.InstancesTable._meta.row_actions
+             if getattr(action, 'policy_rules', None)]
+    project_ids = [server.tenant_id for server in data.servers.list()]
+    factory = RequestFactory()
+
+    # Pages get their user from the session, the test user is used instead.
+    auth_utils.get_user = lambda request: data.user
+
+    def evaluated():
+        request = factory.get('/')
+        for row in range(ROWS):
+            for rule in rules:
+                target = {'project_id': project_ids[row % len(project_ids)],
+                          'user_id': data.user.id}
+                policy._check(rule, target,
+                              policy._user_to_credentials(request, data.user))
+
+    def memoized():
+        request = factory.get('/')
+        for row in range(ROWS):
+            for rule in rules:
+                target = {'project_id': project_ids[row % len(project_ids)]}
+                policy.check(rule, request, target)
+
+    return (('Evaluated', evaluated), ('Memoized', memoized))
+
+
+def _best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def run(number=DEFAULT_NUMBER):
+    data = utils.load_test_data()
+    for name, wrap in wrappers(data):
+        wrapper = wrap()
+        fields = _fields(wrapper)
+
+        def read():
+            for field in fields:
+                getattr(wrapper, field)
+
+        wrap_time = _best(wrap, number) * 1e6
+        read_time = _best(read, number) * 1e6 / len(fields)
+        print('%-8s wrap: %7.3f us  read: %6.3f us/field (%d fields)'
+              % (name, wrap_time, read_time, len(fields)))
+
+    renders = max(1, number // ROWS)
+    for name, render in policy_checks(data):
+        row_time = _best(render, renders) * 1e6 / ROWS
+        print('%-9s policy checks: %8.3f us/row' % (name, row_time))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUMBER)
@@ -178,6 +178,21 @@ LOGGING['loggers'].update(
     }
 )
 
+# Run the calls of worker pools inline, in order, so that they match the
+# recorded mox expectations.
+WORKER_POOLS_INLINE = True
+
+# Tests record the API calls made by each view, don't cache quota usages,
+# API clients, images, flavors, projects, aggregates or service catalog
+# indexes between them.
+QUOTA_USAGES_CACHE_TTL = 0
+API_CLIENT_CACHE_SIZE = 0
+IMAGE_CACHE_TTL = 0
+FLAVOR_CACHE_TTL = 0
+PROJECT_LIST_CACHE_TTL = 0
+AGGREGATE_CACHE_TTL = 0
+SERVICE_CATALOG_INDEX_CACHE_SIZE = 0
+
 SECURITY_GROUP_RULES = {
     'all_tcp': {
         'name': 'ALL TCP',
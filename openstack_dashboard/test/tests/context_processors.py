@@ -0,0 +1,66 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from django.test.utils import override_settings
+
+from openstack_dashboard import context_processors
+from openstack_dashboard.test import helpers as test
+
+
+class ContextProcessorTests(test.TestCase):
+    def setUp(self):
+        super(ContextProcessorTests, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.path = os.path.join(self.tempdir, 'admin-notice.txt')
+
+    def write_notice(self, notice, mtime):
+        with open(self.path, 'w') as f:
+            f.write(notice)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_file_line_is_read_again_when_modified(self):
+        self.write_notice('Maintenance tonight\nignored\n', 1000)
+        notice = context_processors.FileLine(self.path, 0)
+        self.assertEqual('Maintenance tonight', notice.get())
+
+        self.write_notice('Maintenance done\n', 2000)
+        self.assertEqual('Maintenance done', notice.get())
+
+        os.remove(self.path)
+        self.assertEqual('', notice.get())
+
+    def test_file_line_is_checked_at_most_every_interval(self):
+        self.write_notice('Maintenance tonight\n', 1000)
+        notice = context_processors.FileLine(self.path, 60)
+        self.assertEqual('Maintenance tonight', notice.get())
+
+        self.write_notice('Maintenance done\n', 2000)
+        self.assertEqual('Maintenance tonight', notice.get())
+
+    def test_openstack_context(self):
+        self.write_notice('Maintenance tonight\n', 1000)
+        with override_settings(ADMIN_NOTICE_FILE=self.path):
+            # The test case replaces the context processor with a stub.
+            context = self._real_context_processor(self.request)
+        self.assertEqual('Maintenance tonight', context['admin_notice'])
+        self.assertIn('support', context['regions'])
+
+    def test_missing_admin_notice_file(self):
+        with override_settings(ADMIN_NOTICE_FILE=self.path):
+            self.assertEqual('', context_processors.get_admin_notice())
@@ -14,10 +14,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django import http
+from mox import IsA  # noqa
+
 from openstack_dashboard import policy
+from openstack_dashboard.openstack.common import fileutils
 from openstack_dashboard.test import helpers as test
 
 
+class FakeTime(object):
+    """Stands for the time module, telling the time of ``clock[0]``."""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def time(self):
+        return self.clock[0]
+
+
 class PolicyTestCase(test.TestCase):
     def test_policy_file_load(self):
         policy.reset()
@@ -65,6 +79,78 @@ class PolicyTestCase(test.TestCase):
                              request=self.request)
         self.assertTrue(value)
 
+    def test_check_is_memoized_per_request(self):
+        policy.reset()
+        enforcer = policy._get_enforcer()['compute']
+        self.mox.StubOutWithMock(enforcer, 'enforce')
+        enforcer.enforce('compute:start', {'project_id': '1',
+                                           'user_id': self.user.id},
+                         IsA(dict)).AndReturn(True)
+        enforcer.enforce('compute:start', {'project_id': '2',
+                                           'user_id': self.user.id},
+                         IsA(dict)).AndReturn(False)
+        self.mox.ReplayAll()
+
+        for i in range(3):
+            self.assertTrue(policy.check((("compute", "compute:start"),),
+                                         self.request, {'project_id': '1'}))
+        self.assertFalse(policy.check((("compute", "compute:start"),),
+                                      self.request, {'project_id': '2'}))
+
+    def test_rules_are_reloaded_on_interval(self):
+        policy.reset()
+        enforcer = policy._get_enforcer()['compute']
+        self.mox.StubOutWithMock(fileutils, 'read_cached_file')
+        fileutils.read_cached_file(enforcer.policy_path,
+                                   force_reload=False) \
+            .AndReturn((True, '{"default": ""}'))
+        self.mox.ReplayAll()
+
+        with self.settings(POLICY_RELOAD_INTERVAL=3600):
+            for i in range(3):
+                enforcer.load_rules()
+
+    def test_decisions_are_stored_on_the_request(self):
+        policy.reset()
+        enforcer = policy._get_enforcer()['compute']
+        self.mox.StubOutWithMock(enforcer, 'enforce')
+        target = {'project_id': '1', 'user_id': self.user.id}
+        enforcer.enforce('compute:start', target, IsA(dict)) \
+            .AndReturn(True)
+        enforcer.enforce('compute:start', target, IsA(dict)) \
+            .AndReturn(False)
+        self.mox.ReplayAll()
+
+        actions = (("compute", "compute:start"),)
+        self.assertTrue(policy.check(actions, self.request,
+                                     {'project_id': '1'}))
+        self.assertEqual([True], self.request._policy_decisions.values())
+
+        # Another request evaluates the check again.
+        request = http.HttpRequest()
+        self.assertFalse(policy.check(actions, request, {'project_id': '1'}))
+        self.assertTrue(policy.check(actions, self.request,
+                                     {'project_id': '1'}))
+
+    def test_rules_are_reloaded_after_interval(self):
+        policy.reset()
+        enforcer = policy._get_enforcer()['compute']
+        clock = [1000.0]
+        self.mox.stubs.Set(policy, 'time', FakeTime(clock))
+        self.mox.StubOutWithMock(fileutils, 'read_cached_file')
+        for i in range(2):
+            fileutils.read_cached_file(enforcer.policy_path,
+                                       force_reload=False) \
+                .AndReturn((True, '{"default": ""}'))
+        self.mox.ReplayAll()
+
+        with self.settings(POLICY_RELOAD_INTERVAL=60):
+            enforcer.load_rules()
+            clock[0] += 59
+            enforcer.load_rules()
+            clock[0] += 1
+            enforcer.load_rules()
+
 
 class PolicyTestCaseAdmin(test.BaseAdminViewTests):
     def test_check_admin_required_true(self):
@@ -21,6 +21,8 @@
 
 from __future__ import absolute_import
 
+import copy
+
 from django import http
 from mox import IsA  # noqa
 
@@ -198,3 +200,69 @@ class QuotaTests(test.APITestCase):
 
         # Compare internal structure of usages to expected.
         self.assertEqual(quota_usages.usages, expected_output)
+
+    def _stub_usages_without_volume(self, servers, flavors):
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                    'volume').AndReturn(False)
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                    'network').AndReturn(False)
+        api.nova.flavor_list(IsA(http.HttpRequest)).AndReturn(flavors)
+        api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
+            .AndReturn(self.quotas.first())
+        api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.floating_ips.list())
+        api.nova.server_list(IsA(http.HttpRequest)) \
+            .AndReturn([servers, False])
+
+    @test.create_stubs({api.nova: ('server_list',
+                                   'flavor_list',
+                                   'flavor_get',
+                                   'tenant_quota_get',),
+                        api.network: ('tenant_floating_ip_list',),
+                        api.base: ('is_service_enabled',)})
+    def test_tenant_quota_usages_fetches_missing_flavors_once(self):
+        servers = [s for s in self.servers.list()
+                   if s.tenant_id == self.request.user.tenant_id]
+        flavors = dict((f.id, f) for f in self.flavors.list())
+        self._stub_usages_without_volume(servers, [])
+        for flavor_id in set(s.flavor['id'] for s in servers):
+            api.nova.flavor_get(IsA(http.HttpRequest), flavor_id) \
+                .InAnyOrder().AndReturn(flavors[flavor_id])
+
+        self.mox.ReplayAll()
+
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(quota_usages.usages,
+                         self.get_usages(with_volume=False))
+
+    @test.create_stubs({api.nova: ('server_list',
+                                   'flavor_list',
+                                   'tenant_quota_get',),
+                        api.network: ('tenant_floating_ip_list',),
+                        api.base: ('is_service_enabled',)})
+    def test_tenant_quota_usages_cache(self):
+        servers = [s for s in self.servers.list()
+                   if s.tenant_id == self.request.user.tenant_id]
+        self._stub_usages_without_volume(servers, self.flavors.list())
+        self._stub_usages_without_volume(servers, self.flavors.list())
+        self._stub_usages_without_volume(servers, self.flavors.list())
+
+        self.mox.ReplayAll()
+
+        with self.settings(QUOTA_USAGES_CACHE_TTL=60):
+            quotas.invalidate_tenant_quota_usages(self.request)
+            first = quotas.tenant_quota_usages(copy.copy(self.request))
+            cached = quotas.tenant_quota_usages(copy.copy(self.request))
+            quotas.invalidate_tenant_quota_usages(self.request)
+            refreshed = quotas.tenant_quota_usages(copy.copy(self.request))
+            # The usages of another region aren't served from the cache.
+            self.request.user.services_region = 'RegionTwo'
+            quotas.invalidate_tenant_quota_usages(self.request)
+            other_region = quotas.tenant_quota_usages(
+                copy.copy(self.request))
+            quotas.invalidate_tenant_quota_usages(self.request)
+        expected_output = self.get_usages(with_volume=False)
+        self.assertEqual(first.usages, expected_output)
+        self.assertEqual(cached.usages, expected_output)
+        self.assertEqual(refreshed.usages, expected_output)
+        self.assertEqual(other_region.usages, expected_output)
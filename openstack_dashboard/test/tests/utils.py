@@ -15,10 +15,25 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+import time
 import uuid
 
+from django.core.cache import cache
+from django import http
+from django.test.utils import override_settings
+
+from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
+
+from horizon import conf
+
+from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
+from openstack_dashboard.utils import concurrency
 from openstack_dashboard.utils import filters
+from openstack_dashboard.utils import lookups
+from openstack_dashboard.utils import row_updates
 
 
 class UtilsFilterTests(test.TestCase):
@@ -40,3 +55,134 @@ class UtilsFilterTests(test.TestCase):
     def test_reject_random_string(self):
         val = '55WbJTpJDf'
         self.assertRaises(ValueError, filters.get_int_or_uuid, val)
+
+
+class ConcurrencyTests(test.TestCase):
+    def test_map_keeps_order(self):
+        pool = concurrency.WorkerPool(3)
+        self.assertEqual([0, 2, 4, 6], pool.map(lambda x: x * 2, range(4)))
+
+    def test_inline_pool(self):
+        pool = concurrency.WorkerPool(0)
+        future = pool.submit(threading.current_thread)
+        self.assertEqual(threading.current_thread(), future.result())
+
+    def test_result_raises_call_exception(self):
+        pool = concurrency.WorkerPool(1)
+        future = pool.submit(int, 'not a number')
+        self.assertRaises(ValueError, future.result)
+        self.assertIsInstance(future.exception(), ValueError)
+
+    def test_gather_returns_partial_results(self):
+        def call(x):
+            if x == 2:
+                raise ValueError()
+            return x
+
+        futures = concurrency.gather(concurrency.WorkerPool(2), call,
+                                     range(5))
+        self.assertEqual([0, 1, 3, 4], [f.result() for f in futures
+                                        if f.exception() is None])
+        self.assertIsInstance(futures[2].exception(), ValueError)
+
+    def test_gather_limits_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call(x):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        concurrency.gather(concurrency.WorkerPool(8), call, range(10),
+                           limit=2)
+        self.assertEqual(2, running[1])
+
+    def test_gather_times_out(self):
+        event = threading.Event()
+        futures = concurrency.gather(concurrency.WorkerPool(2), event.wait,
+                                     [5, 0], timeout=0.05)
+        event.set()
+        self.assertIsInstance(futures[0].exception(),
+                              concurrency.TimeoutError)
+        self.assertEqual(False, futures[1].result())
+
+    def test_task_graph(self):
+        graph = concurrency.TaskGraph(concurrency.WorkerPool(2))
+        graph.add('a', lambda: 1)
+        graph.add('b', lambda: 1 / 0)
+        graph.add('c', lambda a: a + 1, requires=('a',))
+        graph.add('d', lambda b, c: c, requires=('b', 'c'))
+        futures = graph.run()
+        self.assertEqual(2, futures['c'].result())
+        self.assertIsInstance(futures['b'].exception(), ZeroDivisionError)
+        # Calls whose requirements failed aren't run.
+        self.assertIsInstance(futures['d'].exception(), ZeroDivisionError)
+
+    def test_task_graph_unknown_requirement(self):
+        graph = concurrency.TaskGraph(concurrency.WorkerPool(0))
+        self.assertRaises(ValueError, graph.add, 'a', lambda b: b,
+                          requires=('b',))
+
+    def test_pool_stats(self):
+        pool = concurrency.WorkerPool(2)
+        pool.map(lambda x: x, range(3))
+        stats = pool.stats()
+        self.assertEqual(3, stats['submitted'])
+        self.assertEqual(3, stats['completed'])
+        self.assertEqual(0, stats['queue_depth'])
+
+
+class RowUpdatesTests(test.TestCase):
+    @override_settings(ROW_UPDATE_MAX_INTERVAL=60000)
+    def test_poll_interval_grows_while_status_is_unchanged(self):
+        cache.clear()
+        interval = conf.HORIZON_CONFIG['ajax_poll_interval']
+        intervals = []
+        for status in ('BUILD', 'BUILD', 'BUILD', 'ACTIVE'):
+            intervals.append(row_updates.poll_intervals(
+                self.request, 'instances', {'1': [status]})['1'])
+        expected = [min(interval * factor, 60000)
+                    for factor in (1, 2, 4, 1)]
+        self.assertEqual(expected, intervals)
+
+    def test_get_many_leaves_out_deleted_objects(self):
+        def get(obj_id):
+            if obj_id == 'deleted':
+                raise nova_exceptions.NotFound(404, 'Not found.')
+            return obj_id
+
+        self.assertEqual(['1', '2'],
+                         row_updates.get_many(get, ['1', 'deleted', '2']))
+
+    def test_get_many_raises_other_errors(self):
+        def get(obj_id):
+            raise self.exceptions.nova
+
+        self.assertRaises(self.exceptions.nova.__class__,
+                          row_updates.get_many, get, ['1'])
+
+
+class LookupsTests(test.TestCase):
+    def test_index_by_id(self):
+        tenants = self.tenants.list()
+        index = lookups.index_by_id(tenants)
+        self.assertEqual(len(tenants), len(index))
+        for tenant in tenants:
+            self.assertEqual(tenant, index[tenant.id])
+
+    @override_settings(PROJECT_LIST_CACHE_TTL=60)
+    def test_project_list_is_cached(self):
+        lookups.project_list_cache.clear()
+        self.mox.StubOutWithMock(api.keystone, 'tenant_list')
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
+        self.mox.ReplayAll()
+
+        for i in range(2):
+            self.assertEqual(self.tenants.list(),
+                             lookups.project_list(self.request))
+        lookups.project_list_cache.clear()
@@ -13,7 +13,9 @@
 from __future__ import division
 
 import datetime
+import logging
 
+from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
@@ -25,6 +27,11 @@ from openstack_dashboard import api
 from openstack_dashboard.usage import quotas
 
 
+LOG = logging.getLogger(__name__)
+
+DEFAULT_USAGE_EXPORT_WINDOW_DAYS = 7
+
+
 class BaseUsage(object):
     show_terminated = False
 
@@ -225,6 +232,46 @@ class BaseUsage(object):
                 self.summary.setdefault(key, 0)
                 self.summary[key] += value
 
+    def usage_windows(self, start, end):
+        """Yields the usages from ``start`` to ``end``, window by window.
+
+        Yields ``(window_start, window_end, usage_list)`` for windows of
+        USAGE_EXPORT_WINDOW_DAYS days, fetching the usages of a window only
+        when the previous one has been consumed, so that a long period
+        isn't held in memory at once. Since the response has already
+        started by then, a window whose usages can't be retrieved is
+        logged and yielded with a ``usage_list`` of ``None``, for the
+        export to mark it as missing.
+        """
+        if not api.nova.extension_supported('SimpleTenantUsage', self.request):
+            return
+        days = getattr(settings, 'USAGE_EXPORT_WINDOW_DAYS',
+                       DEFAULT_USAGE_EXPORT_WINDOW_DAYS)
+        end = min(end, self.today)
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + datetime.timedelta(days=days,
+                                                               seconds=-1),
+                             end)
+            # The API can't handle timezone aware datetime.
+            try:
+                usage_list = self.get_usage_list(
+                    timezone.make_naive(window_start, timezone.utc),
+                    timezone.make_naive(window_end, timezone.utc))
+            except Exception:
+                LOG.exception('Unable to retrieve the usages from %s to %s.'
+                              % (window_start, window_end))
+                usage_list = None
+            yield window_start, window_end, usage_list
+            window_start += datetime.timedelta(days=days)
+
+    @staticmethod
+    def missing_window_row(start, end):
+        """Returns the CSV row marking a window whose usages are missing."""
+        return (start.date(),
+                end.date(),
+                _("Error: unable to retrieve the usage of this period."))
+
     def get_quotas(self):
         try:
             self.quotas = quotas.tenant_quota_usages(self.request)
@@ -242,6 +289,10 @@ class BaseUsage(object):
         return "?start=%s&end=%s&format=csv" % (data['start'],
                                                 data['end'])
 
+    def csv_export_link(self):
+        """Returns the link of the streamed CSV export, by time window."""
+        return self.csv_link() + "&stream=true"
+
 
 class GlobalUsage(BaseUsage):
     show_terminated = True
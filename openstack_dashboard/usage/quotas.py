@@ -14,6 +14,8 @@ from collections import defaultdict
 import itertools
 import logging
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
@@ -24,6 +26,7 @@ from openstack_dashboard.api import cinder
 from openstack_dashboard.api import network
 from openstack_dashboard.api import neutron
 from openstack_dashboard.api import nova
+from openstack_dashboard.utils import concurrency
 
 
 LOG = logging.getLogger(__name__)
@@ -58,6 +61,9 @@ NEUTRON_QUOTA_FIELDS = ("network",
 
 QUOTA_FIELDS = NOVA_QUOTA_FIELDS + CINDER_QUOTA_FIELDS + NEUTRON_QUOTA_FIELDS
 
+DEFAULT_WORKERS = 10
+DEFAULT_USAGES_CACHE_TTL = 10
+
 
 class QuotaUsage(dict):
     """Tracks quota limit, used, and available for a given set of quotas."""
@@ -189,37 +195,79 @@ def get_disabled_quotas(request):
     return disabled_quotas
 
 
+def _usages_cache_key(request, tenant_id):
+    # Each region has its own quotas and resources.
+    return 'quotas:usages:%s:%s' % (request.user.services_region, tenant_id)
+
+
+def invalidate_tenant_quota_usages(request, tenant_id=None):
+    """Drops the cached usages of a project.
+
+    To be called after creating or deleting resources counted by
+    :func:`tenant_quota_usages`, or after updating the project quotas.
+    """
+    cache.delete(_usages_cache_key(request,
+                                   tenant_id or request.user.tenant_id))
+
+
+def _call(func):
+    return func()
+
+
 @memoized
 def tenant_quota_usages(request):
+    """Returns the :class:`QuotaUsage` of the current project.
+
+    The quotas and resources are fetched concurrently, and the result is
+    cached for QUOTA_USAGES_CACHE_TTL seconds (0 disables the cache).
+    """
+    ttl = getattr(settings, 'QUOTA_USAGES_CACHE_TTL',
+                  DEFAULT_USAGES_CACHE_TTL)
+    key = _usages_cache_key(request, request.user.tenant_id)
+    if ttl:
+        usages = cache.get(key)
+        if usages is not None:
+            return usages
+
     # Get our quotas and construct our usage object.
     disabled_quotas = get_disabled_quotas(request)
 
+    pool = concurrency.get_pool(
+        'quotas', getattr(settings, 'QUOTA_USAGES_WORKERS', DEFAULT_WORKERS))
+    calls = [lambda: get_tenant_quota_data(request,
+                                           disabled_quotas=disabled_quotas),
+             lambda: network.tenant_floating_ip_list(request),
+             lambda: nova.flavor_list(request),
+             lambda: nova.server_list(request)]
+    if 'volumes' not in disabled_quotas:
+        calls.extend([lambda: cinder.volume_list(request),
+                      lambda: cinder.volume_snapshot_list(request)])
+    results = [future.result()
+               for future in concurrency.gather(pool, _call, calls)]
+    quota_data, floating_ips, flavor_list, (instances, has_more) = \
+        results[:4]
+
     usages = QuotaUsage()
-    for quota in get_tenant_quota_data(request,
-                                       disabled_quotas=disabled_quotas):
+    for quota in quota_data:
         usages.add_quota(quota)
 
-    # Get our usages.
-    floating_ips = network.tenant_floating_ip_list(request)
-    flavors = dict([(f.id, f) for f in nova.flavor_list(request)])
-    instances, has_more = nova.server_list(request)
     # Fetch deleted flavors if necessary.
+    flavors = dict([(f.id, f) for f in flavor_list])
     missing_flavors = [instance.flavor['id'] for instance in instances
                        if instance.flavor['id'] not in flavors]
-    for missing in missing_flavors:
-        if missing not in flavors:
-            try:
-                flavors[missing] = nova.flavor_get(request, missing)
-            except Exception:
-                flavors[missing] = {}
-                exceptions.handle(request, ignore=True)
+    try:
+        found_flavors = nova.flavor_get_many(request, missing_flavors)
+    except Exception:
+        found_flavors = {}
+        exceptions.handle(request, ignore=True)
+    for flavor_id in missing_flavors:
+        flavors[flavor_id] = found_flavors.get(flavor_id) or {}
 
     usages.tally('instances', len(instances))
     usages.tally('floating_ips', len(floating_ips))
 
     if 'volumes' not in disabled_quotas:
-        volumes = cinder.volume_list(request)
-        snapshots = cinder.volume_snapshot_list(request)
+        volumes, snapshots = results[4:]
         usages.tally('gigabytes', sum([int(v.size) for v in volumes]))
         usages.tally('volumes', len(volumes))
         usages.tally('snapshots', len(snapshots))
@@ -234,6 +282,8 @@ def tenant_quota_usages(request):
         usages.tally('cores', 0)
         usages.tally('ram', 0)
 
+    if ttl:
+        cache.set(key, usages, ttl)
     return usages
 
 
@@ -29,6 +29,15 @@ class CSVSummary(tables.LinkAction):
         return self.table.kwargs['usage'].csv_link()
 
 
+class CSVExport(tables.LinkAction):
+    name = "csv_export"
+    verbose_name = _("Download CSV by Period")
+    classes = ("btn-download",)
+
+    def get_link_url(self, usage=None):
+        return self.table.kwargs['usage'].csv_export_link()
+
+
 class BaseUsageTable(tables.DataTable):
     vcpus = tables.Column('vcpus', verbose_name=_("VCPUs"))
     disk = tables.Column('local_gb', verbose_name=_("Disk"))
@@ -54,7 +63,7 @@ class GlobalUsageTable(BaseUsageTable):
         verbose_name = _("Usage")
         columns = ("project", "vcpus", "disk", "memory",
                    "hours", "disk_hours")
-        table_actions = (CSVSummary,)
+        table_actions = (CSVSummary, CSVExport)
         multi_select = False
 
 
@@ -82,5 +91,5 @@ class ProjectUsageTable(BaseUsageTable):
         name = "project_usage"
         verbose_name = _("Usage")
         columns = ("instance", "vcpus", "disk", "memory", "uptime")
-        table_actions = (CSVSummary,)
+        table_actions = (CSVSummary, CSVExport)
         multi_select = False
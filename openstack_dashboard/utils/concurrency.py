@@ -0,0 +1,337 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Bounded worker pools for running independent API calls concurrently.
+
+Pools are created once per process and shared between requests, so the
+number of threads (and of simultaneous connections to a backend) stays
+bounded no matter how many calls a page needs.
+"""
+
+import logging
+import Queue
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+
+LOG = logging.getLogger(__name__)
+
+
+class TimeoutError(Exception):
+    pass
+
+
+class Future(object):
+    """The pending result of a call submitted to a :class:`WorkerPool`."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def done(self):
+        return self._done.is_set()
+
+    def set_result(self, result):
+        self._result = result
+        self._done.set()
+
+    def set_exc_info(self, exc_info):
+        self._exc_info = exc_info
+        self._done.set()
+
+    def exception(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError()
+        if self._exc_info:
+            return self._exc_info[1]
+        return None
+
+    def result(self, timeout=None):
+        """Returns the result of the call, re-raising its exception."""
+        if not self._done.wait(timeout):
+            raise TimeoutError()
+        if self._exc_info:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+
+def _run(future, func, args, kwargs):
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception:
+        future.set_exc_info(sys.exc_info())
+
+
+class PoolStats(object):
+    """Counters and latencies of the calls run by a pool.
+
+    ``wait`` is the time calls spent queued before a thread picked them up,
+    ``run`` the time they took to run, both in seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+        self.max_run = 0.0
+
+    def record_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def record(self, wait, run, failed):
+        with self._lock:
+            self.completed += 1
+            if failed:
+                self.failed += 1
+            self.total_wait += wait
+            self.total_run += run
+            self.max_wait = max(self.max_wait, wait)
+            self.max_run = max(self.max_run, run)
+
+    def as_dict(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {'submitted': self.submitted,
+                    'completed': self.completed,
+                    'failed': self.failed,
+                    'avg_wait': self.total_wait / completed,
+                    'avg_run': self.total_run / completed,
+                    'max_wait': self.max_wait,
+                    'max_run': self.max_run}
+
+
+class WorkerPool(object):
+    """A fixed number of daemon threads consuming calls from a queue.
+
+    Threads are started on the first submitted call. A pool of size 0 runs
+    every call inline in the caller's thread, which keeps the call order
+    deterministic (used by the test suite).
+
+    Calls running on a pool must not wait on other calls submitted to the
+    same pool, or a saturated pool deadlocks.
+    """
+
+    def __init__(self, size, name='pool'):
+        self.size = size
+        self.name = name
+        self._queue = Queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = PoolStats()
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._work,
+                    name='%s-%d' % (self.name, len(self._threads)))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _execute(self, submitted, future, func, args, kwargs):
+        started = time.time()
+        _run(future, func, args, kwargs)
+        self._stats.record(started - submitted, time.time() - started,
+                           future._exc_info is not None)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._execute(*item)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self._stats.record_submit()
+        if self.size <= 0:
+            self._execute(time.time(), future, func, args, kwargs)
+            return future
+        if len(self._threads) < self.size:
+            self._start()
+        self._queue.put((time.time(), future, func, args, kwargs))
+        return future
+
+    def stats(self):
+        """Returns the queue depth and latency metrics of the pool."""
+        stats = self._stats.as_dict()
+        stats.update({'name': self.name,
+                      'size': self.size,
+                      'queue_depth': self._queue.qsize()})
+        return stats
+
+    def map(self, func, *iterables):
+        """Runs ``func`` over the iterables and returns results in order."""
+        futures = [self.submit(func, *args) for args in zip(*iterables)]
+        return [f.result() for f in futures]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, size):
+    """Returns the process wide pool called ``name``, creating it if needed.
+
+    ``size`` is only used when the pool is created. When the
+    WORKER_POOLS_INLINE setting is True, pools run calls inline instead.
+    """
+    if getattr(settings, 'WORKER_POOLS_INLINE', False):
+        size = 0
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = WorkerPool(size, name=name)
+        return pool
+
+
+def imap(pool, func, items, limit=None, timeout=None):
+    """Runs ``func`` on every item on ``pool``, yielding futures in order.
+
+    At most ``limit`` calls of this batch are queued or running at any
+    time, so a single request can't monopolize a shared pool. A call still
+    running ``timeout`` seconds after it was submitted is given up on (its
+    thread can't be interrupted, but its result is ignored).
+
+    Yields the future of each item, in the order of ``items``, as soon as
+    it and the ones before it are done. Calls which failed or timed out
+    are not raised: check ``future.exception()`` to keep the partial
+    results of the others.
+    """
+    items = list(items)
+    futures = [None] * len(items)
+    finished = Queue.Queue()
+    deadlines = {}
+    limit = limit or len(items)
+    position = 0
+    yielded = 0
+
+    def call(index, item):
+        try:
+            return func(item)
+        finally:
+            finished.put(index)
+
+    while yielded < len(items):
+        while position < len(items) and len(deadlines) < limit:
+            futures[position] = pool.submit(call, position, items[position])
+            deadlines[position] = time.time() + timeout if timeout else None
+            position += 1
+        wait = None
+        if timeout:
+            wait = max(0, min(deadlines.values()) - time.time())
+        try:
+            deadlines.pop(finished.get(timeout=wait), None)
+        except Queue.Empty:
+            now = time.time()
+            for index, deadline in deadlines.items():
+                if deadline <= now:
+                    del deadlines[index]
+                    futures[index] = Future()
+                    try:
+                        raise TimeoutError('Call timed out after %s seconds.'
+                                           % timeout)
+                    except TimeoutError:
+                        futures[index].set_exc_info(sys.exc_info())
+        while yielded < position and yielded not in deadlines:
+            yield futures[yielded]
+            yielded += 1
+
+
+class TaskGraph(object):
+    """Calls depending on the results of other calls, run on a pool.
+
+    Each call is submitted as soon as the calls it requires are done, and
+    gets their results as arguments, so independent calls run at the same
+    time::
+
+        graph = TaskGraph(pool)
+        graph.add('servers', lambda: api.nova.server_list(request))
+        graph.add('addresses', update_addresses, requires=('servers',))
+        graph.add('flavors', lambda: api.nova.flavor_list(request))
+        futures = graph.run()
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._tasks = []
+
+    def add(self, name, func, requires=()):
+        """Adds a call. The calls it requires must have been added before."""
+        names = [task[0] for task in self._tasks]
+        for required in requires:
+            if required not in names:
+                raise ValueError('Unknown required call: %s' % required)
+        self._tasks.append((name, func, tuple(requires)))
+
+    def run(self):
+        """Runs the calls and returns their futures, by name.
+
+        Failures aren't raised: a call whose requirements failed isn't run,
+        and its future raises the exception of the first one which failed.
+        """
+        futures = {}
+        done = set()
+        pending = list(self._tasks)
+        finished = Queue.Queue()
+        running = 0
+
+        def call(name, func, requires):
+            try:
+                return func(*[futures[r].result() for r in requires])
+            finally:
+                finished.put(name)
+
+        while pending or running:
+            for task in list(pending):
+                name, func, requires = task
+                if not all(r in done for r in requires):
+                    continue
+                pending.remove(task)
+                failed = [futures[r] for r in requires
+                          if futures[r].exception() is not None]
+                if failed:
+                    futures[name] = Future()
+                    futures[name].set_exc_info(failed[0]._exc_info)
+                    done.add(name)
+                else:
+                    futures[name] = self.pool.submit(call, name, func,
+                                                     requires)
+                    running += 1
+            if running:
+                done.add(finished.get())
+                running -= 1
+        return futures
+
+
+def gather(pool, func, items, limit=None, timeout=None):
+    """Like :func:`imap`, but waits for all the calls and returns a list."""
+    started = time.time()
+    futures = list(imap(pool, func, items, limit=limit, timeout=timeout))
+    failures = len([f for f in futures if f.exception() is not None])
+    LOG.debug('Ran %d calls on pool %s in %.3fs (%d failed): %s'
+              % (len(futures), pool.name, time.time() - started, failures,
+                 pool.stats()))
+    return futures
@@ -0,0 +1,83 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Lookups of API objects by id.
+
+Tables often show an object referred to by id from each row, like the
+project of an instance. :func:`index_by_id` builds a dict of the objects
+once, instead of scanning their list for every row.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from openstack_dashboard import api
+
+
+DEFAULT_PROJECT_LIST_CACHE_TTL = 30
+
+
+def index_by_id(objects, attr='id'):
+    """Returns a dict of ``objects`` by their ``attr`` attribute."""
+    return dict((getattr(obj, attr), obj) for obj in objects)
+
+
+class ProjectListCache(object):
+    """The list of all the projects, kept for a few seconds per user.
+
+    Admin pages joining their rows on project ids all need the full list
+    of projects, which is slow to get from Keystone on large clouds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lists = {}
+
+    def get(self, request):
+        ttl = getattr(settings, 'PROJECT_LIST_CACHE_TTL',
+                      DEFAULT_PROJECT_LIST_CACHE_TTL)
+        key = (request.user.id, request.user.tenant_id)
+        now = time.time()
+        with self._lock:
+            entry = self._lists.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                return entry[1]
+
+        projects, has_more = api.keystone.tenant_list(request)
+        if ttl:
+            with self._lock:
+                for other, (created, value) in self._lists.items():
+                    if now - created >= ttl:
+                        del self._lists[other]
+                self._lists[key] = (now, projects)
+        return projects
+
+    def clear(self):
+        with self._lock:
+            self._lists.clear()
+
+
+project_list_cache = ProjectListCache()
+
+
+def project_list(request):
+    """Returns the list of all the projects, cached for a few seconds."""
+    return project_list_cache.get(request)
+
+
+def project_index(request):
+    """Returns all the projects, by id."""
+    return index_by_id(project_list(request))
@@ -0,0 +1,179 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Batched AJAX updates of the rows of a table.
+
+Rows in a transitional state (building instances, attaching volumes...)
+are polled by the browser. Horizon polls each row on its own, and each
+poll makes its own API calls. The rows of a :class:`BatchUpdateRow` class
+are instead polled together by ``_row_updates.html``, at most
+ROW_UPDATE_MAX_ROWS at a time: a :class:`BatchRowUpdateView` fetches them
+concurrently, see :func:`get_many`, and returns them in a single response.
+
+Rows whose status doesn't change are polled less and less often: their
+polling interval doubles on every poll, up to ROW_UPDATE_MAX_INTERVAL
+milliseconds.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core import urlresolvers
+from django import http
+from django.views import generic
+
+from horizon import conf
+from horizon import exceptions
+from horizon import tables
+
+from openstack_dashboard.utils import concurrency
+
+
+DEFAULT_MAX_INTERVAL = 60000
+DEFAULT_MAX_ROWS = 20
+DEFAULT_WORKERS = 10
+DEFAULT_POLL_INTERVAL = 2500
+# How long the status of a polled row is remembered, in seconds.
+STATE_TTL = 600
+
+
+class BatchUpdateRow(tables.Row):
+    """A row updated through a :class:`BatchRowUpdateView`.
+
+    ``batch_update_url`` is the name of the URL of the view. Rows without
+    one are updated one by one, as usual.
+    """
+    ajax = True
+    batch_update_url = None
+
+    def load_cells(self, datum=None):
+        super(BatchUpdateRow, self).load_cells(datum)
+        if not self.batch_update_url:
+            return
+        # Keep the row away from the Horizon poller, which updates rows
+        # one by one.
+        if "ajax-update" in self.classes:
+            self.classes.remove("ajax-update")
+        self.classes.append("batch-update")
+        self.attrs['data-object-id'] = self.table.get_object_id(self.datum)
+        self.attrs['data-batch-update-url'] = urlresolvers.reverse(
+            self.batch_update_url)
+        self.attrs['data-batch-max-rows'] = max_rows()
+
+
+def max_rows():
+    """Returns how many rows may be updated by a single request."""
+    return getattr(settings, 'ROW_UPDATE_MAX_ROWS', DEFAULT_MAX_ROWS)
+
+
+def get_many(get, obj_ids):
+    """Returns the objects ``get(obj_id)`` returns for the given ids.
+
+    The calls run concurrently on a pool of ROW_UPDATE_WORKERS threads per
+    process. Objects which don't exist are left out of the result, other
+    errors are raised.
+    """
+    pool = concurrency.get_pool(
+        'row_updates', getattr(settings, 'ROW_UPDATE_WORKERS',
+                               DEFAULT_WORKERS))
+    not_found = conf.HORIZON_CONFIG['exceptions']['not_found']
+    objects = []
+    for future in concurrency.gather(pool, get, obj_ids):
+        exc = future.exception()
+        if exc is None:
+            objects.append(future.result())
+        elif not isinstance(exc, not_found):
+            future.result()
+    return objects
+
+
+def poll_intervals(request, table_name, statuses):
+    """Returns how long to wait before polling each row again.
+
+    ``statuses`` maps the ids of the rows to their current status. The
+    interval, in milliseconds, doubles each time a row is polled with the
+    same status as the previous time.
+    """
+    interval = conf.HORIZON_CONFIG.get('ajax_poll_interval',
+                                       DEFAULT_POLL_INTERVAL)
+    max_interval = getattr(settings, 'ROW_UPDATE_MAX_INTERVAL',
+                           DEFAULT_MAX_INTERVAL)
+    keys = dict((obj_id, 'rows:%s:%s:%s' % (request.user.id, table_name,
+                                            obj_id))
+                for obj_id in statuses)
+    previous = cache.get_many(keys.values())
+    states = {}
+    intervals = {}
+    for obj_id, status in statuses.items():
+        key = keys[obj_id]
+        unchanged = 0
+        if key in previous and previous[key][0] == status:
+            unchanged = min(previous[key][1] + 1, 16)
+        states[key] = (status, unchanged)
+        intervals[obj_id] = min(interval * 2 ** unchanged, max_interval)
+    cache.set_many(states, STATE_TTL)
+    return intervals
+
+
+class BatchRowUpdateView(generic.View):
+    """Renders the rows of ``table_class`` with the requested ids, as JSON.
+
+    The ids are given as ``obj_id`` query parameters, at most
+    ROW_UPDATE_MAX_ROWS of them. The response looks like::
+
+        {"rows": {"<id>": "<tr ...>...</tr>"},
+         "intervals": {"<id>": <milliseconds before the next poll>},
+         "deleted": ["<id>"]}
+
+    Subclasses fetch the data of the rows in :meth:`get_rows_data`.
+    """
+    table_class = None
+
+    def get_rows_data(self, obj_ids):
+        """Returns the data of the rows with the given ids.
+
+        Rows missing from the result are reported as deleted. Errors
+        aren't handled: if the data can't be retrieved, none of the rows
+        is updated.
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        obj_ids = request.GET.getlist('obj_id')[:max_rows()]
+        try:
+            data = self.get_rows_data(obj_ids) if obj_ids else []
+        except Exception:
+            exceptions.handle(request, ignore=True)
+            return http.HttpResponse(status=503)
+
+        table = self.table_class(request, data=data, **kwargs)
+        status_columns = [table.columns[name]
+                          for name in table._meta.status_columns]
+        rows = {}
+        statuses = {}
+        for datum in data:
+            obj_id = table.get_object_id(datum)
+            if obj_id not in obj_ids:
+                continue
+            rows[obj_id] = table._meta.row_class(table, datum).render()
+            statuses[obj_id] = [unicode(column.get_raw_data(datum))
+                                for column in status_columns]
+
+        result = {'rows': rows,
+                  'intervals': poll_intervals(request, table.name, statuses),
+                  'deleted': [obj_id for obj_id in obj_ids
+                              if obj_id not in rows]}
+        return http.HttpResponse(json.dumps(result),
+                                 content_type='application/json')